@@ -0,0 +1,39 @@
+from minibench import Benchmark, parametrize
+
+
+class SearchComplexity(Benchmark):
+    '''Search a value in sequences of growing sizes'''
+    times = 100
+    params = {'size': [100, 1000, 10000]}
+
+    def before(self):
+        size = self.variant['size']
+        self.data = list(range(size))
+        self.set = set(self.data)
+        # The worst case needle so the list search time only depends on its size
+        self.needle = size - 1
+
+    def bench_list(self):
+        return self.needle in self.data
+
+    def bench_set(self):
+        return self.needle in self.set
+
+
+class SortComplexity(Benchmark):
+    '''Sort reversed lists of growing sizes'''
+    times = 20
+
+    @parametrize('size', [1000, 10000, 100000])
+    def bench_sorted(self, size):
+        return sorted(range(size, 0, -1))
+
+    @parametrize('size', [10, 100, 500])
+    def bench_insertion(self, size):
+        data = list(range(size, 0, -1))
+        for i in range(1, len(data)):
+            j = i
+            while j > 0 and data[j - 1] > data[j]:
+                data[j - 1], data[j] = data[j], data[j - 1]
+                j -= 1
+        return data
@@ -0,0 +1,24 @@
+from minibench import Benchmark, pool
+
+import random
+
+
+class SortShuffledList(Benchmark):
+    '''Sort a shuffled list of 1000 items'''
+    times = 1000
+
+    @pool(size=100)
+    def shuffled(self):
+        while True:
+            yield random.sample(range(1000), 1000)
+
+    @pool(size=10, cycle=True)
+    def samples(self):
+        while True:
+            yield random.sample(range(1000), 1000)
+
+    def bench_sort(self, shuffled):
+        shuffled.sort()
+
+    def bench_sorted(self, samples):
+        return sorted(samples)
@@ -1,4 +1,4 @@
-from minibench import Benchmark
+from minibench import Benchmark, fixture
 
 import random
 from operator import itemgetter
@@ -15,42 +15,44 @@ class SortDictByValue(Benchmark):
     See: http://writeonly.wordpress.com/2008/08/30/sorting-dictionaries-by-value-in-python-improved/
     '''
     times = 10000
+    size = 100
 
-    def before_class(self):
-        self.d = dict(zip(range(100), range(100)))
+    @fixture(scope='class')
+    def values(self):
+        return list(range(self.size))
 
-    def each_each(self):
-        random.shuffle(self.d)
+    @fixture(scope='iteration')
+    def d(self, values):
+        random.shuffle(values)
+        return dict(zip(range(self.size), values))
 
-    def bench_pep265(self):
-        return sorted(self.d.items(), key=itemgetter(1))
+    def bench_pep265(self, d):
+        return sorted(d.items(), key=itemgetter(1))
 
-    def bench_stupid(self):
-        return [(k, v) for v, k in sorted([(v, k) for k, v in self.d.items()])]
+    def bench_stupid(self, d):
+        return [(k, v) for v, k in sorted([(v, k) for k, v in d.items()])]
 
-    def bench_listExpansion(self):
-        L = [(k, v) for (k, v) in self.d.items()]
+    def bench_listExpansion(self, d):
+        L = [(k, v) for (k, v) in d.items()]
         return sorted(L, key=lambda x: x[1])
 
-    def bench_generator(self):
-        L = ((k, v) for (k, v) in self.d.items())
+    def bench_generator(self, d):
+        L = ((k, v) for (k, v) in d.items())
         return sorted(L, key=lambda x: x[1])
 
-    def bench_lambda(self):
-        return sorted(self.d.items(), key=lambda x: x[1])
+    def bench_lambda(self, d):
+        return sorted(d.items(), key=lambda x: x[1])
 
-    def bench_formalFnInner(self):
+    def bench_formalFnInner(self, d):
         def fninner(x):
             return x[1]
-        return sorted(self.d.items(), key=fninner)
+        return sorted(d.items(), key=fninner)
 
-    def bench_formalFnOuter(self):
-        return sorted(self.d.items(), key=fnouter)
+    def bench_formalFnOuter(self, d):
+        return sorted(d.items(), key=fnouter)
 
 
 class SortLargerDictByValue(SortDictByValue):
     '''Sort Dict with 1000 Keys by Value'''
     times = 1000
-
-    def before_class(self):
-        self.d = dict(zip(range(1000), range(1000)))
+    size = 1000
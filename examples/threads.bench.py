@@ -0,0 +1,25 @@
+from minibench import Benchmark
+
+import threading
+
+
+class CacheContention(Benchmark):
+    '''Shared cache contention'''
+    times = 20
+    threads = [1, 2, 4]
+
+    def before_class(self):
+        self.lock = threading.Lock()
+        self.cache = {}
+
+    def bench_locked(self):
+        for i in range(1000):
+            with self.lock:
+                self.cache[i] = i
+
+    def bench_unlocked(self):
+        for i in range(1000):
+            self.cache[i] = i
+
+    def bench_compute(self):
+        return sum(i * i for i in range(1000))
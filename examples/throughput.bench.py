@@ -0,0 +1,38 @@
+from minibench import Benchmark, parametrize, tag
+
+import json
+
+
+class JsonThroughput(Benchmark):
+    '''JSON serialization throughput'''
+    times = 100
+    work = 'return'
+    work_unit = 'B'
+
+    def before_class(self):
+        self.data = [{'id': i, 'name': 'item {0}'.format(i), 'tags': ['a', 'b']} for i in range(1000)]
+
+    def bench_dumps(self):
+        return json.dumps(self.data)
+
+    @tag('slow')
+    def bench_dumps_indent(self):
+        return json.dumps(self.data, indent=2)
+
+
+class ListThroughput(Benchmark):
+    '''List building throughput'''
+    times = 100
+    work_unit = 'items'
+    tags = ['memory']
+
+    def work(self):
+        return self.variant['size']
+
+    @parametrize('size', [100, 10000])
+    def bench_comprehension(self, size):
+        return [i for i in range(size)]
+
+    @parametrize('size', [100, 10000])
+    def bench_list(self, size):
+        return list(range(size))
@@ -4,5 +4,8 @@ from __future__ import unicode_literals
 
 from .__about__ import __version__, __description__, __author__, __url__
 from .benchmark import Benchmark, RunResult, DEFAULT_TIMES
-from .report import BaseReporter, JsonReporter, CsvReporter, MarkdownReporter, RstReporter, FileReporter, FixedWidth
+from .fixtures import fixture, pool
+from .params import parametrize
+from .selection import tag
+from .report import BaseReporter, JsonReporter, JsonLinesReporter, CsvReporter, MarkdownReporter, RstReporter, FileReporter, FixedWidth
 from .runner import BenchmarkRunner
@@ -5,7 +5,7 @@ import sys
 
 from glob import glob
 
-from six import string_types  # noqa
+from six import string_types, get_unbound_function  # noqa
 
 
 def load_module(name, filename):
@@ -37,3 +37,10 @@ def recursive_glob(pattern):
         return glob(pattern)
     else:
         return glob(pattern, recursive=True)
+
+
+def iscoroutinefunction(func):
+    '''Wether a function is a native coroutine function (``async def``, Python 3.5+)'''
+    import inspect
+    check = getattr(inspect, 'iscoroutinefunction', None)
+    return bool(check and check(func))
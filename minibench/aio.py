@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+'''
+Asyncio coroutines benchmarks support.
+
+This module relies on the ``async``/``await`` syntax (Python 3.5+)
+so it is only imported when a benchmark provides a coroutine method.
+
+Each round is run as a single coroutine on the benchmark class event loop,
+so the loop is not started and stopped around each call.
+'''
+import asyncio
+
+
+def new_loop(factory=None):
+    '''
+    Create and install a new event loop.
+
+    :param factory: an optionnal loop factory (ie. ``uvloop.new_event_loop``)
+    :type factory: callable
+    '''
+    loop = (factory or asyncio.new_event_loop)()
+    asyncio.set_event_loop(loop)
+    return loop
+
+
+def close_loop(loop):
+    '''Shutdown the asynchronous generators, close and uninstall a loop'''
+    try:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+async def gather(func, concurrency, results, read, scale):
+    '''Run ``concurrency`` calls at once, storing each one latency'''
+    async def operation():
+        tick = read()
+        await func()
+        results.latencies.append((read() - tick) * scale)
+    await asyncio.gather(*(operation() for _ in range(concurrency)))
+
+
+async def run_one(bench, func, results):
+    '''The asynchronous version of :meth:`Benchmark._run_one <minibench.Benchmark._run_one>`'''
+    read = bench.timer.read
+    if bench._each:
+        func = bench._setup_each(func)
+    tick = read()
+    success = True
+    result = None
+    try:
+        if bench.concurrency:
+            await gather(func, bench.concurrency, results, read, bench.timer.scale)
+        else:
+            result = await func()
+    except Exception as e:
+        success = False
+        result = e
+    duration = (read() - tick) * bench.timer.scale
+    if bench._each:
+        bench._teardown_each()
+    return duration, success, result
+
+
+async def run_round(bench, func, number, results):
+    '''The asynchronous version of :meth:`Benchmark._run_round <minibench.Benchmark._run_round>`'''
+    duration = 0
+    calls = 0
+    for _ in range(number):
+        elapsed, success, result = await run_one(bench, func, results)
+        duration += elapsed
+        calls += 1
+        if success:
+            results.has_success = True
+        else:
+            results.has_errors = True
+            if bench.debug:
+                results.error = result
+                break
+    results.add(duration, calls)
@@ -1,56 +1,322 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
-import time
-import sys
-
-from collections import namedtuple
-
+import numbers
+
+from array import array
+from collections import namedtuple, OrderedDict
+from functools import partial
+from itertools import repeat
+from timeit import default_timer
+
+from . import stats
+from ._compat import get_unbound_function, iscoroutinefunction
+from .clock import DEFAULT_CLOCK, THREAD_CLOCKS, Clock, get_clock
+from .collector import DEFAULT_GC_MODE, Policy, check as check_gc_mode
+from .fixtures import CLASS, ITERATION, METHOD, Fixtures, arguments as fixture_arguments
+from .memory import measure as measure_memory
+from .profiler import DEFAULT_TOP, budget_calls, profile as profile_method
+from .params import expand, params_of, split_key, variant_key
+from .selection import selects, tags_of
+from .threads import THREADS_PARAM, ThreadPool
 from .utils import humanize
 
 DEFAULT_TIMES = 5
+DEFAULT_NUMBER = 1
+
+#: The inner loop sizes multipliers tried on calibration (as :meth:`timeit.Timer.autorange`)
+CALIBRATION_STEPS = (1, 2, 5)
+#: The maximum inner loop size calibration can reach
+MAX_NUMBER = 10 ** 9
+#: How many times the empty loop is timed to measure the batch overhead (minimum is kept)
+OVERHEAD_SAMPLES = 3
 
+DEFAULT_WARMUP_TOLERANCE = 0.05
+DEFAULT_WARMUP_WINDOW = 5
+DEFAULT_WARMUP_MAX = 100
 
-if sys.platform == "win32":
-    # On Windows, the best timer is time.clock()
-    timer = time.clock
-else:
-    # On most other platforms the best timer is time.time()
-    timer = time.time
+#: The :attr:`Benchmark.work` value measuring the work from the method return value
+WORK_RETURN = 'return'
+DEFAULT_WORK_UNIT = 'ops'
 
 #: Store a single method execution result
 RunResult = namedtuple('RunResult', ('duration', 'success', 'result'))
 
 
+class RemoteError(Exception):
+    '''An error raised by a benchmark method run in another process'''
+    def __init__(self, type, message):
+        self.type = type
+        self.message = message
+        super(RemoteError, self).__init__(message)
+
+    def __str__(self):
+        return '{0}: {1}'.format(self.type, self.message)
+
+
 class Result(object):
-    ''' Store an aggregated result for a single method'''
-    def __init__(self):
+    '''
+    Store an aggregated result for a single method
+
+    Each round mean call duration is kept as a sample in a compact ``array('d')``
+    to compute the statistics.
+    '''
+    def __init__(self, number=DEFAULT_NUMBER):
         self.total = 0
+        self.number = number
+        self.calls = 0
+        self.overhead = 0
+        self.warmup = 0
+        self.memory = None
+        self.concurrency = None
+        self.work = None
+        self.profile = None
+        self.gc = None
+        #: The worker which ran the method if distributed (its ``address``, ``node`` and ``fingerprint``)
+        self.worker = None
+        #: The overhead of each fixture used by the method as a ``{'scope', 'calls', 'total'}`` dictionnary
+        self.fixtures = None
+        self.samples = array(str('d'))
+        self.latencies = array(str('d'))
         self.has_success = False
         self.has_errors = False
         self.error = None
+        self._sorted = None
+
+    def to_dict(self):
+        '''Serialize the result into JSON compatible types'''
+        error = None
+        if self.error is not None:
+            error = {'type': type(self.error).__name__, 'message': str(self.error)}
+            if isinstance(self.error, RemoteError):
+                error = {'type': self.error.type, 'message': self.error.message}
+        return {
+            'total': self.total,
+            'number': self.number,
+            'calls': self.calls,
+            'overhead': self.overhead,
+            'warmup': self.warmup,
+            'samples': self.samples.tolist(),
+            'has_success': self.has_success,
+            'has_errors': self.has_errors,
+            'error': error,
+            'memory': self.memory,
+            'concurrency': self.concurrency,
+            'work': self.work,
+            'profile': self.profile,
+            'gc': self.gc,
+            'worker': self.worker,
+            'fixtures': self.fixtures,
+            'latencies': self.latencies.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        '''Load a result serialized by :meth:`to_dict`'''
+        result = cls(data['number'])
+        result.total = data['total']
+        result.calls = data['calls']
+        result.overhead = data['overhead']
+        result.warmup = data.get('warmup', 0)
+        result.samples.extend(data['samples'])
+        result.has_success = data['has_success']
+        result.has_errors = data['has_errors']
+        result.memory = data.get('memory')
+        result.concurrency = data.get('concurrency')
+        result.work = data.get('work')
+        result.profile = data.get('profile')
+        result.gc = data.get('gc')
+        result.worker = data.get('worker')
+        result.fixtures = data.get('fixtures')
+        result.latencies.extend(data.get('latencies', []))
+        if data['error']:
+            result.error = RemoteError(data['error']['type'], data['error']['message'])
+        return result
+
+    def add(self, duration, number=1):
+        '''
+        Store a single round duration
+
+        :param duration: the round total duration (in seconds)
+        :type duration: float
+        :param number: how many calls have been performed during this round
+        :type number: int
+        '''
+        self.samples.append(duration / number)
+        self.total += duration
+        self.calls += number
+        self._sorted = None
+
+    @property
+    def rounds(self):
+        '''How many rounds have been run'''
+        return len(self.samples)
+
+    @property
+    def sorted(self):
+        '''The sorted samples (cached until a new sample is added)'''
+        if self._sorted is None:
+            self._sorted = sorted(self.samples)
+        return self._sorted
+
+    @property
+    def mean(self):
+        return self.total / self.calls if self.calls else 0
+
+    @property
+    def min(self):
+        return self.sorted[0] if self.samples else 0
+
+    @property
+    def max(self):
+        return self.sorted[-1] if self.samples else 0
+
+    @property
+    def median(self):
+        return stats.median(self.sorted)
+
+    @property
+    def stdev(self):
+        return stats.stdev(self.samples, self.mean)
+
+    def percentile(self, p):
+        '''Compute the ``p`` percentile (between 0 and 100) of the samples'''
+        return stats.percentile(self.sorted, p)
+
+    @property
+    def outliers(self):
+        '''Low and high outliers counts as a tuple'''
+        return stats.outliers(self.sorted)
+
+    @property
+    def ops(self):
+        '''The number of operations by second (each call performs :attr:`concurrency` operations)'''
+        return (self.concurrency or 1) * self.calls / self.total if self.total else 0
+
+    @property
+    def throughput(self):
+        '''The work units processed by second (``None`` if the work is unknown)'''
+        if self.work is None:
+            return None
+        return self.work * self.ops
+
+    def latency(self, p):
+        '''Compute the ``p`` percentile (between 0 and 100) of the concurrent operations latencies'''
+        return stats.percentile(sorted(self.latencies), p)
 
 
 class Benchmark(object):
     '''Base class for all benchmark suites'''
     times = DEFAULT_TIMES
+    #: How many calls are timed in a single round
+    number = DEFAULT_NUMBER
+    #: The clock name used to time methods (see :mod:`minibench.clock`)
+    clock = DEFAULT_CLOCK
+    #: If set, calibrate :attr:`number` until a single round lasts at least this duration (in seconds)
+    min_time = None
+    #: An optionnal time budget (in seconds) for each method
+    max_time = None
+    #: An optionnal time budget (in seconds) for the whole class
+    max_suite_time = None
+    #: Time each round calls in a single tight loop (ignored if per-call hooks are overridden)
+    batch = False
+    #: Measure each method memory usage (see :mod:`minibench.memory`)
+    memory = False
+    #: How many untimed rounds are run before measuring (the minimum in auto mode)
+    warmup = 0
+    #: Keep warming up until the rolling mean is stable
+    warmup_auto = False
+    #: The maximum relative difference between two consecutive windows means to consider it stable
+    warmup_tolerance = DEFAULT_WARMUP_TOLERANCE
+    #: The number of rounds of each window compared in auto mode
+    warmup_window = DEFAULT_WARMUP_WINDOW
+    #: The maximum number of warmup rounds in auto mode
+    warmup_max = DEFAULT_WARMUP_MAX
+    #: An optionnal parameters grid as a dictionnary of ``name: values`` applied to every method.
+    #: The current values are available as :attr:`variant` while running.
+    params = None
+    #: An optionnal event loop factory used to run coroutine methods (ie. ``uvloop.new_event_loop``)
+    loop_factory = None
+    #: If set, each coroutine method call runs this number of concurrent operations with ``asyncio.gather``
+    concurrency = None
+    #: The garbage collector policy during the timed rounds
+    #: (``'enabled'``, ``'disabled'``, ``'collect'`` or ``'record'``, see :mod:`minibench.collector`)
+    gc_mode = DEFAULT_GC_MODE
+    #: Profile each method with this profiler (``'cprofile'`` or ``'sampling'``) during extra untimed iterations
+    profile = None
+    #: How many hottest functions are reported when profiling
+    profile_top = DEFAULT_TOP
+    #: An optionnal list of threads counts: each method is called at once by each count of threads
+    #: (as a ``threads`` variant) to measure the contention (not with the ``thread_time`` clock)
+    threads = None
+    #: An optionnal amount of work (items, bytes...) processed by each call to report the throughput.
+    #: It can be a number, a method returning the work of the current variant
+    #: or ``'return'`` to use the return value (or its length) of an extra untimed call.
+    work = None
+    #: The unit of :attr:`work` (bytes are displayed with binary multiples if ``'B'``)
+    work_unit = DEFAULT_WORK_UNIT
+    #: An optionnal list of tags given to every method (see :func:`~minibench.tag`)
+    tags = None
 
     def __init__(self, times=None, prefix="bench_", debug=False,
                  before=None, before_each=None,
                  after=None, after_each=None,
+                 clock=None, number=None,
+                 min_time=None, max_time=None, max_suite_time=None,
+                 batch=None, memory=None, methods=None,
+                 warmup=None, warmup_auto=None, warmup_tolerance=None,
+                 concurrency=None, loop_factory=None, threads=None,
+                 profile=None, profile_top=None, gc_mode=None,
+                 keyword=None, markers=None,
                  **kwargs):
 
         self.times = times or self.times
+        self.number = number or self.number
+        self.min_time = min_time or self.min_time
+        self.max_time = max_time or self.max_time
+        self.max_suite_time = max_suite_time or self.max_suite_time
+        self.batch = self.batch if batch is None else batch
+        self.memory = self.memory if memory is None else memory
+        self.warmup = self.warmup if warmup is None else warmup
+        self.warmup_auto = self.warmup_auto if warmup_auto is None else warmup_auto
+        self.warmup_tolerance = warmup_tolerance or self.warmup_tolerance
+        self.concurrency = concurrency or self.concurrency
+        self.loop_factory = loop_factory or self.loop_factory
+        self.threads = threads or self.threads
+        self.profile = profile or self.profile
+        self.profile_top = profile_top or self.profile_top
+        self.gc_mode = check_gc_mode(gc_mode or self.gc_mode)
+        self.clock = clock or self.clock
+        if self.threads and self.clock in THREAD_CLOCKS:
+            raise ValueError('The {0} clock only measures the calling thread: it can\'t time threaded calls'.format(
+                self.clock))
+        self.timer = get_clock(self.clock)
         self.results = {}
         self.debug = debug
 
         self._prefix = prefix
+        self._methods = methods
+        self._keyword = keyword
+        self._markers = markers
 
         self._before = before or self._noop
         self._before_each = before_each or self._noop
         self._after = after or self._noop
         self._after_each = after_each or self._noop
 
+        self._each_hooks = self.overrides('before_each') or self.overrides('after_each')
+        self._fixtures = Fixtures(self)
+        self._iteration = []
+        self._dynamic = []
+        self._overheads = {}
+        self._variants = OrderedDict()
+        self._coroutine = False
+        self._pool = None
+        #: The class event loop while running coroutine methods
+        self.loop = None
+        #: The parameters values of the running variant
+        self.variant = OrderedDict()
+
     @property
     def label(self):
         '''A human readable label'''
@@ -59,15 +325,28 @@ class Benchmark(object):
         return humanize(self.__class__.__name__)
 
     def label_for(self, name):
-        '''Get a human readable label for a method given its name'''
+        '''Get a human readable label for a method (or a method variant) given its name'''
+        name, suffix = split_key(name)
         method = getattr(self, name)
         if method.__doc__ and method.__doc__.strip():
-            return method.__doc__.strip().splitlines()[0]
-        return humanize(name.replace(self._prefix, ''))
+            label = method.__doc__.strip().splitlines()[0]
+        else:
+            label = humanize(name.replace(self._prefix, ''))
+        return ' '.join((label, suffix)) if suffix else label
 
     def _noop(self, *args, **kwargs):
         pass
 
+    def overrides(self, name):
+        '''Wether the benchmark class overrides a given :class:`Benchmark` method'''
+        method = get_unbound_function(getattr(self.__class__, name))
+        return method is not get_unbound_function(getattr(Benchmark, name))
+
+    @property
+    def batched(self):
+        '''Wether rounds are timed as a single tight loop'''
+        return self.batch and not self._each_hooks
+
     def before_class(self):
         '''Hook called before each class'''
         pass
@@ -92,54 +371,368 @@ class Benchmark(object):
         '''Hook called after each class'''
         pass
 
+    def tags_of(self, name):
+        '''The tags of a method given its name (the class :attr:`tags` first)'''
+        name, _ = split_key(name)
+        return tuple(self.tags or ()) + tags_of(getattr(self, name))
+
     def _collect(self):
-        return [test for test in dir(self) if test.startswith(self._prefix)]
+        tests = []
+        grid = [(name, list(self.params[name])) for name in sorted(self.params or {})]
+        for name in dir(self):
+            if not name.startswith(self._prefix):
+                continue
+            if not selects(self._keyword, self._markers, self.__class__.__name__, name, self.tags_of(name)):
+                continue
+            method = getattr(self, name)
+            kwargs = [param for param, _ in params_of(method)]
+            threads = [(THREADS_PARAM, list(self.threads))] if self.threads and not iscoroutinefunction(method) else []
+            for params in expand(grid + params_of(method) + threads):
+                key = variant_key(name, params)
+                self._variants[key] = (name, params, kwargs)
+                if self._methods is None or key in self._methods or name in self._methods:
+                    tests.append(key)
+        return tests
+
+    def variant_of(self, key):
+        '''
+        Get a collected method name and its parameters values given its variant key.
+
+        :rtype: tuple
+        '''
+        name, params, _ = self._variants.get(key, (key, OrderedDict(), []))
+        return name, params
+
+    def dump(self):
+        '''Serialize the benchmark results into JSON compatible types'''
+        return {
+            'clock': self.timer.to_dict(),
+            'results': dict((method, result.to_dict()) for method, result in self.results.items()),
+        }
+
+    def load(self, data):
+        '''Load results serialized by :meth:`dump` (from another process or host)'''
+        self.timer = Clock.from_dict(data['clock'])
+        for method, result in data['results'].items():
+            self.results[method] = Result.from_dict(result)
+
+    @property
+    def _each(self):
+        '''Wether something has to be done around each call'''
+        return self._each_hooks or bool(self._iteration)
+
+    def _setup_each(self, func):
+        '''Run the per call hooks and fixtures, returning the method bound to the iteration fixtures'''
+        if self._each_hooks:
+            self.before_each()
+        if self._iteration:
+            self._fixtures.setup(self._iteration)
+        return self._bind(func)
+
+    def _bind(self, func):
+        '''Give the current iteration fixtures values to a method'''
+        if not self._dynamic:
+            return func
+        return partial(func, **self._fixtures.kwargs(self._dynamic))
+
+    def _teardown_each(self):
+        if self._iteration:
+            self._fixtures.teardown(ITERATION)
+        if self._each_hooks:
+            self.after_each()
 
     def _run_one(self, func):
-        self.before_each()
-        tick = timer()
+        read = self.timer.read
+        if self._each:
+            func = self._setup_each(func)
+        tick = read()
         success = True
         try:
             result = func()
         except Exception as e:
             success = False
             result = e
-        duration = timer() - tick
-        self.after_each()
+        duration = (read() - tick) * self.timer.scale
+        if self._each:
+            self._teardown_each()
         return RunResult(duration, success, result)
 
+    def _run_round(self, func, number, results):
+        '''Run a single round of ``number`` calls and store it into ``results``'''
+        if self._coroutine:
+            from . import aio
+            self.loop.run_until_complete(aio.run_round(self, func, number, results))
+            return
+        if self._pool is not None:
+            self._run_threaded(number, results)
+            return
+        if self.batched and not self._iteration and self._run_batch(func, number, results):
+            return
+        duration = 0
+        calls = 0
+        for _ in range(number):
+            result = self._run_one(func)
+            duration += result.duration
+            calls += 1
+            if result.success:
+                results.has_success = True
+            else:
+                results.has_errors = True
+                if self.debug:
+                    results.error = result.result
+                    break
+        results.add(duration, calls)
+
+    def _run_threaded(self, number, results):
+        '''Run a single round of ``number`` calls from every thread of the pool at once'''
+        duration = 0
+        calls = 0
+        func = self._pool.func
+        for _ in range(number):
+            if self._each:
+                self._pool.func = self._setup_each(func)
+            elapsed, errors = self._pool.call(results.latencies)
+            if self._each:
+                self._teardown_each()
+            duration += elapsed
+            calls += 1
+            if not errors:
+                results.has_success = True
+            else:
+                results.has_errors = True
+                if self.debug:
+                    results.error = errors[0]
+                    break
+        self._pool.func = func
+        results.add(duration, calls)
+
+    def _run_batch(self, func, number, results):
+        '''
+        Time ``number`` calls in a single tight loop and store the round into ``results``
+        minus the empty loop overhead.
+
+        :returns: ``False`` if a call failed, so the round should be replayed call by call
+        :rtype: bool
+        '''
+        read = self.timer.read
+        loop = repeat(None, number)
+        tick = read()
+        try:
+            for _ in loop:
+                func()
+        except Exception:
+            return False
+        duration = (read() - tick) * self.timer.scale
+        overhead = self.overhead(number)
+        results.overhead += overhead
+        results.add(max(duration - overhead, 0), number)
+        results.has_success = True
+        return True
+
+    def overhead(self, number):
+        '''Measure (once) the overhead of an empty batch loop of ``number`` iterations (in seconds)'''
+        if number not in self._overheads:
+            read = self.timer.read
+            durations = []
+            for _ in range(OVERHEAD_SAMPLES):
+                loop = repeat(None, number)
+                tick = read()
+                for _ in loop:
+                    pass
+                durations.append((read() - tick) * self.timer.scale)
+            self._overheads[number] = min(durations)
+        return self._overheads[number]
+
+    def calibrate(self, func):
+        '''
+        Find how many calls are required for a single round to last
+        at least :attr:`min_time` (as :meth:`timeit.Timer.autorange`).
+
+        Calibration rounds are not stored.
+        '''
+        number = 1
+        while True:
+            for step in CALIBRATION_STEPS:
+                candidate = number * step
+                results = Result()
+                self._run_round(func, candidate, results)
+                if results.total >= self.min_time or candidate >= MAX_NUMBER or results.error:
+                    return candidate
+            number *= 10
+
+    def warm(self, func, number):
+        '''
+        Run the untimed warmup rounds.
+
+        In :attr:`warmup_auto` mode, rounds are run until the means of the two last
+        :attr:`warmup_window` rounds windows differ by less than :attr:`warmup_tolerance`
+        (or :attr:`warmup_max` rounds have been run).
+
+        :returns: the number of warmup rounds
+        :rtype: int
+        '''
+        results = Result(number)
+        window = self.warmup_window
+        while True:
+            rounds = results.rounds
+            if rounds >= self.warmup and (not self.warmup_auto or rounds >= self.warmup_max):
+                break
+            if self.warmup_auto and rounds >= max(self.warmup, 2 * window):
+                previous = stats.mean(results.samples[-2 * window:-window])
+                last = stats.mean(results.samples[-window:])
+                if not previous or abs(last - previous) / previous <= self.warmup_tolerance:
+                    break
+            self._run_round(func, number, results)
+            if results.error:
+                break
+        return results.rounds
+
+    def measure_work(self, func):
+        '''
+        Get the amount of work processed by a single method call (see :attr:`work`)
+
+        :returns: the amount of work or ``None`` if it can't be measured (ie. a return value without length
+                  which is not a number)
+        '''
+        if self.work == WORK_RETURN:
+            try:
+                value = (self._sync(func) if self._coroutine else func)()
+            except Exception:
+                return None
+            if hasattr(value, '__len__'):
+                return len(value)
+            is_number = isinstance(value, numbers.Real) and not isinstance(value, bool)
+            return value if is_number else None
+        elif callable(self.work):
+            return self.work()
+        return self.work
+
+    def _inject(self, func, names):
+        '''Give some fixtures values to a method (the iteration scoped ones being bound before each call)'''
+        static = [name for name in names if name not in self._iteration]
+        if static:
+            func = partial(func, **self._fixtures.kwargs(static))
+        self._dynamic = [name for name in names if name in self._iteration]
+        return func
+
+    def _sync(self, func):
+        '''Wrap a coroutine function into a function running it until complete on the class loop'''
+        return lambda: self.loop.run_until_complete(func())
+
+    def _exhausted(self, started, budget):
+        return budget is not None and default_timer() - started >= budget
+
     def run(self):
         '''
         Collect all tests to run and run them.
 
-        Each method will be run :attr:`Benchmark.times`.
+        Each method will be run :attr:`Benchmark.times` rounds of :attr:`Benchmark.number` calls.
+        If :attr:`Benchmark.min_time` is set, the number of calls by round is calibrated first.
+        Then :attr:`Benchmark.warmup` untimed rounds are run (see :meth:`warm`).
+        Rounds stop early when the method or the class time budget is exhausted.
+
+        In :attr:`Benchmark.batch` mode, each round is timed as a single tight loop
+        and the empty loop overhead is subtracted.
+
+        The :attr:`Benchmark.gc_mode` garbage collector policy is applied during the timed rounds.
+
+        If :attr:`Benchmark.profile` is set, the method is profiled
+        during as many extra untimed calls as the timed ones (within a time budget).
+
+        In :attr:`Benchmark.memory` mode, an extra untimed call is traced
+        to measure the method memory usage.
+
+        Coroutine methods are run on an event loop created once for the class
+        (see :attr:`Benchmark.loop_factory`), optionnaly by :attr:`Benchmark.concurrency` concurrent operations.
+
+        With :attr:`Benchmark.threads`, each method is called at once from each count of threads.
+
+        Parametrized methods (see :func:`~minibench.parametrize` and :attr:`Benchmark.params`)
+        are run once for each parameters combination.
+
+        Fixtures (see :func:`~minibench.fixture`) requested by a method arguments are set up
+        outside of the timed calls: once for the class, once for the method or before each call
+        (disabling the batch mode). The extra untimed calls share a single set of iteration fixtures.
         '''
         tests = self._collect()
 
         if not tests:
             return
 
-        self.times
+        coroutines = [test for test in tests if iscoroutinefunction(getattr(self, self._variants[test][0]))]
+        if coroutines:
+            from . import aio
+            self.loop = aio.new_loop(self.loop_factory)
+
         self.before_class()
+        suite_started = default_timer()
 
         for test in tests:
-            func = getattr(self, test)
-            results = self.results[test] = Result()
+            name, params, kwargs = self._variants[test]
+            self.variant = params
+            func = getattr(self, name)
+            fixtures = self._fixtures.requested(func, kwargs) if self._fixtures else []
+            injected = [arg for arg in fixture_arguments(func) if arg in fixtures]
+            self._iteration = self._fixtures.of(fixtures, ITERATION)
+            if kwargs:
+                func = partial(func, **dict((k, params[k]) for k in kwargs))
+            self._coroutine = test in coroutines
             self._before(self, test)
             self.before()
-            for i in range(self.times):
-                self._before_each(self, test, i)
-                result = self._run_one(func)
-                results.total += result.duration
-                if result.success:
-                    results.has_success = True
-                else:
-                    results.has_errors = True
-                self._after_each(self, test, i)
-                if self.debug and not result.success:
-                    results.error = result.result
-                    break
+            if fixtures:
+                overheads = self._fixtures.start(fixtures)
+                self._fixtures.setup(self._fixtures.of(fixtures, CLASS) + self._fixtures.of(fixtures, METHOD))
+                func = self._inject(func, injected)
+            if self.threads and THREADS_PARAM in params and not self._coroutine:
+                self._pool = ThreadPool(params[THREADS_PARAM], func, self.timer).__enter__()
+            started = default_timer()
+            number = self.calibrate(func) if self.min_time else self.number
+            results = self.results[test] = Result(number)
+            if fixtures:
+                results.fixtures = overheads
+            if self._coroutine and self.concurrency:
+                results.concurrency = self.concurrency
+            elif self._pool is not None:
+                results.concurrency = self._pool.size
+            if self.work is not None:
+                with self._fixtures.scope(self._iteration, ITERATION):
+                    results.work = self.measure_work(self._bind(func))
+            if self.warmup or self.warmup_auto:
+                results.warmup = self.warm(func, number)
+            with Policy(self.gc_mode) as policy:
+                for i in range(self.times):
+                    policy.before_round()
+                    self._before_each(self, test, i)
+                    self._run_round(func, number, results)
+                    self._after_each(self, test, i)
+                    if results.error:
+                        break
+                    if self._exhausted(started, self.max_time) or self._exhausted(suite_started, self.max_suite_time):
+                        break
+            results.gc = policy.recorded
+            if self._pool is not None:
+                self._pool.__exit__()
+                self._pool = None
+            if self.profile and not results.error:
+                with self._fixtures.scope(self._iteration, ITERATION):
+                    call = self._sync(self._bind(func)) if self._coroutine else self._bind(func)
+                    calls = budget_calls(results.calls, results.mean)
+                    results.profile = profile_method(self.profile, call, calls, self.profile_top)
+            if self.memory and not results.error:
+                with self._fixtures.scope(self._iteration, ITERATION):
+                    call = self._sync(self._bind(func)) if self._coroutine else self._bind(func)
+                    results.memory = measure_memory(call)
+            self._fixtures.teardown(METHOD)
+            self._iteration = []
+            self._dynamic = []
             self.after()
             self._after(self, test)
 
+        self.variant = OrderedDict()
+        self._coroutine = False
+        self._fixtures.teardown(CLASS)
         self.after_class()
+        if self.loop is not None:
+            from . import aio
+            aio.close_loop(self.loop)
+            self.loop = None
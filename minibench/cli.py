@@ -1,12 +1,36 @@
 # -*- coding: utf-8 -*-
 import json as JSON
 import os
+import sys
+
+from datetime import datetime
 
 import click
 
 from ._compat import recursive_glob
-from .report import BaseReporter, JsonReporter, CsvReporter, MarkdownReporter, RstReporter, DEFAULT_PRECISION
+from .clock import DEFAULT_CLOCK, THREAD_CLOCKS, available_clocks, get_clock
+from .collector import DEFAULT_GC_MODE, GC_MODES
+from .environment import KEY_PACKAGES, fingerprint, git_commit, probe
+from .dependencies import DEFAULT_DEPENDENCIES, changed_files
+from .discovery import DEFAULT_CACHE
+from .executor import available_cpus, pin
+from .distributed import DEFAULT_HOST, DEFAULT_PORT, Worker, parse_address
+from .history import DEFAULT_HISTORY, History, HistoryReporter
+from .complexity import analyze
+from .compare import (
+    DEFAULT_THRESHOLD, FASTER, SLOWER, compare, compare_environments, environment_of, parse_threshold
+)
+from .report import (
+    BaseReporter, JsonReporter, JsonLinesReporter, CsvReporter, MarkdownReporter, RstReporter, DEFAULT_PRECISION,
+    load_summary
+)
+from .benchmark import DEFAULT_WARMUP_TOLERANCE
+from .profiler import DEFAULT_TOP, PROFILERS, ProfileReporter
 from .runner import BenchmarkRunner
+from .selection import Expression
+from .threads import gil_enabled, scaling
+from .tuning import OK as FINDING_OK, default_cpus, noise, parse_cpus, stabilize
+from .utils import humanize_bytes, humanize_rate
 
 
 CONTEXT_SETTINGS = {
@@ -29,20 +53,45 @@ OK = '✔'
 KO = '✘'
 WARNING = '⚠'
 
+#: The exit code used when a performance regression is detected
+EXIT_REGRESSION = 2
+#: The exit code used when the reference comes from an incompatible environment
+EXIT_INCOMPATIBLE = 3
+
 UNIT_PERCENTS = ('%', 'percents')
 UNIT_SECONDS = ('s', 'seconds')
 DEFAULT_UNIT = '%'
 
 FORMAT_DURATION = '{total:.{precision}f}s / {mean:.{precision}f}s'
 FORMAT_DIFF = '{total:.{precision}f}s / {mean:.{precision}f}s ({diff})'
+FORMAT_CLOCK = ('Clock: {clock.name} (resolution: {clock.resolution:.{precision}f}s,'
+                ' overhead: {clock.overhead:.{precision}f}s)')
+CLOCK_PRECISION = 9
+MEMORY_LABELS = (
+    ('retained', 'retained'),
+    ('retained_blocks', 'retained blocks'),
+    ('peak', 'peak'),
+    ('rss_growth', 'RSS growth'),
+)
+FORMAT_STATS = ('    {warmup}{rounds}×{number} · min {min:.{precision}f}s · median {median:.{precision}f}s'
+                ' · max {max:.{precision}f}s · ±{stdev:.{precision}f}s'
+                ' · p90 {p90:.{precision}f}s · p99 {p99:.{precision}f}s'
+                ' · {outliers} outliers')
+FORMAT_CONCURRENCY = ('    concurrency {level} · {ops:.1f} ops/s · latency p50 {p50:.{precision}f}s'
+                      ' · p90 {p90:.{precision}f}s · p99 {p99:.{precision}f}s')
 
 
 class CliReporter(BaseReporter):
     '''A reporter that display running benchmarks with ANSI colors'''
-    def __init__(self, ref=None, debug=False, unit=DEFAULT_UNIT, **kwargs):
+    def __init__(self, ref=None, debug=False, unit=DEFAULT_UNIT,
+                 threshold=DEFAULT_THRESHOLD, fail_on_regression=None, **kwargs):
         self._ref = ref
         self.debug = debug
         self.is_percent = unit in UNIT_PERCENTS
+        self.threshold = threshold
+        self.fail_on_regression = fail_on_regression
+        self.comparisons = []
+        self.regressions = []
         super(CliReporter, self).__init__(**kwargs)
 
     def start(self):
@@ -51,16 +100,55 @@ class CliReporter(BaseReporter):
             msg = 'Running {0} benchmarks'.format(nb_benchmarks)
         else:
             msg = 'Running {0} benchmark'.format(nb_benchmarks)
+        if self.runner.preflight:
+            self.findings(self.runner.preflight)
         click.echo(white(msg))
         click.echo(white('-' * len(msg)))
 
+    def findings(self, findings):
+        '''Display the stable mode preflight findings'''
+        warnings = [finding for finding in findings if finding.status != FINDING_OK]
+        for finding in findings:
+            if finding.status == FINDING_OK:
+                click.echo(green('{0} {1}'.format(OK, finding.message)))
+            else:
+                click.echo(yellow('{0} {1}'.format(WARNING, finding.message)))
+        if warnings:
+            msg = '{0} {1} preflight warning(s): the environment is noisy, results may be unstable'
+            click.echo(red(msg.format(WARNING, len(warnings))))
+
     def before_class(self, bench):
         label = '>>> {name} (x{times})'.format(name=bench.label,
                                                times=bench.times)
+        if bench.min_time:
+            label = '{0} (min. {1}s by round)'.format(label, bench.min_time)
+        if bench.threads and gil_enabled() is False:
+            label = '{0} (free-threaded)'.format(label)
+        if bench in self.runner.reused:
+            label = '{0} (reused, not affected by changes)'.format(label)
         click.echo(magenta(label))
+        if self.debug:
+            clock = FORMAT_CLOCK.format(clock=bench.timer, precision=CLOCK_PRECISION)
+            click.echo(cyan(clock))
 
     def after_class(self, bench):
-        pass
+        for method, fit in analyze(bench).items():
+            msg = '    {0}: {1} {2}'.format(bench.label_for(method), white(fit.order),
+                                         cyan('(rms: {0:.1%})'.format(fit.rms)))
+            click.echo(msg)
+        for method, rows in scaling(bench).items():
+            cells = ' · '.join('×{0} {1}'.format(threads, self.efficiency(efficiency))
+                               for threads, _, _, efficiency in rows)
+            click.echo('    {0} scaling: {1}'.format(bench.label_for(method), cells))
+
+    def efficiency(self, value):
+        '''Color a threads scaling efficiency'''
+        text = '{0:.0%}'.format(value)
+        if value >= 0.9:
+            return green(text)
+        elif value >= 0.5:
+            return yellow(text)
+        return red(text)
 
     def before_method(self, bench, method):
         label = cyan(bench.label_for(method))
@@ -71,9 +159,15 @@ class CliReporter(BaseReporter):
         click.echo('\r', nl=False)  # Clear the line
 
         results = bench.results[method]
-        mean = results.total / bench.times
         ref = self.ref(bench, method)
-        duration = self.duration(total=results.total, mean=mean, ref=ref)
+        duration = self.duration(results, ref)
+        if results.throughput is not None:
+            duration = ' · '.join((duration, self.throughput(results, bench.work_unit, ref)))
+        if ref and self.fail_on_regression is not None:
+            # The failure threshold may be lower than the display one
+            comparison = compare(results, ref, threshold=self.fail_on_regression)
+            if comparison.status == SLOWER:
+                self.regressions.append((bench.label, bench.label_for(method), comparison))
 
         if results.has_success and results.has_errors:
             status = ' '.join((yellow(WARNING), duration))
@@ -90,6 +184,20 @@ class CliReporter(BaseReporter):
         click.echo('{label:.<{size}} {status}'.format(label=cyan(label),
                                                       size=size,
                                                       status=status))
+        click.echo(self.stats(results))
+        if results.worker:
+            click.echo(cyan('    worker: {node} ({address}, {fingerprint})'.format(**results.worker)))
+        if results.concurrency:
+            click.echo(self.concurrency(results))
+        if results.gc:
+            click.echo(self.gc(results))
+        if results.fixtures:
+            click.echo(self.fixtures(results))
+        if results.memory:
+            click.echo(self.memory(results.memory, ref))
+        if results.profile:
+            for line in self.profile(results.profile):
+                click.echo(line)
         if self.debug and results.error:
             exc = results.error
             click.echo(yellow('Error: {0}'.format(type(exc))))
@@ -100,35 +208,124 @@ class CliReporter(BaseReporter):
             key = self.key(bench)
             return self._ref.get(key, {}).get('runs', {}).get(method, None)
 
-    def duration(self, total, mean, ref=None):
+    def duration(self, results, ref=None):
         if ref:
-            diff = self.diff(total, mean, ref)
-            duration = FORMAT_DIFF.format(total=total, mean=mean,
+            diff = self.diff(results, ref)
+            duration = FORMAT_DIFF.format(total=results.total, mean=results.mean,
                                           diff=diff, precision=self.precision)
         else:
-            duration = FORMAT_DURATION.format(total=total, mean=mean, precision=self.precision)
+            duration = FORMAT_DURATION.format(total=results.total, mean=results.mean, precision=self.precision)
         return duration
 
-    def diff(self, total, mean, ref):
-        diff = self._r(total) - self._r(ref['total'])
-        if diff > 0:
-            if self.is_percent:
-                msg = '+{0:.2%}'.format(diff / self._r(ref['total']))
-            else:
-                mean_diff = self._r(mean) - self._r(ref['mean'])
-                msg = '+{total:.{precision}f}s / +{mean:.{precision}f}s'
-                msg = msg.format(total=diff, mean=mean_diff, precision=self.precision)
-            return red(msg)
-        elif diff < 0:
-            if self.is_percent:
-                msg = '{0:.2%}'.format(diff / self._r(ref['total']))
-            else:
-                mean_diff = self._r(mean) - self._r(ref['mean'])
-                msg = '{total:.{precision}f}s / {mean:.{precision}f}s'
-                msg = msg.format(total=diff, mean=mean_diff, precision=self.precision)
-            return green(msg)
+    def throughput(self, results, unit, ref=None):
+        '''Format the throughput of a method results with the reference difference if any'''
+        text = humanize_rate(results.throughput, unit)
+        rate = ((ref or {}).get('throughput') or {}).get('rate')
+        if not rate:
+            return text
+        diff = results.throughput - rate
+        if self.is_percent:
+            msg = '{0:+.2%}'.format(diff / rate)
+        else:
+            msg = '{0}{1}'.format('+' if diff >= 0 else '', humanize_rate(diff, unit))
+        status = self.comparisons[-1].status if self.comparisons else None
+        if status == SLOWER:
+            msg = red(msg)
+        elif status == FASTER:
+            msg = green(msg)
         else:
+            msg = cyan(msg)
+        return '{0} ({1})'.format(text, msg)
+
+    def stats(self, results):
+        '''Format the detailed statistics line of a method results'''
+        warmup = '{0} warmup + '.format(results.warmup) if results.warmup else ''
+        return FORMAT_STATS.format(warmup=warmup,
+                                   rounds=results.rounds,
+                                   number=results.number,
+                                   min=results.min,
+                                   median=results.median,
+                                   max=results.max,
+                                   stdev=results.stdev,
+                                   p90=results.percentile(90),
+                                   p99=results.percentile(99),
+                                   outliers=sum(results.outliers),
+                                   precision=self.precision)
+
+    def concurrency(self, results):
+        '''Format the concurrency line of a method results'''
+        return FORMAT_CONCURRENCY.format(level=results.concurrency, ops=results.ops,
+                                         p50=results.latency(50), p90=results.latency(90), p99=results.latency(99),
+                                         precision=self.precision)
+
+    def gc(self, results):
+        '''Format the recorded garbage collections line of a method results'''
+        generations = ' · '.join('gen{0} {1}'.format(idx, count) for idx, count in enumerate(results.gc['generations']))
+        share = results.gc['pause'] / results.total if results.total else 0
+        return '    gc: {collections} collections ({generations}) · pause {pause:.{precision}f}s ({share:.1%})'.format(
+            collections=results.gc['collections'], generations=generations, pause=results.gc['pause'],
+            share=share, precision=self.precision)
+
+    def fixtures(self, results):
+        '''Format the fixtures overhead line of a method results'''
+        return '    fixtures: {0}'.format(' · '.join(
+            '{name} ({scope}) {calls}× {total:.{precision}f}s{refills}'.format(
+                name=name, scope=stats['scope'], calls=stats['calls'], total=stats['total'], precision=self.precision,
+                refills=' ({0} refills)'.format(stats['refills']) if 'refills' in stats else '')
+            for name, stats in sorted(results.fixtures.items())
+        ))
+
+    def profile(self, profile):
+        '''Format the hottest functions lines of a method profile'''
+        yield '    profile ({0}, {1} calls):'.format(profile['profiler'], profile['calls'])
+        if not profile['top']:
+            yield cyan('    no samples')
+            return
+        yield cyan('    {0:>7}  {1:>7}  {2}'.format('own', 'cumul.', 'function'))
+        for row in profile['top']:
+            yield '    {0:>7.1%}  {1:>7.1%}  {2}'.format(row['own'], row['cumulative'], row['function'])
+
+    def memory(self, memory, ref=None):
+        '''Format the memory usage line of a method results with the reference difference if any'''
+        ref = (ref or {}).get('memory') or {}
+        parts = []
+        for field, label in MEMORY_LABELS:
+            value = memory.get(field)
+            if value is None:
+                continue
+            text = str(value) if field == 'retained_blocks' else humanize_bytes(value)
+            if ref.get(field) is not None:
+                text = '{0} ({1})'.format(text, self.memory_diff(value, ref[field]))
+            parts.append('{0} {1}'.format(label, text))
+        return '    memory: {0}'.format(' · '.join(parts))
+
+    def memory_diff(self, value, ref):
+        diff = value - ref
+        if diff == 0:
             return cyan('---')
+        if self.is_percent and ref:
+            msg = '{0:+.2%}'.format(diff / ref)
+        else:
+            msg = '{0:+d}'.format(diff)
+        return red(msg) if diff > 0 else green(msg)
+
+    def diff(self, results, ref):
+        '''Format the difference from the reference colored according to its significance'''
+        comparison = compare(results, ref, threshold=self.threshold)
+        self.comparisons.append(comparison)
+        if self.is_percent:
+            msg = '{change:+.2%} ±{error:.2%}'.format(change=comparison.change,
+                                                     error=(comparison.high - comparison.low) / 2)
+        else:
+            msg = '{total:+.{precision}f}s / {mean:+.{precision}f}s'
+            msg = msg.format(total=self._r(results.total) - self._r(ref['total']),
+                             mean=self._r(results.mean) - self._r(ref['mean']),
+                             precision=self.precision)
+        if comparison.status == SLOWER:
+            return red(msg)
+        elif comparison.status == FASTER:
+            return green(msg)
+        return cyan(msg)
 
     def _r(self, value):
         '''Round a value according defined precision'''
@@ -138,7 +335,135 @@ class CliReporter(BaseReporter):
         self.bar.update(times)
 
     def end(self):
-        click.echo(green(' '.join((OK, 'Done'))))
+        if self.runner.stable:
+            self.noisy()
+        if self.regressions:
+            msg = '{0} {1} performance regression(s) detected'.format(KO, len(self.regressions))
+            click.echo(red(msg))
+            for bench, method, comparison in self.regressions:
+                click.echo(red('    {0} / {1}: {2:+.2%}'.format(bench, method, comparison.change)))
+        else:
+            click.echo(green(' '.join((OK, 'Done'))))
+
+    def noisy(self):
+        '''Warn about the methods too noisy to detect a change of the requested threshold'''
+        noisy = [(bench, method, noise(bench.results[method]))
+                 for bench in self.runner.runned for method in sorted(bench.results)
+                 if noise(bench.results[method]) > self.threshold]
+        if not noisy:
+            return
+        msg = '{0} {1} method(s) too noisy to detect a {2:.2%} change'.format(WARNING, len(noisy), self.threshold)
+        click.echo(red(msg))
+        for bench, method, value in noisy:
+            click.echo(red('    {0} / {1}: ±{2:.2%}'.format(bench.label, bench.label_for(method), value)))
+
+
+def threshold(value):
+    '''Parse a threshold option value'''
+    if value is None:
+        return None
+    try:
+        return parse_threshold(value)
+    except ValueError:
+        raise click.BadParameter('{0} is neither a ratio nor a percentage'.format(value))
+
+
+def threads(value):
+    '''Parse a comma separated threads counts option value'''
+    if not value:
+        return None
+    try:
+        counts = [int(count) for count in value.split(',')]
+    except ValueError:
+        raise click.BadParameter('{0} is not a comma separated list of integers'.format(value))
+    if any(count < 1 for count in counts):
+        raise click.BadParameter('threads counts should be positive')
+    return counts
+
+
+def cpus(value):
+    '''Parse a CPU list option value (ie. ``2,3`` or ``2-3``)'''
+    if not value:
+        return None
+    try:
+        parsed = parse_cpus(value)
+    except ValueError:
+        raise click.BadParameter('{0} is not a valid CPU list'.format(value))
+    unavailable = [cpu for cpu in parsed if cpu not in available_cpus()]
+    if unavailable or not parsed:
+        raise click.BadParameter('CPU {0} not available'.format(','.join(map(str, unavailable)) or value))
+    return parsed
+
+
+def workers(value):
+    '''Parse a comma separated workers addresses option value'''
+    if not value:
+        return None
+    try:
+        return [parse_address(address) for address in value.split(',')]
+    except ValueError:
+        raise click.BadParameter('{0} is not a comma separated list of host:port addresses'.format(value))
+
+
+def expression(value):
+    '''Parse a selection expression option value'''
+    if not value:
+        return None
+    try:
+        Expression(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    return value
+
+
+def list_benchmarks(runner):
+    '''Print the collected benchmarks methods without running them'''
+    count = 0
+    for benchmark in runner.benchmarks:
+        prefix = '::'.join(filter(None, (runner.sources.get(benchmark), benchmark.__name__)))
+        for method, tags in runner.collect(benchmark):
+            line = '::'.join((prefix, method))
+            if tags:
+                line = ' '.join((line, cyan('[{0}]'.format(', '.join(tags)))))
+            click.echo(line)
+            count += 1
+    click.echo(white('{0} method(s) collected'.format(count)))
+
+
+def check_reference(ref, allow_incompatible=False, packages=KEY_PACKAGES):
+    '''
+    Warn about the reference environment differences
+    and exit if it is incompatible (unless allowed).
+
+    :param packages: the packages whose versions are compared
+    :type packages: list
+    '''
+    environment = environment_of(ref)
+    if not environment:
+        click.echo(yellow('{0} The reference has no environment information'.format(WARNING)))
+        return
+    differences = compare_environments(environment, probe(packages))
+    incompatible = [d for d in differences if not d.compatible]
+    for difference in differences:
+        style = yellow if difference.compatible else red
+        if difference.field == 'load_average':
+            msg = '{0} The machine was busy (load average: {2}, reference: {3})'
+        else:
+            msg = '{0} {1} differs from the reference: {2} (reference: {3})'
+        click.echo(style(msg.format(WARNING, difference.field, difference.current, difference.reference)))
+    if incompatible and not allow_incompatible:
+        click.echo(red('{0} The reference comes from an incompatible environment '
+                       '(use --allow-incompatible to compare anyway)'.format(KO)))
+        sys.exit(EXIT_INCOMPATIBLE)
+
+
+def check_baseline(ref):
+    '''Warn about the history baselines coming from other machines'''
+    machine = fingerprint()
+    for key, bench in sorted(ref.items()):
+        if bench.get('machine') != machine:
+            msg = '{0} The {1} baseline comes from another machine ({2})'
+            click.echo(yellow(msg.format(WARNING, key, bench.get('machine') or 'unknown')))
 
 
 def resolve_pattern(pattern):
@@ -148,39 +473,280 @@ def resolve_pattern(pattern):
     return recursive_glob(pattern)
 
 
+@click.group(context_settings=CONTEXT_SETTINGS)
+def main():
+    '''MiniBench command line interface'''
+    pass
+
+
 @click.command(context_settings=CONTEXT_SETTINGS)
 @click.argument('patterns', nargs=-1)
 @click.option('-t', '--times', type=click.INT, help='How many times to run benchmarks')
 @click.option('--json', type=click.Path(), help='Output results as JSON')
+@click.option('--jsonl', type=click.Path(), help='Stream results as JSON Lines while running')
+@click.option('--jsonl-samples', type=click.INT, help='Also stream the new samples every this number of rounds')
 @click.option('--csv', type=click.Path(), help='Output results as CSV')
 @click.option('--rst', type=click.Path(), help='Output results as reStructuredText')
 @click.option('--md', type=click.Path(), help='Output results as Markdown')
-@click.option('-r', '--ref', type=click.File('r'), help='A previous run result in JSON')
+@click.option('-r', '--ref', type=click.File('r'), help='A previous run result in JSON or JSON Lines')
+@click.option('--allow-incompatible', is_flag=True,
+              help='Compare against a reference from an incompatible environment (machine or interpreter)')
+@click.option('--history', type=click.Path(), help='Append results to this history database')
+@click.option('--baseline', is_flag=True,
+              help='Use the best baseline from the history database as reference (if no --ref given)')
+@click.option('--any-machine', is_flag=True,
+              help='Fall back on the results of other machines for the --baseline of methods never run on this one')
 @click.option('-u', '--unit', default=DEFAULT_UNIT,
               type=click.Choice(UNIT_PERCENTS + UNIT_SECONDS),
               help='Unit to display difference from reference')
+@click.option('--threshold', default=str(DEFAULT_THRESHOLD), callback=lambda c, p, v: threshold(v),
+              help='Minimum significant change from reference as a ratio or a percentage (default: {0:.0%})'.format(
+                  DEFAULT_THRESHOLD))
+@click.option('--fail-on-regression', callback=lambda c, p, v: threshold(v),
+              help='Exit with an error code if a method is significantly slower than the reference by this change '
+                   '(ie. 5%)')
 @click.option('-p', '--precision', type=click.INT, default=DEFAULT_PRECISION,
               help='Precision used (number of digits)')
+@click.option('--min-time', type=click.FLOAT,
+              help='Calibrate calls by round until a round lasts at least this duration (in seconds)')
+@click.option('--max-time', type=click.FLOAT, help='Time budget for each method (in seconds)')
+@click.option('--max-suite-time', type=click.FLOAT, help='Time budget for each benchmark class (in seconds)')
+@click.option('-b', '--batch', is_flag=True, default=None,
+              help='Time each round calls in a single tight loop')
+@click.option('-w', '--warmup', type=click.INT, help='How many untimed warmup rounds to run before measuring')
+@click.option('--auto-warmup', is_flag=True, default=None, help='Warmup until the rolling mean is stable')
+@click.option('--warmup-tolerance', type=click.FLOAT,
+              help='Relative tolerance of the auto warmup rolling mean (default: {0})'.format(DEFAULT_WARMUP_TOLERANCE))
+@click.option('-m', '--memory', is_flag=True, default=None,
+              help='Measure each method memory usage (retained memory, peak and RSS growth)')
+@click.option('--concurrency', type=click.INT,
+              help='Run this number of concurrent operations by coroutine method call')
+@click.option('--threads', callback=lambda c, p, v: threads(v),
+              help='Call each method at once from these comma separated threads counts (ie. 1,2,4,8)')
+@click.option('--profile', type=click.Choice(PROFILERS),
+              help='Profile each method during extra untimed iterations')
+@click.option('--profile-top', type=click.INT, default=DEFAULT_TOP,
+              help='How many hottest functions to display (default: {0})'.format(DEFAULT_TOP))
+@click.option('--profile-dir', type=click.Path(),
+              help='Where to write profiles (default: next to the file reports or the current directory)')
+@click.option('--gc', 'gc_mode', type=click.Choice(GC_MODES),
+              help='The garbage collector policy during timing (default: {0})'.format(DEFAULT_GC_MODE))
+@click.option('-c', '--clock', type=click.Choice(available_clocks()),
+              help='The clock used to time benchmarks (default: {0})'.format(DEFAULT_CLOCK))
+@click.option('-j', '--jobs', type=click.INT, default=1,
+              help='Run benchmarks on this number of worker processes')
+@click.option('--by-method', is_flag=True, help='Dispatch individual methods instead of classes to workers')
+@click.option('-i', '--isolate', is_flag=True, help='Run each benchmark in a freshly spawned interpreter')
+@click.option('--workers', callback=lambda c, p, v: workers(v),
+              help='Run benchmarks on these comma separated remote workers (ie. lab1:{0},lab2:{0})'.format(
+                  DEFAULT_PORT))
+@click.option('--stable', is_flag=True,
+              help='Check the system noise, pin the process and raise its priority before running')
+@click.option('--cpus', callback=lambda c, p, v: cpus(v),
+              help='Pin benchmarks (or worker processes) on these CPUs (ie. 2,3 or 2-3)')
+@click.option('--cache', type=click.Path(), default=DEFAULT_CACHE,
+              help='The benchmarks discovery cache file (default: {0})'.format(DEFAULT_CACHE))
+@click.option('--no-cache', is_flag=True, help='Do not use the benchmarks discovery cache')
+@click.option('-k', '--keyword', callback=lambda c, p, v: expression(v),
+              help='Only run methods whose class or method name match this expression (ie. "sort and not stupid")')
+@click.option('-M', '--markers', callback=lambda c, p, v: expression(v),
+              help='Only run methods whose tags match this expression (ie. "not slow")')
+@click.option('--list', 'list_only', is_flag=True, help='List the collected methods without running them')
+@click.option('--since', help='Only run benchmarks affected by the files changed since this git revision')
+@click.option('--changed', multiple=True, type=click.Path(),
+              help='Only run benchmarks affected by this changed file (can be repeated)')
+@click.option('--deps', type=click.Path(),
+              help='Record benchmarks dependencies and last results into this index '
+                   '(default: {0} with --since or --changed)'.format(DEFAULT_DEPENDENCIES))
+@click.option('--no-deps', is_flag=True, help='Do not record nor use the dependency index')
+@click.option('--package', 'packages', multiple=True,
+              help='Record the version of this benchmarked package in the environment (can be repeated)')
 @click.option('-d', '--debug', is_flag=True, help='Run in debug (verbose, stop on error)')
-def cli(patterns, times, json, csv, rst, md, ref, unit, precision, debug):
+def cli(patterns, times, json, jsonl, jsonl_samples, csv, rst, md, ref, allow_incompatible, history, baseline,
+        any_machine, unit,
+        threshold, fail_on_regression, precision, min_time, max_time, max_suite_time, batch,
+        warmup, auto_warmup, warmup_tolerance, memory, concurrency, threads, profile, profile_top, profile_dir,
+        gc_mode, clock, jobs, by_method, isolate, workers, stable, cpus, cache, no_cache, keyword, markers, list_only,
+        since, changed, deps, no_deps, packages, debug):
     '''Execute minibench benchmarks'''
-    if ref:
-        ref = JSON.load(ref)
-
     filenames = []
-    reporters = [CliReporter(ref=ref, debug=debug, unit=unit, precision=precision)]
-    kwargs = {}
     for pattern in patterns or ['**/*.bench.py']:
         filenames.extend(resolve_pattern(pattern))
+    if list_only:
+        runner = BenchmarkRunner(*filenames, lazy=True, cache=None if no_cache else cache,
+                                 keyword=keyword, markers=markers)
+        list_benchmarks(runner)
+        return
+
+    if threads and clock in THREAD_CLOCKS:
+        raise click.BadParameter('the {0} clock can\'t time threaded calls'.format(clock), param_hint='--clock')
+
+    if cpus and jobs > len(cpus) and not isolate and not workers:
+        msg = '{0} jobs would share {1} CPU(s): give at least as many CPUs as jobs'
+        raise click.BadParameter(msg.format(jobs, len(cpus)), param_hint='--cpus')
+    elif jobs > len(available_cpus()) and not isolate and not workers:
+        msg = '{0} {1} jobs share {2} CPU(s): worker processes are not pinned and disturb each other'
+        click.echo(yellow(msg.format(WARNING, jobs, len(available_cpus()))))
+
+    changed = list(changed) if changed else None
+    if since:
+        try:
+            changed = (changed or []) + changed_files(since)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint='--since')
+    if changed is not None and not deps:
+        deps = DEFAULT_DEPENDENCIES
+
+    if ref:
+        ref = load_summary(ref)
+        check_reference(ref, allow_incompatible, KEY_PACKAGES + packages)
+    elif baseline:
+        with History(history or DEFAULT_HISTORY) as db:
+            ref = db.baseline(machine=fingerprint(), exclude_commit=git_commit(), any_machine=any_machine)
+        if ref:
+            check_baseline(ref)
+            check_reference(ref, allow_incompatible, KEY_PACKAGES + packages)
+
+    reporter = CliReporter(ref=ref, debug=debug, unit=unit, precision=precision,
+                           threshold=threshold, fail_on_regression=fail_on_regression)
+    reporters = [reporter]
+    kwargs = {}
     if json:
         reporters.append(JsonReporter(json, precision=precision))
+    if jsonl:
+        reporters.append(JsonLinesReporter(jsonl, samples=jsonl_samples, precision=precision))
     if csv:
         reporters.append(CsvReporter(csv, precision=precision))
     if rst:
         reporters.append(RstReporter(rst, precision=precision))
     if md:
         reporters.append(MarkdownReporter(md, precision=precision))
+    if history:
+        reporters.append(HistoryReporter(history, precision=precision))
+    if profile:
+        outputs = [output for output in (json, jsonl, csv, rst, md) if output]
+        directory = profile_dir or (os.path.dirname(outputs[0]) if outputs else None) or '.'
+        reporters.append(ProfileReporter(directory, precision=precision))
+        kwargs['profile'] = profile
+        kwargs['profile_top'] = profile_top
     if times:
         kwargs['times'] = times
-    runner = BenchmarkRunner(*filenames, reporters=reporters, debug=debug)
+    if batch:
+        kwargs['batch'] = batch
+    if warmup is not None:
+        kwargs['warmup'] = warmup
+    if auto_warmup:
+        kwargs['warmup_auto'] = auto_warmup
+    if warmup_tolerance:
+        kwargs['warmup_tolerance'] = warmup_tolerance
+    if memory:
+        kwargs['memory'] = memory
+    if concurrency:
+        kwargs['concurrency'] = concurrency
+    if threads:
+        kwargs['threads'] = threads
+    if gc_mode:
+        kwargs['gc_mode'] = gc_mode
+    if clock:
+        kwargs['clock'] = clock
+    if min_time:
+        kwargs['min_time'] = min_time
+    if max_time:
+        kwargs['max_time'] = max_time
+    if max_suite_time:
+        kwargs['max_suite_time'] = max_suite_time
+    # Calibrate the clock once before any benchmark runs
+    get_clock(clock or DEFAULT_CLOCK)
+    runner = BenchmarkRunner(*filenames, reporters=reporters, debug=debug, jobs=jobs, by_method=by_method,
+                             isolate=isolate, workers=workers, stable=stable, cpus=cpus,
+                             lazy=True, cache=None if no_cache else cache,
+                             keyword=keyword, markers=markers,
+                             dependencies=None if no_deps else deps, changed=changed, packages=packages)
     runner.run(**kwargs)
+    if reporter.regressions:
+        sys.exit(EXIT_REGRESSION)
+
+
+main.add_command(cli, 'run')
+
+
+def format_entry(entry, precision=DEFAULT_PRECISION):
+    '''Format a single history entry'''
+    date = datetime.fromtimestamp(entry.timestamp).strftime('%Y-%m-%d %H:%M:%S')
+    commit = (entry.git_commit or '-')[:10]
+    return '{date}  {commit: <10}  {mean:.{precision}f}s ±{stdev:.{precision}f}s  (x{rounds})'.format(
+        date=date, commit=commit, mean=entry.mean, stdev=entry.stdev or 0, rounds=entry.rounds,
+        precision=precision)
+
+
+@main.group(context_settings=CONTEXT_SETTINGS)
+@click.option('--db', type=click.Path(), default=DEFAULT_HISTORY, help='The history database')
+@click.pass_context
+def history(ctx, db):
+    '''Query the results history'''
+    ctx.obj = db
+
+
+@history.command()
+@click.option('-k', '--key', help='Only display this benchmark key')
+@click.option('-m', '--method', help='Only display this method')
+@click.option('-n', '--limit', type=click.INT, default=10, help='How many recent runs to display (0 for all)')
+@click.option('-p', '--precision', type=click.INT, default=DEFAULT_PRECISION, help='Precision used (number of digits)')
+@click.pass_obj
+def trend(db, key, method, limit, precision):
+    '''Display methods results over time'''
+    with History(db) as store:
+        for bench, name in store.methods():
+            if (key and bench != key) or (method and name != method):
+                continue
+            click.echo(magenta('>>> {0} / {1}'.format(bench, name)))
+            for entry in store.trend(bench, name, limit=limit):
+                click.echo(format_entry(entry, precision))
+
+
+@history.command()
+@click.option('-p', '--precision', type=click.INT, default=DEFAULT_PRECISION, help='Precision used (number of digits)')
+@click.pass_obj
+def extremes(db, precision):
+    '''Display the fastest and slowest run ever of each method'''
+    with History(db) as store:
+        for bench, name in store.methods():
+            click.echo(magenta('>>> {0} / {1}'.format(bench, name)))
+            click.echo(' '.join((green('fastest'), format_entry(store.fastest(bench, name), precision))))
+            click.echo(' '.join((red('slowest'), format_entry(store.slowest(bench, name), precision))))
+
+
+@history.command()
+@click.option('-o', '--output', type=click.File('w'), default='-', help='The output JSON file (default: stdout)')
+@click.option('--any-machine', is_flag=True,
+              help='Fall back on the results of other machines for methods never run on this one')
+@click.pass_obj
+def baseline(db, output, any_machine):
+    '''Export the best baseline as a JSON reference'''
+    with History(db) as store:
+        JSON.dump(store.baseline(machine=fingerprint(), exclude_commit=git_commit(), any_machine=any_machine), output)
+
+
+@main.command(context_settings=CONTEXT_SETTINGS)
+@click.option('--host', default=DEFAULT_HOST, help='The listening interface (default: {0})'.format(DEFAULT_HOST))
+@click.option('--port', type=click.INT, default=DEFAULT_PORT,
+              help='The listening port (default: {0})'.format(DEFAULT_PORT))
+@click.option('--root', type=click.Path(exists=True, file_okay=False),
+              help='The directory relative benchmark files are resolved from (default: the current directory)')
+@click.option('--stable', is_flag=True,
+              help='Check the system noise, pin the worker and raise its priority before serving')
+@click.option('--cpus', callback=lambda c, p, v: cpus(v), help='Pin the worker on these CPUs (ie. 2,3 or 2-3)')
+def worker(host, port, root, stable, cpus):
+    '''Run benchmarks submitted by a coordinator (see run --workers)'''
+    if stable:
+        CliReporter().findings(stabilize(cpus or default_cpus()))
+    elif cpus:
+        pin(set(cpus))
+    server = Worker(host, port, root)
+    click.echo(green('Worker {0} listening on {1}'.format(server.fingerprint, server.address)))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+'''
+Clocks used to time benchmarks.
+
+Each clock wraps the best available implementation on the running platform,
+prefering the integer nanoseconds variants to avoid float precision loss.
+'''
+from __future__ import unicode_literals, division
+
+import sys
+import time
+
+DEFAULT_CLOCK = 'perf_counter'
+#: The clocks only measuring the calling thread (unable to time calls spread over many threads)
+THREAD_CLOCKS = ('thread_time',)
+
+#: How many consecutive reads are used to measure a clock overhead
+CALIBRATION_READS = 10000
+#: How many ticks are observed to measure a clock resolution
+CALIBRATION_TICKS = 20
+
+if sys.platform == "win32":  # pragma: no cover
+    # On Windows, the best legacy timer is time.clock()
+    _legacy = getattr(time, 'clock', time.time)
+else:
+    # On most other platforms the best legacy timer is time.time()
+    _legacy = time.time
+
+
+def _candidates(name, fallback=None):
+    '''Yield the (function, scale) candidates for a given clock name by order of preference'''
+    if hasattr(time, name + '_ns'):
+        yield getattr(time, name + '_ns'), 1e-9
+    if hasattr(time, name):
+        yield getattr(time, name), 1
+    if fallback:
+        yield fallback, 1
+
+
+CANDIDATES = {
+    'perf_counter': lambda: _candidates('perf_counter', _legacy),
+    'process_time': lambda: _candidates('process_time', getattr(time, 'clock', None)),
+    'thread_time': lambda: _candidates('thread_time'),
+}
+
+
+class Clock(object):
+    '''
+    A timer wrapper able to measure its own resolution and overhead.
+
+    Durations are computed from raw reads to keep timing loops as cheap as possible:
+
+    .. code-block:: python
+
+        tick = clock.read()
+        do_something()
+        duration = (clock.read() - tick) * clock.scale
+    '''
+    def __init__(self, name, read, scale=1):
+        '''
+        :param name: the clock name
+        :type name: string
+        :param read: the raw clock reading function
+        :param scale: the factor converting raw reads into seconds
+        :type scale: float
+        '''
+        self.name = name
+        self.read = read
+        self.scale = scale
+        self.resolution = None
+        self.overhead = None
+
+    def __call__(self):
+        '''Read the clock in seconds'''
+        return self.read() * self.scale
+
+    def __repr__(self):
+        return '<Clock {0}>'.format(self.name)
+
+    def calibrate(self, reads=CALIBRATION_READS, ticks=CALIBRATION_TICKS):
+        '''
+        Measure the clock resolution and its reading overhead (both in seconds).
+
+        The resolution is the smallest non-zero difference between two consecutive reads.
+        The overhead is the mean cost of a single read.
+        '''
+        read = self.read
+        resolution = None
+        for _ in range(ticks):
+            first = read()
+            second = read()
+            while second == first:
+                second = read()
+            delta = second - first
+            if resolution is None or delta < resolution:
+                resolution = delta
+        self.resolution = resolution * self.scale
+
+        tick = read()
+        for _ in range(reads):
+            read()
+        self.overhead = (read() - tick) * self.scale / reads
+        return self
+
+    def to_dict(self):
+        '''Serialize the clock properties'''
+        return {
+            'name': self.name,
+            'resolution': self.resolution,
+            'overhead': self.overhead,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        '''
+        Restore a clock serialized by :meth:`to_dict` (ie. measured in another process).
+
+        The clock is readable if it is available on this platform.
+        '''
+        read, scale = next(iter(CANDIDATES.get(data['name'], lambda: [])()), (None, 1))
+        clock = cls(data['name'], read, scale)
+        clock.resolution = data['resolution']
+        clock.overhead = data['overhead']
+        return clock
+
+
+_clocks = {}
+
+
+def available_clocks():
+    '''List the clock names available on this platform'''
+    return [name for name in sorted(CANDIDATES) if any(True for _ in CANDIDATES[name]())]
+
+
+def get_clock(name=DEFAULT_CLOCK):
+    '''
+    Get a calibrated clock given its name.
+
+    Clocks are calibrated only once on first access.
+
+    :raises ValueError: if the clock does not exists or is not available on this platform
+    '''
+    if name not in _clocks:
+        if name not in CANDIDATES:
+            raise ValueError('Unknown clock "{0}"'.format(name))
+        for read, scale in CANDIDATES[name]():
+            _clocks[name] = Clock(name, read, scale).calibrate()
+            break
+        else:
+            raise ValueError('Clock "{0}" is not available on this platform'.format(name))
+    return _clocks[name]
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+'''
+Garbage collector policies applied while timing benchmark methods.
+
+- ``enabled``: the garbage collector is left untouched
+- ``disabled``: the garbage collector is disabled during the timed rounds (as :mod:`timeit` does)
+- ``collect``: a full collection is performed before each timed round (outside of the timing)
+- ``record``: the garbage collector is left enabled but its collections and pauses are recorded
+  using :data:`gc.callbacks` (Python 3.3+)
+'''
+from __future__ import unicode_literals
+
+import gc
+
+from timeit import default_timer
+
+GC_ENABLED = 'enabled'
+GC_DISABLED = 'disabled'
+GC_COLLECT = 'collect'
+GC_RECORD = 'record'
+GC_MODES = (GC_ENABLED, GC_DISABLED, GC_COLLECT, GC_RECORD)
+
+DEFAULT_GC_MODE = GC_ENABLED
+
+
+def check(mode):
+    '''
+    Ensure a garbage collector mode is known and supported.
+
+    :raises ValueError: if the mode is unknown
+    :raises RuntimeError: if the mode is not supported by this interpreter
+    '''
+    if mode not in GC_MODES:
+        raise ValueError('Unknown GC mode {0} (available: {1})'.format(mode, ', '.join(GC_MODES)))
+    if mode == GC_RECORD and not hasattr(gc, 'callbacks'):
+        raise RuntimeError('Recording the garbage collector requires Python 3.3+')
+    return mode
+
+
+class Policy(object):
+    '''
+    Apply a garbage collector mode while in its context.
+
+    :meth:`before_round` should be called before each timed round.
+    '''
+    def __init__(self, mode=DEFAULT_GC_MODE):
+        self.mode = check(mode)
+        self.collections = 0
+        self.pause = 0
+        self.generations = [0] * len(gc.get_threshold())
+        self._was_enabled = None
+        self._started = None
+
+    def __enter__(self):
+        if self.mode == GC_DISABLED:
+            self._was_enabled = gc.isenabled()
+            gc.disable()
+        elif self.mode == GC_RECORD:
+            gc.callbacks.append(self.callback)
+        return self
+
+    def __exit__(self, *args):
+        if self.mode == GC_DISABLED and self._was_enabled:
+            gc.enable()
+        elif self.mode == GC_RECORD:
+            gc.callbacks.remove(self.callback)
+
+    def before_round(self):
+        '''Hook called before each timed round'''
+        if self.mode == GC_COLLECT:
+            gc.collect()
+
+    def callback(self, phase, info):
+        if phase == 'start':
+            self._started = default_timer()
+        elif self._started is not None:
+            self.pause += default_timer() - self._started
+            self.collections += 1
+            generation = info.get('generation', 0)
+            if generation < len(self.generations):
+                self.generations[generation] += 1
+            self._started = None
+
+    @property
+    def recorded(self):
+        '''The recorded collections as a dictionnary (``None`` if not in ``record`` mode)'''
+        if self.mode != GC_RECORD:
+            return None
+        return {
+            'collections': self.collections,
+            'pause': self.pause,
+            'generations': list(self.generations),
+        }
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+'''
+Statistical comparison of a method results against a reference run.
+
+When both runs provide their samples, the difference significance is tested
+with a Mann-Whitney U test (normal approximation with ties correction).
+Otherwise, a Welch test is performed on the summary statistics.
+
+The reference environment is also compared with the current one (see :func:`compare_environments`)
+because results from different machines or interpreters are not comparable.
+'''
+from __future__ import unicode_literals, division
+
+import math
+
+from collections import namedtuple
+
+FASTER = 'faster'
+SLOWER = 'slower'
+UNCHANGED = 'unchanged'
+
+#: The minimum relative change to consider a method faster or slower
+DEFAULT_THRESHOLD = 0.02
+#: The significance level
+DEFAULT_ALPHA = 0.05
+
+#: The two-sided normal quantiles by confidence level
+Z_SCORES = {
+    0.90: 1.6449,
+    0.95: 1.9600,
+    0.99: 2.5758,
+}
+
+#: A comparison result.
+#: ``change`` is the relative mean change with its confidence interval bounds ``low`` and ``high``.
+#: ``pvalue`` is ``None`` if the reference does not provide enough data to test significance.
+Comparison = namedtuple('Comparison', ('status', 'change', 'low', 'high', 'pvalue'))
+
+Description = namedtuple('Description', ('mean', 'stdev', 'size', 'samples'))
+
+#: The environment fields which must be equal to compare runs
+INCOMPATIBLE_FIELDS = ('system', 'machine', 'cpu_model', 'cpu_count', 'python_implementation')
+#: The environment fields which may influence the results when they differ
+WARNING_FIELDS = ('node', 'release', 'python_version', 'python_build', 'python_compiler', 'python_debug',
+                  'gil', 'governor', 'turbo', 'aslr')
+#: The 1 minute load average by CPU above which a machine is considered busy
+BUSY_LOAD = 0.5
+
+#: An environment difference between the reference and the current run.
+#: ``compatible`` is ``False`` if runs should not be compared.
+Difference = namedtuple('Difference', ('field', 'reference', 'current', 'compatible'))
+
+
+def normal_cdf(z):
+    '''The standard normal cumulative distribution function'''
+    return 0.5 * math.erfc(-z / math.sqrt(2))
+
+
+def describe(data):
+    '''Describe a :class:`~minibench.benchmark.Result` or a summary run dictionnary'''
+    if isinstance(data, dict):
+        samples = data.get('samples')
+        size = len(samples) if samples else data.get('rounds', 0)
+        return Description(data['mean'], data.get('stdev'), size, samples)
+    return Description(data.mean, data.stdev, data.rounds, data.samples)
+
+
+def mann_whitney(first, second):
+    '''
+    Perform a two-sided Mann-Whitney U test using the normal approximation.
+
+    :returns: the p-value
+    :rtype: float
+    '''
+    n1, n2 = len(first), len(second)
+    if not n1 or not n2:
+        return 1.
+    values = sorted([(v, 0) for v in first] + [(v, 1) for v in second])
+    # Compute average ranks handling ties
+    rank_sum = 0
+    ties = 0
+    idx = 0
+    total = len(values)
+    while idx < total:
+        end = idx
+        while end + 1 < total and values[end + 1][0] == values[idx][0]:
+            end += 1
+        rank = (idx + end) / 2 + 1
+        count = end - idx + 1
+        rank_sum += rank * sum(1 for _, group in values[idx:end + 1] if group == 0)
+        ties += count ** 3 - count
+        idx = end + 1
+    u = rank_sum - n1 * (n1 + 1) / 2
+    mu = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((total + 1) - ties / (total * (total - 1))) if total > 1 else 0
+    if variance <= 0:
+        return 1.
+    z = (abs(u - mu) - 0.5) / math.sqrt(variance)
+    return min(1., 2 * (1 - normal_cdf(max(z, 0))))
+
+
+def welch(first, second):
+    '''
+    Perform a two-sided Welch test (normal approximation) on two descriptions.
+
+    :returns: the p-value or ``None`` if the descriptions lack data
+    '''
+    if first.stdev is None or second.stdev is None or first.size < 2 or second.size < 2:
+        return None
+    error = math.sqrt(first.stdev ** 2 / first.size + second.stdev ** 2 / second.size)
+    if not error:
+        return 0. if first.mean != second.mean else 1.
+    z = abs(first.mean - second.mean) / error
+    return 2 * (1 - normal_cdf(z))
+
+
+def compare(current, reference, threshold=DEFAULT_THRESHOLD, alpha=DEFAULT_ALPHA):
+    '''
+    Compare a method results against its reference.
+
+    A method is considered faster or slower only if the difference is significant
+    (p-value lower than ``alpha``) and greater than ``threshold``.
+
+    :param current: the current method results
+    :type current: Result or dict
+    :param reference: the reference method results
+    :type reference: Result or dict
+    :param threshold: the minimum relative change to consider
+    :type threshold: float
+    :param alpha: the significance level
+    :type alpha: float
+    :rtype: Comparison
+    '''
+    first, second = describe(current), describe(reference)
+    if not second.mean:
+        return Comparison(UNCHANGED, 0., 0., 0., None)
+
+    change = (first.mean - second.mean) / second.mean
+    low = high = change
+    if first.stdev is not None and second.stdev is not None and first.size and second.size:
+        z = Z_SCORES.get(round(1 - alpha, 2), Z_SCORES[0.95])
+        error = math.sqrt(first.stdev ** 2 / first.size + second.stdev ** 2 / second.size)
+        low, high = change - z * error / second.mean, change + z * error / second.mean
+
+    if first.samples and second.samples:
+        pvalue = mann_whitney(first.samples, second.samples)
+    else:
+        pvalue = welch(first, second)
+
+    significant = pvalue is None or pvalue < alpha
+    if significant and change >= threshold:
+        status = SLOWER
+    elif significant and change <= -threshold:
+        status = FASTER
+    else:
+        status = UNCHANGED
+    return Comparison(status, change, low, high, pvalue)
+
+
+def parse_threshold(value):
+    '''
+    Parse a threshold given either as a ratio (``0.05``) or as a percentage (``5%``).
+
+    :raises ValueError: if the value is not a valid threshold
+    '''
+    value = str(value).strip()
+    if value.endswith('%'):
+        return float(value[:-1]) / 100
+    return float(value)
+
+
+def python_release(version):
+    '''The ``major.minor`` part of a Python version'''
+    return '.'.join(str(version).split('.')[:2])
+
+
+def busy(environment):
+    '''Wether the environment load average was high'''
+    load, cpus = environment.get('load_average'), environment.get('cpu_count')
+    return bool(load and cpus and load[0] / cpus > BUSY_LOAD)
+
+
+def compare_environments(reference, current):
+    '''
+    List the differences between a reference environment and the current one
+    (as probed by :func:`~minibench.environment.probe`).
+
+    Unknown values are ignored. Different Python ``major.minor`` versions are incompatible.
+    A busy machine (see :data:`BUSY_LOAD`) is reported as a compatible ``load_average`` difference.
+
+    :rtype: list of :class:`Difference`
+    '''
+    differences = []
+    for fields, compatible in ((INCOMPATIBLE_FIELDS, False), (WARNING_FIELDS, True)):
+        for field in fields:
+            ref, value = reference.get(field), current.get(field)
+            if ref is None or value is None or ref == value:
+                continue
+            if field == 'python_version' and python_release(ref) != python_release(value):
+                differences.append(Difference(field, ref, value, False))
+            else:
+                differences.append(Difference(field, ref, value, compatible))
+    packages = reference.get('packages') or {}
+    for name, version in sorted((current.get('packages') or {}).items()):
+        if packages.get(name) is not None and version is not None and packages[name] != version:
+            differences.append(Difference('packages.{0}'.format(name), packages[name], version, True))
+    if busy(reference) or busy(current):
+        differences.append(Difference('load_average', reference.get('load_average'),
+                                      current.get('load_average'), True))
+    return differences
+
+
+def environment_of(summary):
+    '''The environment of a run summary (``None`` if not recorded)'''
+    for bench in summary.values():
+        if bench.get('environment'):
+            return bench['environment']
+    return None
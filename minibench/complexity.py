@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+'''
+Empirical complexity fitting.
+
+Each model ``f`` is fitted on the measured durations by least squares as ``duration = constant + coefficient * f(n)``
+(the constant absorbing the per call overhead).
+The simplest model whose normalized root mean square error is within a tolerance of the best one is kept
+and the durations have to grow enough over the sizes range, so noise does not promote a more complex model.
+'''
+from __future__ import unicode_literals, division
+
+import math
+import numbers
+
+from collections import namedtuple, OrderedDict
+
+from .params import variant_key
+from .threads import THREADS_PARAM
+
+#: The complexity models as ``(order, function)`` from the least to the most complex
+MODELS = (
+    ('O(1)', lambda n: 1.),
+    ('O(log n)', lambda n: math.log(n)),
+    ('O(n)', lambda n: n),
+    ('O(n log n)', lambda n: n * math.log(n)),
+    ('O(n²)', lambda n: n ** 2),
+    ('O(n³)', lambda n: n ** 3),
+)
+
+#: The default tolerance on the normalized root mean square error to prefer a simpler model
+DEFAULT_TOLERANCE = 0.01
+
+#: The minimum duration growth over the sizes range (relative to the mean duration) of a non constant model
+DEFAULT_MIN_GROWTH = 0.25
+
+#: A complexity fit: the size parameter name, the model order, its coefficient, its constant
+#: and the root mean square error relative to the mean duration
+Fit = namedtuple('Fit', ('param', 'order', 'coefficient', 'constant', 'rms'))
+
+
+def fit(sizes, durations, tolerance=DEFAULT_TOLERANCE, min_growth=DEFAULT_MIN_GROWTH):
+    '''
+    Find the complexity model best fitting the durations by input sizes.
+
+    Models whose duration decreases with the size (or grows less than ``min_growth``) are ignored.
+
+    :param sizes: the (positive) input sizes
+    :type sizes: list
+    :param durations: the matching durations
+    :type durations: list
+    :param tolerance: how much more relative error the simplest model can have than the best fitting one
+    :type tolerance: float
+    :param min_growth: the minimum duration growth over the sizes range of a non constant model
+    :type min_growth: float
+    :returns: the kept model as ``(order, coefficient, constant, rms)`` or ``None`` if there is less than 2 sizes
+    :rtype: tuple
+    '''
+    if len(set(sizes)) < 2 or any(size <= 0 for size in sizes):
+        return None
+    mean = math.fsum(durations) / len(durations)
+    candidates = []
+    for order, model in MODELS:
+        values = [model(size) for size in sizes]
+        average = math.fsum(values) / len(values)
+        variance = math.fsum((v - average) ** 2 for v in values)
+        if variance:
+            coefficient = math.fsum((v - average) * (d - mean) for v, d in zip(values, durations)) / variance
+            constant = mean - coefficient * average
+            if coefficient * (max(values) - min(values)) < min_growth * mean:
+                continue
+        else:
+            coefficient, constant = mean / values[0], 0.
+        error = math.fsum((d - constant - coefficient * v) ** 2 for v, d in zip(values, durations))
+        rms = math.sqrt(error / len(durations)) / mean if mean else 0
+        candidates.append((order, coefficient, constant, rms))
+    best = min(rms for _, _, _, rms in candidates)
+    return next(candidate for candidate in candidates if candidate[3] <= best + tolerance)
+
+
+def is_size(value):
+    return isinstance(value, numbers.Real) and not isinstance(value, bool)
+
+
+def analyze(bench):
+    '''
+    Fit the complexity of each parametrized method of a benchmark which has run.
+
+    Each variant median duration is fitted.
+    The input size is the single numeric parameter taking at least 2 distinct values.
+    Methods having none or many of them are ignored (the threads count is never an input size).
+    Variants differing by other parameters are fitted separately.
+
+    :returns: the fits by method key (the variant key without the size parameter)
+    :rtype: OrderedDict
+    '''
+    methods = OrderedDict()
+    for key in bench._collect():
+        results = bench.results.get(key)
+        if results is None or not results.has_success or results.has_errors:
+            continue
+        name, params = bench.variant_of(key)
+        if params:
+            methods.setdefault(name, []).append((params, results.median))
+
+    fits = OrderedDict()
+    for name, variants in methods.items():
+        candidates = [param for param in variants[0][0] if param != THREADS_PARAM
+                      and all(is_size(params[param]) for params, _ in variants)
+                      and len(set(params[param] for params, _ in variants)) > 1]
+        if len(candidates) != 1:
+            continue
+        size = candidates[0]
+        groups = OrderedDict()
+        for params, median in variants:
+            others = OrderedDict((k, v) for k, v in params.items() if k != size)
+            groups.setdefault(variant_key(name, others), []).append((params[size], median))
+        for key, points in groups.items():
+            best = fit([p[0] for p in points], [p[1] for p in points])
+            if best:
+                fits[key] = Fit(size, *best)
+    return fits
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+'''
+Track which project files each benchmark module depends on.
+
+When a benchmark module is loaded, the project modules it imported
+(the new entries of :data:`sys.modules` and the modules it references, recursively)
+are recorded into a cached dependency index along with the last results of its benchmarks.
+Given a list of changed files (or a git revision), only the affected benchmarks
+have to be run again: the stored results are reused for the others
+if they have been produced with the same benchmark options (see :func:`options_hash`).
+
+Only files inside the project root (the current directory by default)
+and outside the Python installation and its ``site-packages`` are considered project files.
+'''
+from __future__ import unicode_literals
+
+import hashlib
+import inspect
+import io
+import json
+import os
+import subprocess
+import sys
+import sysconfig
+
+#: The default dependency index file
+DEFAULT_DEPENDENCIES = '.minibench.deps'
+#: The index format version (the index is ignored if it does not match)
+INDEX_VERSION = 2
+
+PACKAGES_DIRS = ('site-packages', 'dist-packages')
+
+
+def source_of(module):
+    '''The source file of a module (``None`` for builtins and extensions)'''
+    filename = getattr(module, '__file__', None)
+    if not filename:
+        return None
+    if filename.endswith(('.pyc', '.pyo')):
+        filename = filename[:-1]
+    if not filename.endswith('.py'):
+        return None
+    return os.path.abspath(filename)
+
+
+def options_hash(options):
+    '''
+    A stable hash of the benchmarks constructor options (ie. ``times``, ``clock``, ``keyword``...).
+
+    Values which are not JSON serializable are hashed with their representation.
+
+    :param options: the benchmark constructor keyword arguments
+    :type options: dict
+    :rtype: string
+    '''
+    payload = json.dumps(options or {}, sort_keys=True, default=repr)
+    return hashlib.sha1(payload.encode('utf8')).hexdigest()
+
+
+class Project(object):
+    '''Tell which files belongs to the project'''
+    def __init__(self, root=None):
+        '''
+        :param root: the project root directory (default to the current directory)
+        :type root: string
+        '''
+        self.root = os.path.join(os.path.abspath(root or os.getcwd()), '')
+        paths = sysconfig.get_paths()
+        self.excluded = [os.path.join(os.path.abspath(paths[name]), '')
+                         for name in ('stdlib', 'platstdlib', 'purelib', 'platlib') if name in paths]
+
+    def __contains__(self, filename):
+        if not filename or not filename.startswith(self.root):
+            return False
+        if any(filename.startswith(path) for path in self.excluded if not self.root.startswith(path)):
+            return False
+        parts = filename[len(self.root):].split(os.sep)
+        return not any(part in PACKAGES_DIRS for part in parts)
+
+
+def references(module):
+    '''The modules directly referenced by a module globals (imported modules and imported objects modules)'''
+    for value in list(vars(module).values()):
+        if inspect.ismodule(value):
+            yield value
+        else:
+            name = getattr(value, '__module__', None) if inspect.isclass(value) or inspect.isfunction(value) else None
+            if name and name in sys.modules:
+                yield sys.modules[name]
+
+
+def module_dependencies(module, project, modules=()):
+    '''
+    The project source files a module depends on.
+
+    :param module: the loaded module
+    :param project: the project files filter
+    :type project: Project
+    :param modules: the modules imported while loading the module
+    :type modules: list
+    :rtype: set
+    '''
+    files = set()
+    pending = [module] + list(modules)
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        filename = source_of(current)
+        if current is not module and filename not in project:
+            continue
+        files.add(filename)
+        pending.extend(references(current))
+    files.discard(source_of(module))
+    return files
+
+
+def changed_files(since, path=None):
+    '''
+    The files changed since a git revision (including uncommitted and untracked files).
+
+    :param since: the git revision (ie. ``HEAD~1`` or ``origin/master``)
+    :type since: string
+    :returns: the changed files absolute paths
+    :rtype: list
+    :raises ValueError: if the changes can't be computed (not a git repository or unknown revision)
+    '''
+    cwd = path or os.getcwd()
+
+    def git(*args):
+        with open(os.devnull, 'w') as devnull:
+            return subprocess.check_output(('git',) + args, cwd=cwd, stderr=devnull).decode('utf8')
+    try:
+        toplevel = git('rev-parse', '--show-toplevel').strip()
+        names = git('diff', '--name-only', since).splitlines()
+        names += git('ls-files', '--others', '--exclude-standard', '--full-name').splitlines()
+    except (OSError, subprocess.CalledProcessError):
+        raise ValueError('Unable to list the files changed since {0}'.format(since))
+    return sorted(set(os.path.join(toplevel, name) for name in names if name))
+
+
+class Dependencies(object):
+    '''
+    A dependency index stored as a JSON file.
+
+    It stores the project files each benchmark module depends on
+    and the last results of each of its benchmarks (as given by :meth:`~minibench.Benchmark.dump`)
+    along with the hash of the options they have been run with.
+    '''
+    def __init__(self, path=DEFAULT_DEPENDENCIES, root=None):
+        '''
+        :param path: the index file path (``None`` to keep the index in memory only)
+        :type path: string
+        :param root: the project root directory (default to the current directory)
+        :type root: string
+        '''
+        self.path = path
+        self.project = Project(root)
+        self.files = {}
+        self.results = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            try:
+                with io.open(path, encoding='utf8') as f:
+                    data = json.load(f)
+                if data.get('version') == INDEX_VERSION:
+                    self.files = data['files']
+                    self.results = data['results']
+            except (IOError, OSError, ValueError, KeyError):
+                self.files, self.results = {}, {}
+
+    def record(self, filename, module, modules=()):
+        '''
+        Record the dependencies of a freshly loaded benchmark module.
+
+        :param filename: the benchmark module file name
+        :type filename: string
+        :param module: the loaded module
+        :param modules: the modules imported while loading it
+        :type modules: list
+        '''
+        files = sorted(module_dependencies(module, self.project, modules))
+        path = os.path.abspath(filename)
+        if self.files.get(path) != files:
+            self.files[path] = files
+            self.dirty = True
+
+    def affected(self, filename, changed):
+        '''
+        Wether a benchmark module is affected by some changed files.
+
+        Unknown modules are always affected.
+
+        :param changed: the changed files paths
+        :type changed: list
+        :rtype: bool
+        '''
+        path = os.path.abspath(filename)
+        if path not in self.files:
+            return True
+        changed = set(os.path.abspath(name) for name in changed)
+        return path in changed or any(dependency in changed for dependency in self.files[path])
+
+    def store(self, filename, name, data, options=None):
+        '''
+        Store the last results of a benchmark class.
+
+        :param options: the benchmark constructor options the results have been produced with
+        :type options: dict
+        '''
+        entry = {'options': options_hash(options), 'data': data}
+        self.results.setdefault(os.path.abspath(filename), {})[name] = entry
+        self.dirty = True
+
+    def stored(self, filename, name, options=None):
+        '''
+        The last stored results of a benchmark class.
+
+        :param options: the current benchmark constructor options
+        :type options: dict
+        :returns: the results or ``None`` if unknown or produced with other options
+        :rtype: dict
+        '''
+        entry = self.results.get(os.path.abspath(filename), {}).get(name)
+        if entry is None or entry['options'] != options_hash(options):
+            return None
+        return entry['data']
+
+    def save(self):
+        '''Write the index if it changed'''
+        if not self.path or not self.dirty:
+            return
+        data = {'version': INDEX_VERSION, 'files': self.files, 'results': self.results}
+        tmp = '{0}.tmp'.format(self.path)
+        with io.open(tmp, 'w', encoding='utf8') as out:
+            out.write(json.dumps(data, ensure_ascii=False))
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.rename(tmp, self.path)
+        self.dirty = False
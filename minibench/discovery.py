@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+'''
+Discover benchmarks without importing them.
+
+Benchmark files are parsed with :mod:`ast` to find the :class:`~minibench.Benchmark` subclasses
+and their methods. The result is cached on disk by file so unchanged files are not parsed again.
+Modules are only imported when one of their benchmark is actually run (see :class:`LazyBenchmark`).
+
+Only classes inheriting from ``Benchmark`` (or from another benchmark class of the same file)
+are discovered statically (with the methods of their mixins defined in the same file),
+and only tags given as string literals
+(``@tag('slow')`` decorators and ``tags = ['io']`` class attributes) are known before import.
+Classes whose bases can't be resolved statically (ie. imported from another module)
+are recorded as ``unresolved``: such files have to be imported to be discovered.
+'''
+from __future__ import unicode_literals
+
+import ast
+import hashlib
+import io
+import json
+import os
+
+from six.moves import builtins
+
+from ._compat import string_types
+
+#: The default discovery cache file
+DEFAULT_CACHE = '.minibench.cache'
+#: The cache format version (the cache is ignored if it does not match)
+CACHE_VERSION = 4
+
+BASE_CLASS = 'Benchmark'
+BASE_MODULES = ('minibench', 'minibench.benchmark')
+TAG_DECORATOR = 'tag'
+TAGS_ATTRIBUTE = 'tags'
+
+
+def base_name(node):
+    '''The name of a base class expression (``Benchmark`` or ``minibench.Benchmark`` gives ``Benchmark``)'''
+    if isinstance(node, ast.Name):
+        return node.id
+    elif isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def base_aliases(tree):
+    '''The names the ``Benchmark`` base class is imported as (``from minibench import Benchmark as B``)'''
+    aliases = set([BASE_CLASS])
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module in BASE_MODULES:
+            aliases.update(alias.asname or alias.name for alias in node.names if alias.name == BASE_CLASS)
+    return aliases
+
+
+def is_function(node):
+    return isinstance(node, ast.FunctionDef) or type(node).__name__ == 'AsyncFunctionDef'
+
+
+def literal_strings(nodes):
+    '''The string literals values of a list of expressions (other expressions are ignored)'''
+    strings = []
+    for node in nodes:
+        try:
+            value = ast.literal_eval(node)
+        except (ValueError, TypeError):
+            continue
+        if isinstance(value, string_types):
+            strings.append(value)
+    return strings
+
+
+def decorator_tags(node):
+    '''The tags given to a function by ``@tag(...)`` decorators'''
+    tags = []
+    for decorator in node.decorator_list:
+        if isinstance(decorator, ast.Call) and base_name(decorator.func) == TAG_DECORATOR:
+            tags.extend(literal_strings(decorator.args))
+    return tags
+
+
+def class_tags(node):
+    '''The ``tags`` class attribute value if it is a literal list of strings (``None`` if not defined)'''
+    tags = None
+    for child in node.body:
+        if (isinstance(child, ast.Assign) and isinstance(child.value, (ast.List, ast.Tuple))
+                and any(isinstance(t, ast.Name) and t.id == TAGS_ATTRIBUTE for t in child.targets)):
+            tags = literal_strings(child.value.elts)
+    return tags
+
+
+def scan_source(source, prefix='bench_'):
+    '''
+    Find the benchmark classes defined in a source code.
+
+    :returns: a list of ``{'name', 'doc', 'line', 'methods', 'tags', 'unresolved'}`` dictionnaries sorted by name
+              where ``tags`` gives the tags of each tagged method
+              and ``unresolved`` the bases which can't be resolved statically
+    :rtype: list
+    :raises SyntaxError: if the source can't be parsed
+    '''
+    tree = ast.parse(source)
+    aliases = base_aliases(tree)
+    # Every class of the file (benchmark or not) as local mixins may provide benchmark methods
+    scanned = {}
+    unresolved = {}
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        bases = []
+        for base in node.bases:
+            if isinstance(base, ast.Attribute) and base.attr == BASE_CLASS:
+                bases.append(BASE_CLASS)
+            elif isinstance(base, ast.Name) and base.id in aliases:
+                bases.append(BASE_CLASS)
+            elif isinstance(base, ast.Name) and (base.id in scanned or hasattr(builtins, base.id)):
+                bases.append(base.id)
+            else:
+                unresolved.setdefault(node.name, []).append(base_name(base) or '<expression>')
+        methods = set()
+        own_tags = {}
+        common = class_tags(node)
+        parents = [scanned[base] for base in bases if base in scanned]
+        for parent in reversed(parents):
+            methods.update(parent['methods'])
+            own_tags.update(parent['own_tags'])
+        for parent in parents:
+            if common is None:
+                common = parent['common_tags']
+        for child in node.body:
+            if is_function(child) and child.name.startswith(prefix):
+                methods.add(child.name)
+                own_tags[child.name] = decorator_tags(child)
+        scanned[node.name] = {
+            'name': node.name,
+            'doc': ast.get_docstring(node),
+            'line': node.lineno,
+            'methods': sorted(methods),
+            'own_tags': own_tags,
+            'common_tags': common,
+            'unresolved': unresolved.get(node.name) or [name for name in bases if name in unresolved],
+            'benchmark': node.name in unresolved or any(
+                base == BASE_CLASS or base in scanned and scanned[base]['benchmark'] for base in bases),
+        }
+    found = dict((name, info) for name, info in scanned.items() if info.pop('benchmark'))
+    for info in found.values():
+        if info['unresolved']:
+            # The module has to be imported to know the methods
+            info['methods'], info['own_tags'], info['common_tags'] = [], {}, None
+    benchmarks = []
+    for name in sorted(found):
+        info = found[name]
+        own_tags, common = info.pop('own_tags'), info.pop('common_tags') or []
+        tags = dict((method, common + own_tags.get(method, [])) for method in info['methods'])
+        info['tags'] = dict((method, method_tags) for method, method_tags in tags.items() if method_tags)
+        benchmarks.append(info)
+    return benchmarks
+
+
+def file_hash(filename):
+    '''The SHA1 hash of a file content'''
+    sha1 = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        sha1.update(f.read())
+    return sha1.hexdigest()
+
+
+class Index(object):
+    '''
+    A discovery cache stored as a JSON file.
+
+    Each file entry is keyed by its absolute path and validated by its modification time and size.
+    If they changed, the file content hash is checked before parsing it again.
+    '''
+    def __init__(self, path=DEFAULT_CACHE, prefix='bench_'):
+        '''
+        :param path: the cache file path (``None`` to keep the cache in memory only)
+        :type path: string
+        :param prefix: the benchmark methods prefix
+        :type prefix: string
+        '''
+        self.path = path
+        self.prefix = prefix
+        self.entries = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            try:
+                with io.open(path, encoding='utf8') as f:
+                    data = json.load(f)
+                if data.get('version') == CACHE_VERSION and data.get('prefix') == prefix:
+                    self.entries = data['files']
+            except (IOError, OSError, ValueError, KeyError):
+                self.entries = {}
+
+    def scan(self, filename):
+        '''
+        Discover the benchmarks of a file, using the cache if the file did not change.
+
+        :rtype: list
+        :raises SyntaxError: if the file can't be parsed
+        '''
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        entry = self.entries.get(path)
+        if entry and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+            return entry['benchmarks']
+        sha1 = file_hash(path)
+        if not entry or entry['hash'] != sha1:
+            with open(path, 'rb') as f:
+                benchmarks = scan_source(f.read(), self.prefix)
+        else:
+            benchmarks = entry['benchmarks']
+        self.entries[path] = {
+            'mtime': stat.st_mtime,
+            'size': stat.st_size,
+            'hash': sha1,
+            'benchmarks': benchmarks,
+        }
+        self.dirty = True
+        return benchmarks
+
+    def save(self):
+        '''Write the cache if it changed'''
+        if not self.path or not self.dirty:
+            return
+        data = {'version': CACHE_VERSION, 'prefix': self.prefix, 'files': self.entries}
+        tmp = '{0}.tmp'.format(self.path)
+        with io.open(tmp, 'w', encoding='utf8') as out:
+            out.write(json.dumps(data, ensure_ascii=False))
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.rename(tmp, self.path)
+        self.dirty = False
+
+
+class LazyBenchmark(object):
+    '''
+    A proxy to a benchmark class which is only imported when instanciated (or explicitly loaded).
+
+    It can be given to the :class:`~minibench.BenchmarkRunner` and its executors in place of the class.
+    '''
+    def __init__(self, filename, info, loader):
+        '''
+        :param filename: the benchmark module file name
+        :type filename: string
+        :param info: the discovered class informations (see :func:`scan_source`)
+        :type info: dict
+        :param loader: a callable loading a module given its filename
+        :type loader: callable
+        '''
+        self.filename = filename
+        self.info = info
+        self.__name__ = info['name']
+        self.__doc__ = info['doc']
+        self.methods = info['methods']
+        self.tags = info.get('tags', {})
+        self._loader = loader
+        self._cls = None
+
+    @property
+    def loaded(self):
+        '''Wether the benchmark module has been imported'''
+        return self._cls is not None
+
+    def load(self):
+        '''Import the benchmark module and return the benchmark class'''
+        if self._cls is None:
+            self._cls = getattr(self._loader(self.filename), self.__name__)
+        return self._cls
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __repr__(self):
+        return '<LazyBenchmark {0} from {1}>'.format(self.__name__, self.filename)
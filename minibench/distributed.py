@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+'''
+Run benchmarks on remote workers.
+
+A worker (``minibench worker``) is a TCP server running the benchmarks it receives one after the other.
+The coordinator (:class:`DistributedExecutor`) keeps a connection to each worker
+and dispatches benchmarks to the first idle one.
+
+The protocol is made of JSON lines: each task is sent as a ``{"filename", "name", "options"}`` line
+and answered by a ``{"data", "worker"}`` line (or an ``{"error"}`` line if the benchmark failed).
+Files paths are sent relative to the coordinator root directory (when inside it)
+and resolved against the worker root directory, so each machine can have its own checkout location.
+
+Each result is tagged with the worker address, node name and machine fingerprint.
+
+.. warning::
+
+    Workers run any benchmark file they are asked for: only expose them on a trusted network.
+'''
+from __future__ import unicode_literals
+
+import json
+import logging
+import os
+import platform
+import socket
+import threading
+import traceback
+
+from six.moves import queue, socketserver
+
+from .environment import fingerprint
+from .executor import execute
+
+log = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 7737
+
+
+def parse_address(value):
+    '''
+    Parse a ``host:port`` worker address (the port is optionnal).
+
+    :rtype: tuple
+    :raises ValueError: if the port is not an integer
+    '''
+    host, _, port = value.strip().rpartition(':')
+    if not host:
+        host, port = port, DEFAULT_PORT
+    return host, int(port)
+
+
+def format_address(address):
+    return '{0}:{1}'.format(*address)
+
+
+def send(stream, payload):
+    stream.write(json.dumps(payload).encode('utf8') + b'\n')
+    stream.flush()
+
+
+def receive(stream):
+    '''Read a single JSON line (``None`` if the connection has been closed)'''
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line.decode('utf8'))
+
+
+class WorkerHandler(socketserver.StreamRequestHandler):
+    '''Run each task received on a coordinator connection'''
+    def handle(self):
+        while True:
+            task = receive(self.rfile)
+            if task is None:
+                break
+            send(self.wfile, self.server.run(task))
+
+
+class Worker(socketserver.TCPServer):
+    '''
+    A benchmark worker server.
+
+    Connections are handled one at a time so benchmarks never run concurrently on a worker.
+    '''
+    allow_reuse_address = True
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, root=None):
+        '''
+        :param host: the listening interface
+        :type host: string
+        :param port: the listening port (``0`` for any free port)
+        :type port: int
+        :param root: the directory relative benchmark files are resolved from (default to the current directory)
+        :type root: string
+        '''
+        self.root = os.path.abspath(root or os.getcwd())
+        self.node = platform.node()
+        self.fingerprint = fingerprint()
+        socketserver.TCPServer.__init__(self, (host, port), WorkerHandler)
+
+    @property
+    def address(self):
+        '''The ``host:port`` address the worker is listening on'''
+        return format_address(self.server_address[:2])
+
+    def run(self, task):
+        '''Run a single task and return its response'''
+        filename = os.path.join(self.root, task['filename'])
+        try:
+            data = execute(filename, task['name'], task['options'])
+        except Exception:
+            log.exception('Benchmark %s from %s failed', task['name'], filename)
+            return {'error': traceback.format_exc()}
+        return {'data': data, 'worker': {'node': self.node, 'fingerprint': self.fingerprint}}
+
+
+class Task(object):
+    '''A submitted task waiting for its response'''
+    def __init__(self, payload):
+        self.payload = payload
+        self.response = None
+        self.done = threading.Event()
+
+    def resolve(self, response):
+        self.response = response
+        self.done.set()
+
+    def wait(self):
+        '''Wait for the serialized results'''
+        self.done.wait()
+        if 'error' in self.response:
+            msg = 'Distributed benchmark {0} failed:\n{1}'
+            raise RuntimeError(msg.format(self.payload['name'], self.response['error']))
+        return self.response['data']
+
+
+class DistributedExecutor(object):
+    '''
+    Execute benchmarks on remote workers (see :class:`Worker`).
+
+    Each worker runs a single benchmark at a time. Tasks of an unreachable or lost worker
+    are dispatched to the others and fail if there is no worker left.
+    '''
+    def __init__(self, workers, root=None, timeout=None):
+        '''
+        :param workers: the workers addresses as ``(host, port)`` tuples
+        :type workers: list
+        :param root: the directory benchmark files paths are sent relative to (default to the current directory)
+        :type root: string
+        :param timeout: the workers connection timeout (in seconds)
+        :type timeout: float
+        '''
+        self.workers = workers
+        self.root = os.path.abspath(root or os.getcwd())
+        self.timeout = timeout
+        self.tasks = queue.Queue()
+        self.threads = []
+        self.alive = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        self.alive = len(self.workers)
+        for address in self.workers:
+            thread = threading.Thread(target=self.dispatch, args=(address,))
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def __exit__(self, *args):
+        for _ in self.threads:
+            self.tasks.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def relative(self, filename):
+        '''The path sent to workers: relative to the root directory if inside it'''
+        path = os.path.abspath(filename)
+        if path.startswith(os.path.join(self.root, '')):
+            return os.path.relpath(path, self.root)
+        return path
+
+    def submit(self, filename, name, options):
+        '''
+        Submit a benchmark to run.
+
+        :returns: a callable waiting for the serialized results
+        '''
+        task = Task({'filename': self.relative(filename), 'name': name, 'options': options})
+        with self.lock:
+            if self.alive:
+                self.tasks.put(task)
+            else:
+                task.resolve({'error': 'No worker available'})
+        return task.wait
+
+    def dispatch(self, address):
+        '''Send the queued tasks to a worker until told to stop'''
+        try:
+            connection = socket.create_connection(address, self.timeout)
+            connection.settimeout(None)
+        except (IOError, OSError) as e:
+            log.warning('Worker %s is unreachable: %s', format_address(address), e)
+            return self.lost()
+        stream = connection.makefile('rwb')
+        try:
+            while True:
+                task = self.tasks.get()
+                if task is None:
+                    break
+                try:
+                    send(stream, task.payload)
+                    response = receive(stream)
+                    if response is None:
+                        raise IOError('connection closed')
+                except (IOError, OSError, ValueError) as e:
+                    log.warning('Worker %s has been lost: %s', format_address(address), e)
+                    self.tasks.put(task)
+                    return self.lost()
+                if 'data' in response:
+                    worker = dict(response['worker'], address=format_address(address))
+                    for result in response['data']['results'].values():
+                        result['worker'] = worker
+                task.resolve(response)
+        finally:
+            stream.close()
+            connection.close()
+
+    def lost(self):
+        '''Forget a worker and fail the pending tasks if it was the last one'''
+        with self.lock:
+            self.alive -= 1
+            if self.alive:
+                return
+            while True:
+                try:
+                    task = self.tasks.get_nowait()
+                except queue.Empty:
+                    break
+                if task is not None:
+                    task.resolve({'error': 'No worker available'})
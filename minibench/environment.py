@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+'''
+Informations about the environment benchmarks are run in.
+'''
+from __future__ import unicode_literals
+
+import hashlib
+import importlib
+import io
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import sysconfig
+
+from .threads import gil_enabled
+
+#: The packages whose versions are probed by default
+KEY_PACKAGES = ('minibench', 'six', 'click')
+
+CPUINFO = '/proc/cpuinfo'
+GOVERNOR = '/sys/devices/system/cpu/cpu0/cpufreq/scaling_governor'
+NO_TURBO = '/sys/devices/system/cpu/intel_pstate/no_turbo'
+BOOST = '/sys/devices/system/cpu/cpufreq/boost'
+ASLR = '/proc/sys/kernel/randomize_va_space'
+
+
+def machine():
+    '''The stable characteristics identifying a machine and its Python interpreter'''
+    return {
+        'node': platform.node(),
+        'system': platform.system(),
+        'release': platform.release(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': multiprocessing.cpu_count(),
+        'python_implementation': platform.python_implementation(),
+        'python_version': platform.python_version(),
+    }
+
+
+def fingerprint(characteristics=None):
+    '''
+    A short hash identifying a machine and its Python interpreter.
+
+    :param characteristics: the machine characteristics (default to :func:`machine`)
+    :type characteristics: dict
+    :rtype: string
+    '''
+    characteristics = characteristics or machine()
+    data = '|'.join('{0}={1}'.format(k, characteristics[k]) for k in sorted(characteristics))
+    return hashlib.sha1(data.encode('utf8')).hexdigest()[:16]
+
+
+def git_commit(path=None):
+    '''The current git commit hash of a directory (``None`` if not in a git repository)'''
+    try:
+        with open(os.devnull, 'w') as devnull:
+            out = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=path or os.getcwd(), stderr=devnull)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.decode('utf8').strip() or None
+
+
+def read(path):
+    '''The stripped content of a system file (``None`` if not readable)'''
+    try:
+        with io.open(path, encoding='utf8') as f:
+            return f.read().strip()
+    except (IOError, OSError):
+        return None
+
+
+def cpu_model():
+    '''The CPU model name'''
+    for line in (read(CPUINFO) or '').splitlines():
+        name, _, value = line.partition(':')
+        if name.strip() in ('model name', 'Hardware', 'Processor'):
+            return value.strip()
+    return platform.processor() or None
+
+
+def turbo():
+    '''Wether the CPU turbo boost is enabled (``None`` if unknown)'''
+    no_turbo = read(NO_TURBO)
+    if no_turbo is not None:
+        return no_turbo == '0'
+    boost = read(BOOST)
+    if boost is not None:
+        return boost == '1'
+    return None
+
+
+def aslr():
+    '''Wether the address space layout randomization is enabled (``None`` if unknown)'''
+    value = read(ASLR)
+    return None if value is None else value != '0'
+
+
+def load_average():
+    '''The 1, 5 and 15 minutes load averages (``None`` if unknown)'''
+    try:
+        return list(os.getloadavg())
+    except (AttributeError, OSError):
+        return None
+
+
+def package_version(name):
+    '''The version of a package, installed or importable (``None`` if unknown)'''
+    try:
+        from importlib import metadata
+        return metadata.version(name)
+    except Exception:
+        pass
+    try:
+        return getattr(importlib.import_module(name), '__version__', None)
+    except ImportError:
+        return None
+
+
+def probe(packages=KEY_PACKAGES):
+    '''
+    Probe the environment a run happens in.
+
+    Unknown values (ie. on platforms not exposing them) are ``None``.
+
+    :param packages: the packages whose versions are recorded
+    :type packages: list
+    :rtype: dict
+    '''
+    environment = machine()
+    environment.update({
+        'fingerprint': fingerprint(),
+        'cpu_model': cpu_model(),
+        'governor': read(GOVERNOR),
+        'turbo': turbo(),
+        'aslr': aslr(),
+        'load_average': load_average(),
+        'python_build': ' '.join(platform.python_build()),
+        'python_compiler': platform.python_compiler(),
+        'python_debug': hasattr(sys, 'gettotalrefcount'),
+        'python_config': sysconfig.get_config_var('CONFIG_ARGS'),
+        'gil': gil_enabled(),
+        'packages': dict((name, package_version(name)) for name in packages),
+    })
+    return environment
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+'''
+Run benchmarks outside of the current process.
+
+Executors run a benchmark class (or some of its methods) given its source filename
+and return its serialized results (see :meth:`~minibench.Benchmark.dump`)
+so the runner can replay them into its reporters.
+'''
+from __future__ import unicode_literals
+
+import gc
+import json
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+
+from ._compat import load_module
+from .utils import module_name
+
+#: The hash seed used by isolated processes
+DEFAULT_HASH_SEED = '0'
+
+log = logging.getLogger(__name__)
+
+
+def execute(filename, name, options):
+    '''
+    Load and run a benchmark class from its source file.
+
+    :param filename: the benchmark module file name
+    :type filename: string
+    :param name: the benchmark class name
+    :type name: string
+    :param options: the benchmark constructor keyword arguments
+    :type options: dict
+    :returns: the serialized benchmark results
+    :rtype: dict
+    '''
+    module = load_module(module_name(filename), filename)
+    bench = getattr(module, name)(**options)
+    bench.run()
+    return bench.dump()
+
+
+def available_cpus():
+    '''List the CPUs this process is allowed to run on'''
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(multiprocessing.cpu_count()))
+
+
+def pin(cpus):
+    '''Pin the current process on a CPU set if the platform supports it'''
+    if hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError:
+            pass
+
+
+def _init_worker(cpus):
+    '''Pin each pool worker on its own CPU'''
+    pin(set([cpus.get()]))
+
+
+class ParallelExecutor(object):
+    '''
+    Execute benchmarks on a pool of worker processes, each one pinned to a distinct CPU
+    (on platforms supporting it).
+
+    Workers are not pinned at all if there are less CPUs than workers.
+    '''
+    def __init__(self, jobs, cpus=None):
+        '''
+        :param jobs: the number of worker processes
+        :type jobs: int
+        :param cpus: the CPU set workers are pinned on (default to all the available CPUs)
+        :type cpus: list
+        '''
+        self.jobs = jobs
+        self.cpus = cpus
+        self.pool = None
+        #: Wether each worker has been pinned to its own CPU
+        self.pinned = False
+
+    def __enter__(self):
+        available = self.cpus or available_cpus()
+        self.pinned = self.jobs <= len(available)
+        if not self.pinned:
+            log.warning('%s worker processes share %s CPU(s) and disturb each other: they are not pinned',
+                        self.jobs, len(available))
+            self.pool = multiprocessing.Pool(self.jobs)
+            return self
+        cpus = multiprocessing.Queue()
+        for cpu in available[:self.jobs]:
+            cpus.put(cpu)
+        self.pool = multiprocessing.Pool(self.jobs, _init_worker, (cpus,))
+        return self
+
+    def __exit__(self, *args):
+        self.pool.close()
+        self.pool.join()
+        self.pool = None
+
+    def submit(self, filename, name, options):
+        '''
+        Submit a benchmark to run.
+
+        :returns: a callable waiting for the serialized results
+        '''
+        return self.pool.apply_async(execute, (filename, name, options)).get
+
+
+class IsolatedExecutor(object):
+    '''
+    Execute each benchmark in a freshly spawned interpreter with a controlled environment:
+
+    - a fixed hash seed (``PYTHONHASHSEED``)
+    - a collected (and frozen if supported) garbage collector before running
+    - a fixed CPU affinity (on platforms supporting it)
+
+    Benchmarks are run one after the other, the task is given on the child standard input
+    and the serialized results are read back from its standard output.
+    '''
+    def __init__(self, hash_seed=DEFAULT_HASH_SEED, cpus=None):
+        '''
+        :param hash_seed: the ``PYTHONHASHSEED`` value of the children
+        :type hash_seed: string
+        :param cpus: the CPU set children are pinned on (default to the last available CPU)
+        :type cpus: list
+        '''
+        self.hash_seed = hash_seed
+        self.cpus = cpus or available_cpus()[-1:]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    @property
+    def env(self):
+        '''The children environment'''
+        env = dict(os.environ)
+        env['PYTHONHASHSEED'] = str(self.hash_seed)
+        # Ensure minibench is importable even if not installed
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env['PYTHONPATH'] = os.pathsep.join(p for p in (root, env.get('PYTHONPATH')) if p)
+        return env
+
+    def submit(self, filename, name, options):
+        '''
+        Submit a benchmark to run.
+
+        The child process is only spawned when waiting for the results.
+
+        :returns: a callable waiting for the serialized results
+        '''
+        task = {
+            'filename': os.path.abspath(filename),
+            'name': name,
+            'options': options,
+            'cpus': self.cpus,
+        }
+        return lambda: self.spawn(task)
+
+    def spawn(self, task):
+        '''Run a single task in a child process and wait for its results'''
+        process = subprocess.Popen([sys.executable, '-m', 'minibench.executor'],
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   env=self.env)
+        out, err = process.communicate(json.dumps(task).encode('utf8'))
+        if process.returncode:
+            msg = 'Isolated benchmark {0} failed:\n{1}'
+            raise RuntimeError(msg.format(task['name'], err.decode('utf8', 'replace')))
+        return json.loads(out.decode('utf8'))
+
+
+def main():
+    '''Run a single task read from the standard input (see :class:`IsolatedExecutor`)'''
+    task = json.loads(sys.stdin.read())
+    if task.get('cpus'):
+        pin(set(task['cpus']))
+    gc.collect()
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+    # Benchmarks output must not pollute the results
+    stdout, sys.stdout = sys.stdout, sys.stderr
+    try:
+        data = execute(task['filename'], task['name'], task['options'])
+    finally:
+        sys.stdout = stdout
+    json.dump(data, sys.stdout)
+    sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
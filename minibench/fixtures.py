@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+'''
+Benchmark fixtures.
+
+A fixture is a benchmark method decorated with :func:`fixture` whose return value
+is given to the benchmark methods (and the other fixtures) having an argument of the same name.
+Depending on its scope, a fixture is set up once for the whole class, once for each method
+or before each call. A generator fixture is torn down by resuming it after its ``yield``.
+
+An input pool (see :func:`pool`) is an iteration scoped fixture whose values are pre-generated
+by batches into a bounded :class:`Pool`, so building fresh inputs does not slow down each call.
+
+Fixtures are always set up and torn down outside of the timed calls
+and their own cost is tracked separately (see :attr:`Result.fixtures <minibench.benchmark.Result.fixtures>`).
+'''
+from __future__ import unicode_literals
+
+import inspect
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import partial
+
+from .memory import sizeof
+
+#: The method attribute storing its fixture scope
+FIXTURE_ATTR = '__minibench_fixture__'
+#: The method attribute storing its input pool options
+POOL_ATTR = '__minibench_pool__'
+
+#: The default number of inputs pre-generated by an input pool
+DEFAULT_POOL_SIZE = 100
+
+CLASS = 'class'
+METHOD = 'method'
+ITERATION = 'iteration'
+
+#: The fixtures scopes from the widest to the narrowest
+SCOPES = (CLASS, METHOD, ITERATION)
+
+
+def fixture(scope=METHOD):
+    '''
+    Declare a benchmark method as a fixture.
+
+    .. code-block:: python
+
+        class SortBenchmark(Benchmark):
+            @fixture(scope='class')
+            def data(self):
+                return list(range(10000))
+
+            @fixture(scope='iteration')
+            def shuffled(self, data):
+                random.shuffle(data)
+                return data
+
+            def bench_sorted(self, shuffled):
+                return sorted(shuffled)
+
+    :param scope: how often the fixture is set up: once by ``class``, by ``method`` or by ``iteration``
+    :type scope: string
+    :raises ValueError: if the scope is unknown
+    '''
+    if callable(scope):
+        return fixture()(scope)
+    if scope not in SCOPES:
+        raise ValueError('Unknown fixture scope {0} (expected one of {1})'.format(scope, ', '.join(SCOPES)))
+
+    def wrapper(func):
+        setattr(func, FIXTURE_ATTR, scope)
+        return func
+    return wrapper
+
+
+def pool(size=DEFAULT_POOL_SIZE, cycle=False, max_memory=None):
+    '''
+    Declare a benchmark method generating inputs as an input pool fixture.
+
+    The generator is evaluated ahead of the calls into a pool of ``size`` inputs
+    (and at most ``max_memory`` bytes), refilled outside of the timed calls when exhausted.
+    Each call is given the next input: inputs are consumed once (the generator is restarted when exhausted)
+    or reused in a round-robin way with ``cycle`` (only if the method does not mutate them).
+
+    .. code-block:: python
+
+        class SortBenchmark(Benchmark):
+            @pool(size=1000)
+            def shuffled(self):
+                while True:
+                    yield random.sample(range(10000), 10000)
+
+            def bench_sort(self, shuffled):
+                shuffled.sort()
+
+    :param size: the maximum number of pre-generated inputs
+    :type size: int
+    :param cycle: reuse the pre-generated inputs in a round-robin way instead of consuming them
+    :type cycle: bool
+    :param max_memory: an optionnal pool memory budget (in bytes)
+    :type max_memory: int
+    :raises ValueError: if the size or the memory budget is not positive
+    '''
+    if size < 1:
+        raise ValueError('An input pool size should be positive')
+    if max_memory is not None and max_memory < 1:
+        raise ValueError('An input pool memory budget should be positive')
+
+    def wrapper(func):
+        setattr(func, FIXTURE_ATTR, ITERATION)
+        setattr(func, POOL_ATTR, {'size': size, 'cycle': cycle, 'max_memory': max_memory})
+        return func
+    return wrapper
+
+
+def scope_of(func):
+    '''The scope of a fixture declared with :func:`fixture` (``None`` if it is not a fixture)'''
+    return getattr(func, FIXTURE_ATTR, None)
+
+
+def pool_of(func):
+    '''The options of an input pool declared with :func:`pool` (``None`` if it is not an input pool)'''
+    return getattr(func, POOL_ATTR, None)
+
+
+def arguments(func):
+    '''The arguments names of a function or a bound method (without ``self``)'''
+    if hasattr(inspect, 'signature'):
+        kinds = (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)
+        return [p.name for p in inspect.signature(func).parameters.values() if p.kind in kinds]
+    args = inspect.getargspec(func).args
+    return args[1:] if inspect.ismethod(func) else args
+
+
+class Pool(object):
+    '''
+    A bounded pool of inputs pre-generated from a generator function (see :func:`pool`).
+    '''
+    def __init__(self, factory, size=DEFAULT_POOL_SIZE, cycle=False, max_memory=None):
+        '''
+        :param factory: a function returning the inputs iterator
+        :type factory: callable
+        :param size: the maximum number of pre-generated inputs
+        :type size: int
+        :param cycle: reuse the inputs in a round-robin way instead of consuming them
+        :type cycle: bool
+        :param max_memory: an optionnal memory budget (in bytes)
+        :type max_memory: int
+        '''
+        self.factory = factory
+        self.size = size
+        self.cycle = cycle
+        self.max_memory = max_memory
+        self.inputs = []
+        self.position = 0
+        #: How many times the pool has been filled
+        self.refills = 0
+        self._iterator = None
+
+    def fill(self):
+        '''
+        Pre-generate the next inputs.
+
+        The pool stops filling when the generator is exhausted (it is restarted on the next fill).
+
+        :raises ValueError: if the generator does not provide any input
+        '''
+        self.inputs = []
+        self.position = 0
+        used = 0
+        for _ in range(2):
+            if self._iterator is None:
+                self._iterator = iter(self.factory())
+            for value in self._iterator:
+                self.inputs.append(value)
+                if self.max_memory is not None:
+                    used += sizeof(value)
+                if len(self.inputs) >= self.size or (self.max_memory is not None and used >= self.max_memory):
+                    break
+            else:
+                self._iterator = None
+            if self.inputs:
+                self.refills += 1
+                return
+        raise ValueError('The input pool generator is empty')
+
+    def take(self):
+        '''Get the next input, filling the pool if needed'''
+        if self.position >= len(self.inputs):
+            if self.cycle and self.inputs:
+                self.position = 0
+            else:
+                self.fill()
+        value = self.inputs[self.position]
+        if not self.cycle:
+            # Consumed inputs are released
+            self.inputs[self.position] = None
+        self.position += 1
+        return value
+
+
+class Fixtures(object):
+    '''
+    Set up and tear down the fixtures of a benchmark instance while tracking their overhead.
+
+    The overhead of each fixture is stored as a ``{'scope', 'calls', 'total'}`` dictionnary
+    (``total`` being the cumulated set up and tear down duration in seconds)
+    with an extra ``refills`` count for input pools.
+
+    Input pools are kept until the method scoped fixtures are torn down.
+    '''
+    def __init__(self, bench):
+        '''
+        :param bench: the benchmark instance declaring the fixtures
+        :type bench: Benchmark
+        '''
+        self.bench = bench
+        self.scopes = {}
+        self.options = {}
+        for name in dir(bench.__class__):
+            attr = getattr(bench.__class__, name, None)
+            scope = scope_of(attr)
+            if scope:
+                self.scopes[name] = scope
+            if pool_of(attr):
+                self.options[name] = pool_of(attr)
+        self.values = {}
+        self.pools = {}
+        self.stats = {}
+        self._active = []
+
+    def __bool__(self):
+        return bool(self.scopes)
+
+    __nonzero__ = __bool__
+
+    def requested(self, func, exclude=()):
+        '''
+        The fixtures a function requires (directly or through other fixtures), dependencies first.
+
+        :param exclude: arguments which are not fixtures (ie. parameters)
+        :type exclude: list
+        :rtype: list
+        :raises ValueError: on dependency cycles or if a fixture requires a narrower scoped one
+        '''
+        names = []
+
+        def visit(name, chain):
+            if name in names:
+                return
+            if name in chain:
+                raise ValueError('Fixtures dependency cycle: {0}'.format(' -> '.join(chain + (name,))))
+            for dependency in arguments(getattr(self.bench, name)):
+                if dependency not in self.scopes:
+                    continue
+                if SCOPES.index(self.scopes[dependency]) > SCOPES.index(self.lifetime(name)):
+                    msg = 'Fixture {0} ({1} scope) can\'t use the {2} scoped fixture {3}'
+                    raise ValueError(msg.format(name, self.lifetime(name), self.scopes[dependency], dependency))
+                visit(dependency, chain + (name,))
+            names.append(name)
+
+        for name in arguments(func):
+            if name in self.scopes and name not in exclude:
+                visit(name, ())
+        return names
+
+    def lifetime(self, name):
+        '''The scope a fixture function is called for (the method one for input pools)'''
+        return METHOD if name in self.options else self.scopes[name]
+
+    def start(self, names):
+        '''
+        Reset the overhead of the method and iteration scoped fixtures before running a method.
+
+        :returns: the overhead of each requested fixture (shared with the class scoped ones)
+        :rtype: OrderedDict
+        '''
+        for name in names:
+            if self.scopes[name] != CLASS or name not in self.stats:
+                self.stats[name] = self._new_stats(name)
+        return OrderedDict((name, self.stats[name]) for name in names)
+
+    def of(self, names, scope):
+        '''Filter fixtures names by scope'''
+        return [name for name in names if self.scopes[name] == scope]
+
+    def setup(self, names):
+        '''Set up the given fixtures which are not already (in the given order)'''
+        timer = self.bench.timer
+        for name in names:
+            if name in self.values:
+                continue
+            func = getattr(self.bench, name)
+            kwargs = dict((arg, self.values[arg]) for arg in arguments(func) if arg in self.scopes)
+            tick = timer.read()
+            if name in self.options:
+                if name not in self.pools:
+                    self.pools[name] = Pool(partial(func, **kwargs), **self.options[name])
+                refills = self.pools[name].refills
+                generator, value = None, self.pools[name].take()
+                self._track(name, 0, 0, self.pools[name].refills - refills)
+            elif inspect.isgeneratorfunction(func):
+                generator = func(**kwargs)
+                value = next(generator)
+            else:
+                generator, value = None, func(**kwargs)
+            self._track(name, (timer.read() - tick) * timer.scale, 1)
+            self.values[name] = value
+            self._active.append((name, generator))
+
+    def teardown(self, scope):
+        '''Tear down the active fixtures of a given scope (in the reverse set up order)'''
+        timer = self.bench.timer
+        for name, generator in reversed(list(self._active)):
+            if self.scopes[name] != scope:
+                continue
+            self._active.remove((name, generator))
+            del self.values[name]
+            if generator is not None:
+                tick = timer.read()
+                next(generator, None)
+                self._track(name, (timer.read() - tick) * timer.scale, 0)
+        if scope == METHOD:
+            self.pools = {}
+
+    @contextmanager
+    def scope(self, names, scope):
+        '''Keep some fixtures set up during a block and tear down the ones of a given scope after'''
+        self.setup(names)
+        try:
+            yield
+        finally:
+            self.teardown(scope)
+
+    def kwargs(self, names):
+        '''The current values of some fixtures as keyword arguments'''
+        return dict((name, self.values[name]) for name in names)
+
+    def _new_stats(self, name):
+        stats = {'scope': self.scopes[name], 'calls': 0, 'total': 0.}
+        if name in self.options:
+            stats['refills'] = 0
+        return stats
+
+    def _track(self, name, duration, calls, refills=0):
+        stats = self.stats.setdefault(name, self._new_stats(name))
+        stats['calls'] += calls
+        stats['total'] += duration
+        if refills:
+            stats['refills'] += refills
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+'''
+A local append-only results history stored in a SQLite database.
+
+Each run is stored with its timestamp, its git commit, its machine fingerprint
+and its environment (see :func:`~minibench.environment.probe`).
+Queries are performed by SQLite and rows are iterated from cursors
+so the history size does not matter.
+'''
+from __future__ import unicode_literals
+
+import json
+import sqlite3
+import time
+
+from array import array
+from collections import namedtuple
+
+from .compare import environment_of
+from .environment import fingerprint, git_commit
+from .report import BaseReporter
+
+DEFAULT_HISTORY = '.minibench.db'
+
+#: The stored summary fields for each method
+FIELDS = ('times', 'rounds', 'number', 'total', 'mean', 'min', 'max', 'median', 'stdev', 'p90', 'p99')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    git_commit TEXT,
+    machine TEXT,
+    environment TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_machine ON runs (machine, timestamp);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    key TEXT NOT NULL,
+    method TEXT NOT NULL,
+    bench_name TEXT,
+    name TEXT,
+    times INTEGER,
+    rounds INTEGER,
+    number INTEGER,
+    total REAL,
+    mean REAL,
+    min REAL,
+    max REAL,
+    median REAL,
+    stdev REAL,
+    p90 REAL,
+    p99 REAL,
+    samples BLOB
+);
+CREATE INDEX IF NOT EXISTS results_method ON results (key, method, run_id);
+'''
+
+SELECT = '''
+SELECT runs.timestamp, runs.git_commit, runs.machine, runs.environment, results.*
+FROM results JOIN runs ON runs.id = results.run_id
+'''
+
+#: A single method result from the history
+Entry = namedtuple('Entry', ('timestamp', 'git_commit', 'machine', 'environment', 'key', 'method', 'bench_name', 'name')
+                   + FIELDS + ('samples',))
+
+
+def pack(samples):
+    '''Pack samples into bytes'''
+    data = array(str('d'), samples)
+    return sqlite3.Binary(data.tobytes() if hasattr(data, 'tobytes') else data.tostring())
+
+
+def unpack(blob):
+    '''Unpack samples packed by :func:`pack`'''
+    data = array(str('d'))
+    if blob:
+        if hasattr(data, 'frombytes'):
+            data.frombytes(bytes(blob))
+        else:  # pragma: no cover
+            data.fromstring(bytes(blob))
+    return data
+
+
+class History(object):
+    '''A local results history database'''
+    def __init__(self, path=DEFAULT_HISTORY):
+        '''
+        :param path: the SQLite database file path
+        :type path: string
+        '''
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+        columns = [row['name'] for row in self.db.execute('PRAGMA table_info(runs)')]
+        if 'environment' not in columns:
+            with self.db:
+                self.db.execute('ALTER TABLE runs ADD COLUMN environment TEXT')
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def record(self, summary, commit=None, machine=None, timestamp=None):
+        '''
+        Append a run summary (as computed by :meth:`~minibench.BaseReporter.summary`) to the history
+        with its environment if recorded.
+
+        :returns: the run identifier
+        :rtype: int
+        '''
+        environment = environment_of(summary)
+        if environment is not None:
+            environment = json.dumps(environment)
+        with self.db:
+            cursor = self.db.execute('''INSERT INTO runs (timestamp, git_commit, machine, environment)
+                                        VALUES (?, ?, ?, ?)''',
+                                     (timestamp or time.time(), commit, machine, environment))
+            run_id = cursor.lastrowid
+            rows = (
+                (run_id, key, method, bench['name'], run['name'], bench['times'])
+                + tuple(run.get(field) for field in FIELDS[1:])
+                + (pack(run.get('samples', [])),)
+                for key, bench in summary.items()
+                for method, run in bench['runs'].items()
+            )
+            placeholders = ', '.join('?' * (len(FIELDS) + 6))
+            self.db.executemany('''INSERT INTO results (run_id, key, method, bench_name, name, {0}, samples)
+                                   VALUES ({1})'''.format(', '.join(FIELDS), placeholders), rows)
+        return run_id
+
+    def _entries(self, query, *params):
+        for row in self.db.execute(query, params):
+            values = dict((k, row[k]) for k in row.keys())
+            values['samples'] = unpack(values['samples'])
+            values['environment'] = json.loads(values['environment']) if values['environment'] else None
+            yield Entry(**dict((field, values[field]) for field in Entry._fields))
+
+    def count(self):
+        '''The number of recorded runs'''
+        return self.db.execute('SELECT COUNT(*) FROM runs').fetchone()[0]
+
+    def methods(self):
+        '''Iterate over all the known ``(key, method)`` couples'''
+        for row in self.db.execute('SELECT DISTINCT key, method FROM results ORDER BY key, method'):
+            yield row['key'], row['method']
+
+    def trend(self, key, method, limit=None):
+        '''Iterate over a method results ordered by time (the ``limit`` most recent only if given)'''
+        query = SELECT + 'WHERE results.key = ? AND results.method = ? '
+        if limit:
+            query += 'ORDER BY runs.timestamp DESC LIMIT {0:d}'.format(limit)
+            return reversed(list(self._entries(query, key, method)))
+        return self._entries(query + 'ORDER BY runs.timestamp ASC', key, method)
+
+    def fastest(self, key, method):
+        '''The fastest result ever of a method'''
+        query = SELECT + 'WHERE results.key = ? AND results.method = ? ORDER BY results.mean ASC LIMIT 1'
+        return next(self._entries(query, key, method), None)
+
+    def slowest(self, key, method):
+        '''The slowest result ever of a method'''
+        query = SELECT + 'WHERE results.key = ? AND results.method = ? ORDER BY results.mean DESC LIMIT 1'
+        return next(self._entries(query, key, method), None)
+
+    def baseline(self, machine=None, exclude_commit=None, any_machine=False):
+        '''
+        Pick the best baseline for each method as a summary usable as reference.
+
+        The baseline of each method is its most recent result on the given machine
+        (or on any machine if no machine is given).
+        Results from ``exclude_commit`` (ie. the current commit) are ignored.
+        Each benchmark summary gives the ``machine`` fingerprint and the ``environment``
+        of its baseline run so it can be checked (see :func:`~minibench.compare.compare_environments`).
+
+        :param machine: the machine fingerprint
+        :type machine: string
+        :param exclude_commit: the git commit whose results are ignored
+        :type exclude_commit: string
+        :param any_machine: fall back on the most recent result on any machine
+                            if there is none on the given machine
+        :type any_machine: bool
+        :rtype: dict
+        '''
+        summary = {}
+        conditions = 'WHERE results.key = ? AND results.method = ? '
+        order = 'ORDER BY runs.timestamp DESC LIMIT 1'
+        extra = ()
+        if exclude_commit:
+            conditions += 'AND (runs.git_commit IS NULL OR runs.git_commit != ?) '
+            extra = (exclude_commit,)
+        for key, method in list(self.methods()):
+            entry = None
+            if machine:
+                query = SELECT + conditions + 'AND runs.machine = ? ' + order
+                entry = next(self._entries(query, key, method, *(extra + (machine,))), None)
+            if entry is None and (any_machine or not machine):
+                entry = next(self._entries(SELECT + conditions + order, key, method, *extra), None)
+            if entry is None:
+                continue
+            bench = summary.setdefault(key, {'name': entry.bench_name, 'times': entry.times, 'runs': {},
+                                             'machine': entry.machine})
+            if entry.environment and not bench.get('environment'):
+                bench['environment'] = entry.environment
+            run = dict((field, getattr(entry, field)) for field in FIELDS[1:])
+            run['name'] = entry.name
+            run['samples'] = entry.samples.tolist()
+            bench['runs'][method] = run
+        return summary
+
+
+class HistoryReporter(BaseReporter):
+    '''A reporter appending each run into a :class:`History` database'''
+    def __init__(self, path=DEFAULT_HISTORY, **kwargs):
+        '''
+        :param path: the history database path
+        :type path: string
+        '''
+        self.path = path
+        super(HistoryReporter, self).__init__(**kwargs)
+
+    def end(self):
+        with History(self.path) as history:
+            history.record(self.summary(), commit=git_commit(), machine=fingerprint())
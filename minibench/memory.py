@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+'''
+Memory measurements helpers.
+
+Allocations are traced with :mod:`tracemalloc` (Python 3.4+)
+and the peak RSS is read with :mod:`resource` (Unix only).
+
+A call memory is described by what it retains (allocated during the call and still alive after it),
+its traced memory peak and how much it raised the process RSS high-water mark.
+'''
+from __future__ import unicode_literals
+
+import sys
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    tracemalloc = None
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+#: The measured memory fields
+FIELDS = ('retained', 'retained_blocks', 'peak', 'rss_growth')
+
+
+def is_available():
+    '''Wether memory measurements are supported by this interpreter'''
+    return tracemalloc is not None
+
+
+def peak_rss():
+    '''The peak resident set size of the current process in bytes (``None`` if unsupported)'''
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on OSX but in kilobytes on other platforms
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def measure(func):
+    '''
+    Measure the memory used by a single call.
+
+    The returned dictionnary has the following keys:
+
+    - ``retained``: the net bytes allocated during the call and still alive after it
+    - ``retained_blocks``: the net number of memory blocks allocated during the call and still alive after it
+    - ``peak``: the peak traced memory during the call in bytes (temporary allocations included)
+    - ``rss_growth``: how much the call raised the peak RSS of the process in bytes
+      (``0`` if it stayed below a previous peak, ``None`` if unsupported)
+
+    Exceptions raised by ``func`` are ignored.
+
+    :rtype: dict
+    :raises RuntimeError: if :mod:`tracemalloc` is not available
+    '''
+    if not is_available():
+        raise RuntimeError('Memory measurements requires tracemalloc (Python 3.4+)')
+    was_tracing = tracemalloc.is_tracing()
+    rss = peak_rss()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        try:
+            func()
+        except Exception:
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    stats = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), 'filename')
+    return {
+        'retained': sum(stat.size_diff for stat in stats if stat.size_diff > 0),
+        'retained_blocks': sum(stat.count_diff for stat in stats if stat.count_diff > 0),
+        'peak': max(peak - baseline, 0),
+        'rss_growth': None if rss is None else peak_rss() - rss,
+    }
+
+
+def sizeof(value):
+    '''
+    The approximative deep size of a value in bytes.
+
+    Builtin containers items are followed (each object being counted once).
+
+    :rtype: int
+    '''
+    size = 0
+    seen = set()
+    pending = [value]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            pending.extend(obj)
+    return size
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+'''
+Parametrized benchmarks helpers.
+
+A benchmark method can be run once for each combination of its parameters values.
+Each combination is a variant identified by a key like ``bench_sort[size=100]``.
+'''
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+from itertools import product
+
+#: The method attribute storing its parameters as a list of ``(name, values)``
+PARAMS_ATTR = '__minibench_params__'
+
+
+def parametrize(name, values):
+    '''
+    Run a benchmark method once for each value of a parameter given as keyword argument.
+
+    Decorators can be stacked to build a parameters grid.
+
+    .. code-block:: python
+
+        class SortBenchmark(Benchmark):
+            @parametrize('size', [100, 1000, 10000])
+            def bench_sorted(self, size):
+                sorted(range(size, 0, -1))
+
+    :param name: the parameter (ie. keyword argument) name
+    :type name: string
+    :param values: the parameter values
+    :type values: iterable
+    '''
+    def wrapper(func):
+        params = getattr(func, PARAMS_ATTR, [])
+        setattr(func, PARAMS_ATTR, [(name, list(values))] + params)
+        return func
+    return wrapper
+
+
+def params_of(func):
+    '''The parameters of a method declared with :func:`parametrize` as a list of ``(name, values)``'''
+    return getattr(func, PARAMS_ATTR, [])
+
+
+def expand(params):
+    '''
+    Expand a list of ``(name, values)`` into every parameters combinations.
+
+    :returns: a list of ordered dictionnaries (a single empty one if there is no parameter)
+    :rtype: list
+    '''
+    names = [name for name, _ in params]
+    return [OrderedDict(zip(names, values)) for values in product(*(values for _, values in params))]
+
+
+def variant_key(name, params):
+    '''Build a variant key from a method name and its parameters values'''
+    if not params:
+        return name
+    return '{0}[{1}]'.format(name, ','.join('{0}={1}'.format(k, v) for k, v in params.items()))
+
+
+def split_key(key):
+    '''Split a variant key into the method name and its parameters suffix (empty if not a variant)'''
+    name, _, suffix = key.partition('[')
+    return name, '[{0}'.format(suffix) if suffix else ''
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+'''
+Profile benchmark methods.
+
+Methods are profiled during extra iterations run after the timed ones
+so profiling never pollutes the timing samples.
+There are as many extra iterations as timed ones, within a time budget (see :func:`budget_calls`).
+
+Two profilers are available:
+
+- ``cprofile``: the deterministic :mod:`cProfile` profiler, exported as ``.pstats`` files
+- ``sampling``: a low-overhead sampling thread, exported as collapsed stacks (``.folded`` files)
+  ready for flamegraph tools
+
+Profiles are stored as JSON compatible dictionnaries so they can be transfered from other processes.
+'''
+from __future__ import unicode_literals, division
+
+import base64
+import cProfile
+import marshal
+import os
+import pstats
+import re
+import sys
+import threading
+
+from collections import defaultdict
+
+from .report import BaseReporter
+
+CPROFILE = 'cprofile'
+SAMPLING = 'sampling'
+PROFILERS = (CPROFILE, SAMPLING)
+
+#: How many hottest functions are kept by profile
+DEFAULT_TOP = 10
+#: The sampling profiler interval (in seconds)
+DEFAULT_INTERVAL = 0.001
+#: The expected profiling duration of a method (in seconds, without the profiler overhead)
+DEFAULT_BUDGET = 1.
+
+RE_UNSAFE = re.compile(r'[^\w.-]+')
+
+
+def label(filename, line, name):
+    '''Format a function label'''
+    if filename == '~':  # Builtins
+        return name
+    return '{0} ({1}:{2})'.format(name, os.path.basename(filename), line)
+
+
+def budget_calls(calls, mean, budget=DEFAULT_BUDGET):
+    '''
+    How many calls to profile given the timed calls count and their mean duration.
+
+    :param calls: the number of timed calls
+    :type calls: int
+    :param mean: the mean duration of a call (in seconds)
+    :type mean: float
+    :param budget: the expected profiling duration (in seconds)
+    :type budget: float
+    :returns: the number of calls fitting in the budget (at least one and at most ``calls``)
+    :rtype: int
+    '''
+    if mean > 0:
+        calls = min(calls, int(budget / mean))
+    return max(calls, 1)
+
+
+def _call(func, calls):
+    '''The profiled calls (frames above this one are not profiled)'''
+    for _ in range(calls):
+        try:
+            func()
+        except Exception:
+            pass
+
+
+def profile_cprofile(func, calls, top=DEFAULT_TOP):
+    '''
+    Profile ``calls`` calls of ``func`` with :mod:`cProfile`.
+
+    :rtype: dict
+    '''
+    profiler = cProfile.Profile()
+    profiler.runcall(_call, func, calls)
+    stats = pstats.Stats(profiler).stats
+    own = dict((key, stats[key]) for key in stats
+               if key[2] != _call.__name__ and not key[2].startswith('<method \'disable\''))
+    total = sum(value[2] for value in own.values()) or 1
+    hottest = sorted(own.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    return {
+        'profiler': CPROFILE,
+        'calls': calls,
+        'top': [{
+            'function': label(*key),
+            'calls': value[1],
+            'own': value[2] / total,
+            'cumulative': value[3] / total,
+        } for key, value in hottest],
+        'stats': base64.b64encode(marshal.dumps(stats)).decode('ascii'),
+    }
+
+
+class SamplingProfiler(object):
+    '''
+    Sample the current thread stack from another thread every ``interval`` seconds.
+
+    Stacks are collapsed as ``root;...;leaf`` strings.
+    '''
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self.stacks = defaultdict(int)
+        self.stopped = threading.Event()
+        self.target = None
+        self.thread = None
+
+    def __enter__(self):
+        self.target = threading.current_thread().ident
+        self.thread = threading.Thread(target=self.sample)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stopped.set()
+        self.thread.join()
+
+    def sample(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            while frame is not None and frame.f_code is not _call.__code__:
+                code = frame.f_code
+                stack.append(label(code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if frame is not None and stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+
+def profile_sampling(func, calls, top=DEFAULT_TOP, interval=DEFAULT_INTERVAL):
+    '''
+    Profile ``calls`` calls of ``func`` with a :class:`SamplingProfiler`.
+
+    :rtype: dict
+    '''
+    with SamplingProfiler(interval) as profiler:
+        _call(func, calls)
+    stacks = dict(profiler.stacks)
+    total = sum(stacks.values()) or 1
+    own = defaultdict(int)
+    cumulative = defaultdict(int)
+    for stack, count in stacks.items():
+        frames = stack.split(';')
+        own[frames[-1]] += count
+        for function in set(frames):
+            cumulative[function] += count
+    hottest = sorted(own.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        'profiler': SAMPLING,
+        'calls': calls,
+        'top': [{
+            'function': function,
+            'calls': None,
+            'own': count / total,
+            'cumulative': cumulative[function] / total,
+        } for function, count in hottest],
+        'stacks': stacks,
+    }
+
+
+def profile(name, func, calls, top=DEFAULT_TOP):
+    '''
+    Profile ``calls`` calls of ``func`` with a given profiler.
+
+    :param name: the profiler name (one of :data:`PROFILERS`)
+    :type name: string
+    :raises ValueError: if the profiler is unknown
+    '''
+    if name == CPROFILE:
+        return profile_cprofile(func, calls, top)
+    elif name == SAMPLING:
+        return profile_sampling(func, calls, top)
+    raise ValueError('Unknown profiler {0} (available: {1})'.format(name, ', '.join(PROFILERS)))
+
+
+def write_pstats(data, filename):
+    '''Write a ``cprofile`` profile as a ``.pstats`` file readable by :mod:`pstats`'''
+    with open(filename, 'wb') as out:
+        out.write(base64.b64decode(data['stats'].encode('ascii')))
+
+
+def write_collapsed(data, filename):
+    '''Write a ``sampling`` profile collapsed stacks (one ``stack count`` line by stack)'''
+    with open(filename, 'w') as out:
+        for stack, count in sorted(data['stacks'].items()):
+            out.write('{0} {1}\n'.format(stack, count))
+
+
+class ProfileReporter(BaseReporter):
+    '''
+    A reporter writing each profiled method profile into a directory.
+
+    Files are named after the benchmark key and the method:
+    ``<key>.<method>.pstats`` for ``cprofile`` and ``<key>.<method>.folded`` for ``sampling``.
+    '''
+    def __init__(self, directory='.', **kwargs):
+        '''
+        :param directory: the output directory (created if needed)
+        :type directory: string
+        '''
+        self.directory = directory
+        self.files = []
+        super(ProfileReporter, self).__init__(**kwargs)
+
+    def after_method(self, bench, method):
+        data = bench.results[method].profile
+        if not data:
+            return
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        basename = RE_UNSAFE.sub('_', '.'.join((self.key(bench), method))).strip('_')
+        if data['profiler'] == CPROFILE:
+            filename = os.path.join(self.directory, basename + '.pstats')
+            write_pstats(data, filename)
+        else:
+            filename = os.path.join(self.directory, basename + '.folded')
+            write_collapsed(data, filename)
+        self.files.append(filename)
@@ -5,6 +5,10 @@ import csv
 import json
 import os
 
+from ._compat import string_types
+from .complexity import analyze
+from .threads import gil_enabled, scaling as threads_scaling
+
 DEFAULT_PRECISION = 5
 
 
@@ -48,23 +52,106 @@ class BaseReporter(object):
         '''Compute the execution summary'''
         out = {}
         for bench in self.runner.runned:
-            key = self.key(bench)
-            runs = {}
-            for method, results in bench.results.items():
-                mean = results.total / bench.times
-                name = bench.label_for(method)
-                runs[method] = {
-                    'name': name,
-                    'total': results.total,
-                    'mean': mean
-                }
-            out[key] = {
-                'name': bench.label,
-                'times': bench.times,
-                'runs': runs
-            }
+            out[self.key(bench)] = self.summarize(bench)
+        return out
+
+    def summarize(self, bench):
+        '''Compute a single benchmark class summary'''
+        out = self.summarize_class(bench)
+        out['runs'] = dict((method, self.summarize_method(bench, method)) for method in bench.results)
         return out
 
+    def summarize_class(self, bench):
+        '''Compute a benchmark class summary without its methods runs'''
+        out = {
+            'name': bench.label,
+            'times': bench.times,
+            'batch': bench.batched,
+            'gc_mode': bench.gc_mode,
+            'clock': bench.timer.to_dict(),
+        }
+        environment = getattr(self.runner, 'environment', None)
+        if environment:
+            out['environment'] = environment
+        preflight = getattr(self.runner, 'preflight', None)
+        if preflight:
+            out['preflight'] = [finding._asdict() for finding in preflight]
+        fits = analyze(bench)
+        if fits:
+            out['complexity'] = dict((method, {
+                'name': bench.label_for(method),
+                'param': fit.param,
+                'order': fit.order,
+                'coefficient': fit.coefficient,
+                'constant': fit.constant,
+                'rms': fit.rms,
+            }) for method, fit in fits.items())
+        rows = threads_scaling(bench)
+        if rows:
+            out['gil'] = gil_enabled()
+            out['scaling'] = dict((method, {
+                'name': bench.label_for(method),
+                'threads': [{'threads': threads, 'ops': ops, 'speedup': speedup, 'efficiency': efficiency}
+                            for threads, ops, speedup, efficiency in values],
+            }) for method, values in rows.items())
+        return out
+
+    def summarize_method(self, bench, method):
+        '''Compute a single method run summary'''
+        results = bench.results[method]
+        run = {
+            'name': bench.label_for(method),
+            'rounds': results.rounds,
+            'number': results.number,
+            'total': results.total,
+            'mean': results.mean,
+            'min': results.min,
+            'max': results.max,
+            'median': results.median,
+            'stdev': results.stdev,
+            'p50': results.percentile(50),
+            'p90': results.percentile(90),
+            'p99': results.percentile(99),
+            'outliers': sum(results.outliers),
+            'overhead': results.overhead,
+            'warmup': results.warmup,
+            'samples': results.samples.tolist(),
+        }
+        if results.memory is not None:
+            run['memory'] = results.memory
+        if results.concurrency:
+            run['concurrency'] = {
+                'level': results.concurrency,
+                'ops': results.ops,
+                'p50': results.latency(50),
+                'p90': results.latency(90),
+                'p99': results.latency(99),
+            }
+        if results.work is not None:
+            run['throughput'] = {
+                'work': results.work,
+                'unit': bench.work_unit,
+                'rate': results.throughput,
+            }
+        if results.gc is not None:
+            run['gc'] = results.gc
+        if results.profile:
+            run['profile'] = dict((k, results.profile[k]) for k in ('profiler', 'calls', 'top'))
+        if results.worker:
+            run['worker'] = results.worker
+        if results.fixtures:
+            run['fixtures'] = results.fixtures
+        _, params = bench.variant_of(method)
+        if params:
+            run['params'] = dict((k, self.serializable(v)) for k, v in params.items())
+        return run
+
+    def serializable(self, value):
+        '''Keep JSON compatible parameters values as is and format the others'''
+        if value is None or isinstance(value, (bool, int, float) + string_types):
+            return value
+        return str(value)
+
     def key(self, bench):
         '''Generate a report key from a benchmark instance'''
         return '{bench.__class__.__name__}-{bench.times}'.format(bench=bench)
@@ -118,65 +205,238 @@ class JsonReporter(FileReporter):
         json.dump(self.summary(), out)
 
 
+class JsonLinesReporter(FileReporter):
+    '''
+    A reporter streaming results as JSON Lines while running.
+
+    Each line is a JSON object with a ``type`` and the benchmark ``key``:
+
+    - ``method``: written as soon as a method is finished with its ``method`` name and its ``run`` summary
+    - ``samples``: written every ``samples`` rounds with the new ``samples`` of the running ``method``
+      (only if ``samples`` is given)
+    - ``class``: written after each benchmark class with its ``bench`` summary (without the methods runs)
+
+    Each line is flushed and synced to disk so results survive a crash
+    and other tools can follow the file while running.
+    Nothing is kept in memory between lines.
+    '''
+    def __init__(self, filename, samples=None, **kwargs):
+        '''
+        :param samples: write the new samples every ``samples`` rounds
+        :type samples: int
+        '''
+        self.samples = samples
+        self.out = None
+        self._offset = 0
+        super(JsonLinesReporter, self).__init__(filename, **kwargs)
+
+    def start(self):
+        dirname = os.path.dirname(self.filename)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname)
+        self.out = open(self.filename, 'w')
+
+    def write(self, data):
+        '''Write, flush and sync a single JSON line'''
+        self.line(json.dumps(data))
+        self.out.flush()
+        os.fsync(self.out.fileno())
+
+    def before_method(self, bench, method):
+        self._offset = 0
+
+    def progress(self, bench, method, times):
+        results = bench.results.get(method)
+        if not self.samples or results is None:
+            return
+        if results.rounds - self._offset >= self.samples:
+            self.write_samples(bench, method, results)
+
+    def write_samples(self, bench, method, results):
+        self.write({
+            'type': 'samples',
+            'key': self.key(bench),
+            'method': method,
+            'offset': self._offset,
+            'samples': results.samples[self._offset:].tolist(),
+        })
+        self._offset = results.rounds
+
+    def after_method(self, bench, method):
+        results = bench.results.get(method)
+        if results is None:
+            return
+        if self.samples and results.rounds > self._offset:
+            self.write_samples(bench, method, results)
+        self.write({
+            'type': 'method',
+            'key': self.key(bench),
+            'method': method,
+            'run': self.summarize_method(bench, method),
+        })
+
+    def after_class(self, bench):
+        self.write({'type': 'class', 'key': self.key(bench), 'bench': self.summarize_class(bench)})
+
+    def end(self):
+        if self.out is not None:
+            self.out.close()
+            self.out = None
+
+
+def load_summary(lines):
+    '''
+    Load a summary as written by :class:`JsonReporter` or :class:`JsonLinesReporter`.
+
+    Partial JSON Lines files (ie. from a crashed run) are supported:
+    only the finished methods are loaded.
+
+    :param lines: an open file or an iterable of lines
+    :rtype: dict
+    '''
+    text = ''.join(lines) if not isinstance(lines, string_types) else lines
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+    if isinstance(data, dict) and not ('type' in data and 'key' in data):
+        return data
+    summary = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:  # Truncated last line
+            continue
+        bench = summary.setdefault(data['key'], {'runs': {}})
+        if data['type'] == 'method':
+            bench['runs'][data['method']] = data['run']
+        elif data['type'] == 'class':
+            bench.update(data['bench'])
+    return summary
+
+
 class CsvReporter(FileReporter):
     '''
     A reporter dumping results into a CSV file
 
     The CSV will have the following format:
 
-    =========  ======  =====  =========  ===========
-    Benchmark  Method  Times  Total (s)  Average (s)
-    =========  ======  =====  =========  ===========
+    =========  ======================================================
+    Benchmark  Each :attr:`FixedWidth.headers` (Method, Times, Total...)
+    =========  ======================================================
 
     It uses `;` character as delimiter and `"` as delimiter.
     All Strings are quoted.
     '''
     def output(self, out):
         writer = csv.writer(out, delimiter=str(';'), quotechar=str('"'), quoting=csv.QUOTE_NONNUMERIC)
-        writer.writerow(('Benchmark', 'Method', 'Times', 'Total (s)', 'Average (s)',))
-        for row in self.summary().values():
+        summary = self.summary()
+        columns = [c for c in FixedWidth.optional if any(FixedWidth.has_column(r, c) for r in summary.values())]
+        writer.writerow(('Benchmark',) + FixedWidth.headers + tuple(c[0] for c in columns))
+        for row in summary.values():
             for run in row['runs'].values():
-                writer.writerow((
-                    row['name'],
-                    run['name'],
-                    row['times'],
-                    run['total'],
-                    run['mean'],
-                ))
+                values = [row['name'], run['name'], row['times']]
+                values.extend(run[field] for field in FixedWidth.fields)
+                values.append(run['outliers'])
+                values.extend(run.get(section, {}).get(field, '') for _, section, field in columns)
+                writer.writerow(values)
 
 
 class FixedWidth(object):
     '''A mixins with helpers for fixed width tables raporters'''
-    headers = ('Method', 'Times', 'Total (s)', 'Average (s)')
+    headers = ('Method', 'Times', 'Total (s)', 'Average (s)', 'Min (s)', 'Median (s)', 'Max (s)',
+               'Stdev (s)', 'P90 (s)', 'P99 (s)', 'Outliers')
+    #: The float fields displayed between the times and the outliers columns
+    fields = ('total', 'mean', 'min', 'median', 'max', 'stdev', 'p90', 'p99')
+    #: Optional columns as ``(header, section, field)``,
+    #: displayed only if at least one method provides ``run[section][field]``
+    optional = (
+        ('Retained (B)', 'memory', 'retained'),
+        ('Retained blocks', 'memory', 'retained_blocks'),
+        ('Peak (B)', 'memory', 'peak'),
+        ('RSS growth (B)', 'memory', 'rss_growth'),
+        ('GC collections', 'gc', 'collections'),
+        ('GC pause (s)', 'gc', 'pause'),
+        ('Throughput (/s)', 'throughput', 'rate'),
+        ('Work unit', 'throughput', 'unit'),
+        ('Ops/s', 'concurrency', 'ops'),
+        ('Latency P50 (s)', 'concurrency', 'p50'),
+        ('Latency P99 (s)', 'concurrency', 'p99'),
+    )
+
+    @staticmethod
+    def has_column(bench, column):
+        '''Wether at least one method of a benchmark summary provides an optional column'''
+        _, section, field = column
+        return any(run.get(section, {}).get(field) is not None for run in bench['runs'].values())
+
+    #: The threads scaling tables headers
+    scaling_headers = ('Threads', 'Ops/s', 'Speedup', 'Efficiency')
 
     def with_sizes(self, *headers):
-        '''Compute the report summary and add the computed column sizes'''
-        if len(headers) != 5:
-            raise ValueError('You need to provide this headers: class, method, times, total, average')
+        '''
+        Compute the report summary and add the computed column sizes.
+
+        Each benchmark summary is also given its ``columns`` (the displayed optional columns)
+        and its full ``headers`` list.
+        '''
+        if len(headers) != len(self.headers) + 1:
+            msg = 'You need to provide this headers: class, {0}'
+            raise ValueError(msg.format(', '.join(h.lower() for h in self.headers)))
 
         summary = self.summary()
 
         for row in summary.values():
-            sizes = [len(header) for header in headers]
+            row['columns'] = [c for c in self.optional if self.has_column(row, c)]
+            row['headers'] = list(self.headers) + [c[0] for c in row['columns']]
+            sizes = [len(header) for header in list(headers) + [c[0] for c in row['columns']]]
             # Benchmark/Class column
             sizes[0] = max(sizes[0], len(row['name']))
-            # Method column
-            max_length = max(len(r['name']) for r in row['runs'].values())
-            sizes[1] = max(sizes[1], max_length)
-            # Times column
-            sizes[2] = max(sizes[2], len(str(row['times'])))
-            # Float columns
-            for idx, field in [(3, 'total'), (4, 'mean')]:
-                float_len = lambda r: len(self.float(r[field]))
-                max_length = max(float_len(r) for r in row['runs'].values())
-                sizes[idx] = max(sizes[idx], max_length)
+            # Methods columns
+            for run in row['runs'].values():
+                for idx, value in enumerate(self.values(row, run), 1):
+                    sizes[idx] = max(sizes[idx], len(value))
             row['sizes'] = sizes
 
         return summary
 
+    def values(self, bench, run):
+        '''Format a single method row values as strings'''
+        values = [run['name'], str(bench['times'])]
+        values.extend(self.float(run[field]) for field in self.fields)
+        values.append(str(run['outliers']))
+        for _, section, field in bench.get('columns', []):
+            value = run.get(section, {}).get(field)
+            values.append('' if value is None else self.float(value) if isinstance(value, float) else str(value))
+        return values
+
     def float(self, value):
         return '{0:.{1}f}'.format(value, self.precision)
 
+    def scalings(self, bench):
+        '''The benchmark threads scalings (if any) sorted by name'''
+        return sorted((bench.get('scaling') or {}).values(), key=lambda s: s['name'])
+
+    def scaling_rows(self, scaling):
+        '''Format a threads scaling table rows (headers first) as strings'''
+        rows = [list(self.scaling_headers)]
+        for row in scaling['threads']:
+            rows.append([str(row['threads']), '{0:.1f}'.format(row['ops']),
+                         '{0:.2f}'.format(row['speedup']), '{0:.1%}'.format(row['efficiency'])])
+        return rows
+
+    def complexity(self, bench):
+        '''Render the benchmark complexity fits (if any) as a list'''
+        fits = bench.get('complexity')
+        if not fits:
+            return
+        for fit in sorted(fits.values(), key=lambda f: f['name']):
+            self.line('- {name}: {order} (rms: {rms:.1%})'.format(**fit))
+        self.line()
+
 
 class MarkdownReporter(FileReporter, FixedWidth):
     '''
@@ -184,9 +444,9 @@ class MarkdownReporter(FileReporter, FixedWidth):
 
     Each benchmark will be rendered as a table with the following format:
 
-    ======  =====  =========  ===========
-    Method  Times  Total (s)  Average (s)
-    ======  =====  =========  ===========
+    ======  =====  =========  ===========  =======  ==========  =======  =========  =======  =======  ========
+    Method  Times  Total (s)  Average (s)  Min (s)  Median (s)  Max (s)  Stdev (s)  P90 (s)  P99 (s)  Outliers
+    ======  =====  =========  ===========  =======  ==========  =======  =========  =======  =======  ========
     '''
     def output(self, out):
         for bench in self.with_sizes('', *self.headers).values():
@@ -195,20 +455,31 @@ class MarkdownReporter(FileReporter, FixedWidth):
             self.line()
             # Table header
             sizes = bench['sizes'][1:]
-            headers = [h.ljust(s) for h, s in zip(self.headers, sizes)]
+            headers = [h.ljust(s) for h, s in zip(bench['headers'], sizes)]
             self.row(headers)
             separators = ['-' * size for size in sizes]
             self.row(separators, ':')
 
             # Table body
             for run in bench['runs'].values():
-                values = (run['name'], bench['times'], self.float(run['total']), self.float(run['mean']))
-                values = [str(v).ljust(s) for v, s in zip(values, sizes)]
+                values = [v.ljust(s) for v, s in zip(self.values(bench, run), sizes)]
                 self.row(values)
             self.line()
+            self.complexity(bench)
+            for scaling in self.scalings(bench):
+                self.line('**{0}**'.format(scaling['name']))
+                self.line()
+                rows = self.scaling_rows(scaling)
+                sizes = [max(len(row[idx]) for row in rows) for idx in range(len(self.scaling_headers))]
+                self.row([v.ljust(s) for v, s in zip(rows[0], sizes)])
+                self.row(['-' * size for size in sizes], ':')
+                for row in rows[1:]:
+                    self.row([v.ljust(s) for v, s in zip(row, sizes)])
+                self.line()
 
     def row(self, values, char=' '):
-            self.line('|{c}{r[0]}{c}|{c}{r[1]}{c}|{c}{r[2]}{c}|{c}{r[3]}{c}|'.format(r=values, c=char))
+        cells = '|'.join('{c}{v}{c}'.format(v=v, c=char) for v in values)
+        self.line('|{0}|'.format(cells))
 
 
 class RstReporter(FileReporter, FixedWidth):
@@ -217,12 +488,10 @@ class RstReporter(FileReporter, FixedWidth):
 
     Each benchmark will be rendered as a table with the following format:
 
-    ======  =====  =========  ===========
-    Method  Times  Total (s)  Average (s)
-    ======  =====  =========  ===========
+    ======  =====  =========  ===========  =======  ==========  =======  =========  =======  =======  ========
+    Method  Times  Total (s)  Average (s)  Min (s)  Median (s)  Max (s)  Stdev (s)  P90 (s)  P99 (s)  Outliers
+    ======  =====  =========  ===========  =======  ==========  =======  =========  =======  =======  ========
     '''
-    row = '| {row[0]: <{sizes[0]}} | {row[1]: <{sizes[1]}} | {row[2]: <{sizes[2]}} | {row[3]: <{sizes[3]}} |'
-
     def output(self, out):
         for bench in self.with_sizes('', *self.headers).values():
             # Bench label as title
@@ -232,17 +501,32 @@ class RstReporter(FileReporter, FixedWidth):
             # Table header
             sizes = bench['sizes'][1:]
             self.line(self.separator(sizes))
-            line = self.row.format(row=self.headers, sizes=sizes)
-            self.line(line)
+            self.line(self.row(bench['headers'], sizes))
             self.line(self.separator(sizes, '='))
             # Table body
             for run in bench['runs'].values():
-                row = (run['name'], bench['times'], self.float(run['total']), self.float(run['mean']))
-                line = self.row.format(row=row, sizes=sizes)
-                self.line(line)
+                self.line(self.row(self.values(bench, run), sizes))
             # Table footer
             self.line(self.separator(sizes))
             self.line()
+            self.complexity(bench)
+            for scaling in self.scalings(bench):
+                self.line(scaling['name'])
+                self.line('-' * len(scaling['name']))
+                self.line()
+                rows = self.scaling_rows(scaling)
+                sizes = [max(len(row[idx]) for row in rows) for idx in range(len(self.scaling_headers))]
+                self.line(self.separator(sizes))
+                self.line(self.row(rows[0], sizes))
+                self.line(self.separator(sizes, '='))
+                for row in rows[1:]:
+                    self.line(self.row(row, sizes))
+                self.line(self.separator(sizes))
+                self.line()
+
+    def row(self, values, sizes):
+        cells = ' | '.join(v.ljust(s) for v, s in zip(values, sizes))
+        return '| {0} |'.format(cells)
 
     def separator(self, sizes, char='-'):
         line = '+'.join([char * (size + 2) for size in sizes])
@@ -3,11 +3,20 @@ from __future__ import unicode_literals
 
 import inspect
 import logging
-import os
+import sys
 
 
 from . import Benchmark
+from .dependencies import Dependencies
+from .discovery import Index, LazyBenchmark
+from .distributed import DistributedExecutor
+from .environment import KEY_PACKAGES, probe
+from .executor import pin
+from .tuning import default_cpus, stabilize
+from .executor import IsolatedExecutor, ParallelExecutor
 from .report import BaseReporter
+from .selection import selects, tags_of
+from .utils import module_name
 from ._compat import load_module, string_types
 
 log = logging.getLogger(__name__)
@@ -23,16 +32,80 @@ class BenchmarkRunner(object):
         :type reporters: list
         :param debug: Run in debug mode if ``True``
         :type debug: bool
+        :param jobs: Run benchmarks on this number of worker processes if greater than 1
+        :type jobs: int
+        :param by_method: Dispatch individual methods instead of classes to workers
+        :type by_method: bool
+        :param isolate: Run each benchmark in a freshly spawned interpreter if ``True``
+        :type isolate: bool
+        :param workers: Run benchmarks on these remote workers ``(host, port)`` addresses
+                        (see :mod:`minibench.distributed`)
+        :type workers: list
+        :param lazy: Discover benchmarks without importing them (modules are imported on run) if ``True``
+        :type lazy: bool
+        :param cache: the lazy discovery cache file path (default to no cache)
+        :type cache: string
+        :param keyword: only run methods whose class or method name match this expression
+                        (see :mod:`minibench.selection`)
+        :type keyword: string
+        :param markers: only run methods whose tags match this expression
+        :type markers: string
+        :param dependencies: the dependency index file path recording the benchmarks modules dependencies
+                             and their last results (default to no index)
+        :type dependencies: string
+        :param cpus: Pin the benchmark process (or the workers processes) on this CPU set
+        :type cpus: list
+        :param stable: Check the system noise (see :mod:`minibench.tuning`), pin the process
+                       and raise its priority before running if ``True``
+        :type stable: bool
+        :param changed: if given, only run the benchmarks affected by these changed files
+                        and reuse the stored results for the others (requires ``dependencies``)
+        :type changed: list
+        :param packages: the benchmarked packages whose versions are recorded in the environment
+                         (along with the :data:`~minibench.environment.KEY_PACKAGES`)
+        :type packages: list
         '''
         self.benchmarks = []
         self.runned = []
         self.reporters = []
+        self.sources = {}
         self.debug = kwargs.get('debug', False)
+        self.jobs = kwargs.get('jobs', 1) or 1
+        self.by_method = kwargs.get('by_method', False)
+        self.isolate = kwargs.get('isolate', False)
+        self.workers = kwargs.get('workers')
+        self.lazy = kwargs.get('lazy', False)
+        self.keyword = kwargs.get('keyword')
+        self.markers = kwargs.get('markers')
+        self.modules = {}
+        self.changed = kwargs.get('changed')
+        self.dependencies = Dependencies(kwargs['dependencies']) if kwargs.get('dependencies') else None
+        #: The benchmarks whose results have been reused instead of being run
+        self.reused = []
+        #: The environment probed on run start (see :func:`~minibench.environment.probe`)
+        self.environment = None
+        #: The packages whose versions are probed
+        self.packages = list(KEY_PACKAGES) + [name for name in kwargs.get('packages') or []
+                                              if name not in KEY_PACKAGES]
+        self.cpus = kwargs.get('cpus')
+        self.stable = kwargs.get('stable', False)
+        #: The preflight and tuning findings in stable mode (see :func:`~minibench.tuning.stabilize`)
+        self.preflight = None
 
+        index = Index(kwargs.get('cache')) if self.lazy else None
         for filename in filenames:
-            module = self.load_module(filename)
-            benchmarks = self.load_from_module(module)
+            benchmarks = self.discover(index, filename) if index else None
+            if benchmarks is None:
+                module = self.load_module(filename)
+                benchmarks = self.load_from_module(module)
+            benchmarks = [benchmark for benchmark in benchmarks if self.collect(benchmark)]
             self.benchmarks.extend(benchmarks)
+            if isinstance(filename, string_types):
+                for benchmark in benchmarks:
+                    self.sources[benchmark] = filename
+
+        if index:
+            index.save()
 
         for reporter in kwargs.get('reporters', []):
             if inspect.isclass(reporter) and issubclass(reporter, BaseReporter):
@@ -49,27 +122,197 @@ class BenchmarkRunner(object):
 
         Extras kwargs are passed to benchmarks construtors.
         '''
+        if self.keyword:
+            kwargs.setdefault('keyword', self.keyword)
+        if self.markers:
+            kwargs.setdefault('markers', self.markers)
+        self.environment = probe(self.packages)
+        # Only local worker processes run at once
+        jobs = self.jobs if not self.isolate and not self.workers else 1
+        if self.stable:
+            self.cpus = self.cpus or default_cpus(jobs)
+            self.preflight = stabilize(self.cpus, jobs)
+        elif self.cpus:
+            if jobs > len(self.cpus):
+                log.warning('%s worker processes share %s CPU(s) and disturb each other', jobs, len(self.cpus))
+            pin(set(self.cpus))
         self.report_start()
-        for bench in self.benchmarks:
-            bench = bench(before=self.report_before_method,
-                      after=self.report_after_method,
-                      after_each=self.report_progress,
-                      debug=self.debug,
-                      **kwargs)
-            self.report_before_class(bench)
-            bench.run()
-            self.report_after_class(bench)
-            self.runned.append(bench)
+        if self.isolate:
+            with IsolatedExecutor(cpus=self.cpus) as executor:
+                self.run_with(executor, **kwargs)
+        elif self.workers:
+            with DistributedExecutor(self.workers) as executor:
+                self.run_with(executor, **kwargs)
+        elif self.jobs > 1:
+            with ParallelExecutor(self.jobs, self.cpus) as executor:
+                self.run_with(executor, **kwargs)
+        else:
+            for benchmark in self.benchmarks:
+                if not self.reuse(benchmark, **kwargs):
+                    self.run_local(benchmark, **kwargs)
+        if self.dependencies:
+            self.dependencies.save()
         self.report_end()
 
+    def run_local(self, benchmark, **kwargs):
+        '''Run a single benchmark class in the current process'''
+        bench = benchmark(before=self.report_before_method,
+                          after=self.report_after_method,
+                          after_each=self.report_progress,
+                          debug=self.debug,
+                          **kwargs)
+        self.report_before_class(bench)
+        bench.run()
+        self.report_after_class(bench)
+        self.runned.append(bench)
+        self.store(benchmark, bench, **kwargs)
+
+    def run_with(self, executor, **kwargs):
+        '''
+        Run benchmarks with an executor.
+
+        All benchmarks are submitted first and results are reported
+        as soon as available but in the benchmarks order,
+        so reports are the same as a serial run.
+        Benchmarks not loaded from a file are run in the current process.
+        '''
+        pending = []
+        for benchmark in self.benchmarks:
+            filename = self.sources.get(benchmark)
+            if self.reusable(benchmark, **kwargs) is not None:
+                pending.append((benchmark, []))
+                continue
+            elif filename is None:
+                pending.append((benchmark, None))
+                continue
+            options = dict(kwargs, debug=self.debug)
+            if self.by_method:
+                methods = benchmark(**options)._collect()
+                waits = [executor.submit(filename, benchmark.__name__, dict(options, methods=[method]))
+                         for method in methods]
+            else:
+                waits = [executor.submit(filename, benchmark.__name__, options)]
+            pending.append((benchmark, waits))
+
+        for benchmark, waits in pending:
+            if self.reuse(benchmark, **kwargs):
+                continue
+            elif waits is None:
+                self.run_local(benchmark, **kwargs)
+                continue
+            bench = benchmark(debug=self.debug, **kwargs)
+            for wait in waits:
+                bench.load(wait())
+            self.replay(bench)
+            self.store(benchmark, bench, **kwargs)
+
+    def reusable(self, benchmark, **kwargs):
+        '''
+        The stored results of a benchmark not affected by the changed files
+        and produced with the same options (the benchmark constructor ``kwargs``).
+
+        :returns: the stored results or ``None`` if the benchmark should run
+        :rtype: dict
+        '''
+        filename = self.sources.get(benchmark)
+        if self.changed is None or not self.dependencies or filename is None:
+            return None
+        if self.dependencies.affected(filename, self.changed):
+            return None
+        return self.dependencies.stored(filename, benchmark.__name__, dict(kwargs, debug=self.debug))
+
+    def reuse(self, benchmark, **kwargs):
+        '''
+        Report the stored results of a benchmark instead of running it if it is not affected by the changes.
+
+        :returns: ``True`` if the stored results have been reused
+        :rtype: bool
+        '''
+        data = self.reusable(benchmark, **kwargs)
+        if data is None:
+            return False
+        bench = benchmark(debug=self.debug, **kwargs)
+        bench.load(data)
+        self.reused.append(bench)
+        self.replay(bench)
+        return True
+
+    def store(self, benchmark, bench, **kwargs):
+        '''Store a benchmark results and the options they have been produced with into the dependency index'''
+        filename = self.sources.get(benchmark)
+        if self.dependencies and filename is not None:
+            self.dependencies.store(filename, benchmark.__name__, bench.dump(), dict(kwargs, debug=self.debug))
+
+    def replay(self, bench):
+        '''Report a benchmark which has been run elsewhere'''
+        self.report_before_class(bench)
+        for method in bench._collect():
+            if method not in bench.results:
+                continue
+            self.report_before_method(bench, method)
+            self.report_progress(bench, method, bench.results[method].rounds)
+            self.report_after_method(bench, method)
+        self.report_after_class(bench)
+        self.runned.append(bench)
+
+    def collect(self, benchmark, prefix='bench_'):
+        '''
+        List the selected methods of a benchmark class without instanciating it.
+
+        Lazy benchmarks are not imported: their statically discovered methods and tags are used.
+        Parametrized methods are listed once (variants are only known at run time).
+
+        :returns: a list of ``(method, tags)`` tuples
+        :rtype: list
+        '''
+        if isinstance(benchmark, LazyBenchmark) and not benchmark.loaded:
+            methods = [(name, tuple(benchmark.tags.get(name, ()))) for name in benchmark.methods]
+        else:
+            if isinstance(benchmark, LazyBenchmark):
+                benchmark = benchmark.load()
+            common = tuple(benchmark.tags or ())
+            methods = [(name, common + tags_of(getattr(benchmark, name)))
+                       for name in sorted(dir(benchmark)) if name.startswith(prefix)]
+        return [(name, tags) for name, tags in methods
+                if selects(self.keyword, self.markers, benchmark.__name__, name, tags)]
+
+    def discover(self, index, filename):
+        '''
+        Discover the benchmarks of a file without importing it.
+
+        A file is not statically discoverable (so it is imported) if it can't be parsed,
+        if a class inherits from a base which can't be resolved without importing it (ie. an imported base class)
+        or if no benchmark has been found.
+
+        :returns: the :class:`~minibench.discovery.LazyBenchmark` list
+                  or ``None`` if the file can't be discovered statically
+        '''
+        if not isinstance(filename, string_types):
+            return None
+        try:
+            infos = index.scan(filename)
+        except SyntaxError:
+            return None
+        if not infos or any(info.get('unresolved') for info in infos):
+            return None
+        return [LazyBenchmark(filename, info, self.import_module) for info in infos]
+
+    def import_module(self, filename):
+        '''Load a benchmark module from file once'''
+        if filename not in self.modules:
+            self.modules[filename] = self.load_module(filename)
+        return self.modules[filename]
+
     def load_module(self, filename):
-        '''Load a benchmark module from file'''
+        '''Load a benchmark module from file (recording its dependencies if needed)'''
         if not isinstance(filename, string_types):
             return filename
-        basename = os.path.splitext(os.path.basename(filename))[0]
-        basename = basename.replace('.bench', '')
-        modulename = 'benchmarks.{0}'.format(basename)
-        return load_module(modulename, filename)
+        before = set(sys.modules)
+        module = load_module(module_name(filename), filename)
+        if self.dependencies:
+            modules = [sys.modules[name] for name in set(sys.modules) - before if sys.modules[name] is not None]
+            self.dependencies.record(filename, module, modules)
+        return module
 
     def load_from_module(self, module):
         '''Load all benchmarks from a given module'''
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+'''
+Select benchmarks with pytest-like expressions.
+
+Expressions combine identifiers with ``and``, ``or``, ``not`` and parentheses:
+
+- keyword expressions (``-k``) identifiers match case-insensitively any part
+  of the benchmark class name or of the method name (ie. ``sort and not stupid``)
+- marker expressions (``-m``) identifiers match exactly the method tags (ie. ``slow or io``)
+
+Methods are tagged with the :func:`tag` decorator or by the class :attr:`~minibench.Benchmark.tags`.
+'''
+from __future__ import unicode_literals
+
+import re
+
+#: The method attribute storing its tags
+TAGS_ATTR = '__minibench_tags__'
+
+RE_TOKEN = re.compile(r'\s*(\(|\)|[^\s()]+)')
+OPERATORS = ('and', 'or', 'not')
+
+
+def tag(*names):
+    '''
+    Tag a benchmark method so it can be selected with marker expressions.
+
+    .. code-block:: python
+
+        class IOBenchmark(Benchmark):
+            @tag('slow', 'io')
+            def bench_write(self):
+                ...
+    '''
+    def wrapper(func):
+        setattr(func, TAGS_ATTR, tuple(getattr(func, TAGS_ATTR, ())) + names)
+        return func
+    return wrapper
+
+
+def tags_of(func):
+    '''The tags of a method given by :func:`tag`'''
+    return tuple(getattr(func, TAGS_ATTR, ()))
+
+
+class Expression(object):
+    '''
+    A parsed selection expression.
+
+    .. code-block:: python
+
+        expr = Expression('slow and not io')
+        expr.evaluate(lambda name: name in tags)
+    '''
+    def __init__(self, text):
+        '''
+        :param text: the expression
+        :type text: string
+        :raises ValueError: if the expression is invalid
+        '''
+        self.text = text
+        self.tokens = RE_TOKEN.findall(text)
+        self.position = 0
+        self.tree = self.parse_or() if self.tokens else None
+        if self.position < len(self.tokens):
+            self.error('unexpected "{0}"'.format(self.tokens[self.position]))
+
+    def error(self, message):
+        raise ValueError('Invalid expression "{0}": {1}'.format(self.text, message))
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def next(self):
+        token = self.peek()
+        if token is None:
+            self.error('unexpected end')
+        self.position += 1
+        return token
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.peek() == 'or':
+            self.next()
+            node = ('or', node, self.parse_and())
+        return node
+
+    def parse_and(self):
+        node = self.parse_not()
+        while self.peek() == 'and':
+            self.next()
+            node = ('and', node, self.parse_not())
+        return node
+
+    def parse_not(self):
+        token = self.next()
+        if token == 'not':
+            return ('not', self.parse_not())
+        elif token == '(':
+            node = self.parse_or()
+            if self.next() != ')':
+                self.error('missing ")"')
+            return node
+        elif token == ')' or token in OPERATORS:
+            self.error('unexpected "{0}"'.format(token))
+        return ('ident', token)
+
+    def evaluate(self, matcher):
+        '''
+        Evaluate the expression.
+
+        :param matcher: a callable telling wether an identifier matches
+        :type matcher: callable
+        :rtype: bool
+        '''
+        return self.tree is None or self._evaluate(self.tree, matcher)
+
+    def _evaluate(self, node, matcher):
+        op = node[0]
+        if op == 'ident':
+            return bool(matcher(node[1]))
+        elif op == 'not':
+            return not self._evaluate(node[1], matcher)
+        elif op == 'and':
+            return self._evaluate(node[1], matcher) and self._evaluate(node[2], matcher)
+        return self._evaluate(node[1], matcher) or self._evaluate(node[2], matcher)
+
+
+def match_keyword(expression, *names):
+    '''Wether a keyword expression matches any part of the given names'''
+    if not expression:
+        return True
+    names = [name.lower() for name in names]
+    return Expression(expression).evaluate(lambda ident: any(ident.lower() in name for name in names))
+
+
+def match_markers(expression, tags):
+    '''Wether a marker expression matches a set of tags'''
+    if not expression:
+        return True
+    tags = set(tags)
+    return Expression(expression).evaluate(lambda ident: ident in tags)
+
+
+def selects(keyword, markers, class_name, method, tags):
+    '''Wether a method is selected by both the keyword and the marker expressions'''
+    return match_keyword(keyword, class_name, method) and match_markers(markers, tags)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+'''
+Pure python statistics helpers.
+
+All functions expecting ``sorted_values`` rely on the caller to provide
+an already sorted sequence to avoid sorting the same samples many times.
+'''
+from __future__ import unicode_literals, division
+
+import math
+
+#: Tukey's fences factor used to detect outliers
+IQR_FACTOR = 1.5
+
+
+def mean(values):
+    '''Compute the arithmetic mean of a sequence'''
+    if not len(values):
+        return 0
+    return math.fsum(values) / len(values)
+
+
+def stdev(values, mu=None):
+    '''Compute the sample standard deviation of a sequence'''
+    size = len(values)
+    if size < 2:
+        return 0
+    mu = mean(values) if mu is None else mu
+    return math.sqrt(math.fsum((v - mu) ** 2 for v in values) / (size - 1))
+
+
+def percentile(sorted_values, p):
+    '''
+    Compute the ``p`` percentile using linear interpolation between closest ranks.
+
+    :param sorted_values: the sorted samples
+    :param p: the percentile to compute between 0 and 100
+    :type p: float
+    '''
+    size = len(sorted_values)
+    if not size:
+        return 0
+    if size == 1:
+        return sorted_values[0]
+    rank = (size - 1) * p / 100
+    lower = int(math.floor(rank))
+    upper = min(lower + 1, size - 1)
+    weight = rank - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * weight
+
+
+def median(sorted_values):
+    '''Compute the median of sorted samples'''
+    return percentile(sorted_values, 50)
+
+
+def outliers(sorted_values, factor=IQR_FACTOR):
+    '''
+    Count the outliers using Tukey's fences (interquartile range).
+
+    :returns: a tuple of the low and high outliers counts
+    :rtype: tuple
+    '''
+    if len(sorted_values) < 4:
+        return 0, 0
+    q1 = percentile(sorted_values, 25)
+    q3 = percentile(sorted_values, 75)
+    iqr = q3 - q1
+    low_fence = q1 - factor * iqr
+    high_fence = q3 + factor * iqr
+    low = sum(1 for v in sorted_values if v < low_fence)
+    high = sum(1 for v in sorted_values if v > high_fence)
+    return low, high
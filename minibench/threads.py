@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+'''
+Multi-threaded contention benchmarks helpers.
+
+A method is called at once from a pool of threads released together by a start barrier.
+Each call is timed from the threads release until the slowest one completes,
+and each thread operation latency is kept.
+'''
+from __future__ import unicode_literals, division
+
+import sys
+import threading
+
+from collections import OrderedDict
+
+from .params import variant_key
+
+#: The parameter name of the threads count variants
+THREADS_PARAM = 'threads'
+
+
+def is_available():
+    '''Wether thread barriers are supported by this interpreter'''
+    return hasattr(threading, 'Barrier')
+
+
+def gil_enabled():
+    '''Wether the GIL is enabled (``None`` if unknown, ie. before free-threaded builds)'''
+    check = getattr(sys, '_is_gil_enabled', None)
+    return check() if check else None
+
+
+class ThreadPool(object):
+    '''
+    A pool of threads calling the same function on each :meth:`call`.
+
+    .. code-block:: python
+
+        with ThreadPool(4, func, clock) as pool:
+            duration, errors = pool.call(latencies)
+    '''
+    def __init__(self, size, func, clock):
+        '''
+        :param size: the number of threads
+        :type size: int
+        :param func: the function called by each thread
+        :type func: callable
+        :param clock: the clock timing calls
+        :type clock: Clock
+        :raises RuntimeError: if thread barriers are not available
+        '''
+        if not is_available():
+            raise RuntimeError('Threaded benchmarks requires Python 3.2+')
+        self.size = size
+        self.func = func
+        self.clock = clock
+        self.start = threading.Barrier(size + 1)
+        self.done = threading.Barrier(size + 1)
+        self.threads = []
+        self.running = True
+        self.latencies = [0] * size
+        self.errors = [None] * size
+
+    def __enter__(self):
+        for idx in range(self.size):
+            thread = threading.Thread(target=self.work, args=(idx,))
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def __exit__(self, *args):
+        self.running = False
+        self.start.wait()
+        for thread in self.threads:
+            thread.join()
+
+    def work(self, idx):
+        read = self.clock.read
+        while True:
+            self.start.wait()
+            if not self.running:
+                return
+            tick = read()
+            try:
+                self.func()
+                self.errors[idx] = None
+            except Exception as e:
+                self.errors[idx] = e
+            self.latencies[idx] = (read() - tick) * self.clock.scale
+            self.done.wait()
+
+    def call(self, latencies):
+        '''
+        Call the function from every thread at once.
+
+        :param latencies: a sequence each thread latency is appended to
+        :returns: the call duration and the raised errors (if any)
+        :rtype: tuple
+        '''
+        read = self.clock.read
+        tick = read()
+        self.start.wait()
+        self.done.wait()
+        duration = (read() - tick) * self.clock.scale
+        latencies.extend(self.latencies)
+        return duration, [e for e in self.errors if e is not None]
+
+
+def scaling(bench):
+    '''
+    Compute the scaling of each threaded method of a benchmark which has run.
+
+    The speedup and the efficiency are relative to the smallest threads count throughput:
+    ``speedup = ops(n) / ops(min)`` and ``efficiency = speedup * min / n``.
+
+    :returns: the scaling rows ``(threads, ops, speedup, efficiency)`` by method key
+              (the variant key without the threads parameter)
+    :rtype: OrderedDict
+    '''
+    groups = OrderedDict()
+    for key in bench._collect():
+        results = bench.results.get(key)
+        name, params = bench.variant_of(key)
+        if results is None or THREADS_PARAM not in params or not results.has_success:
+            continue
+        others = OrderedDict((k, v) for k, v in params.items() if k != THREADS_PARAM)
+        groups.setdefault(variant_key(name, others), []).append((params[THREADS_PARAM], results.ops))
+
+    out = OrderedDict()
+    for key, points in groups.items():
+        points.sort()
+        base_threads, base_ops = points[0]
+        if not base_ops:
+            continue
+        out[key] = [(threads, ops, ops / base_ops, ops / base_ops * base_threads / threads)
+                    for threads, ops in points]
+    return out
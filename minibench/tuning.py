@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+'''
+Check and reduce the system noise before running benchmarks.
+
+The preflight checks (mostly relying on Linux ``/proc`` and ``/sys`` files) report:
+
+- the CPU frequency governor of the benchmark CPUs (``performance`` is expected)
+- wether the benchmark CPUs are isolated from the scheduler (``isolcpus`` kernel parameter)
+- the load average
+- the swap usage
+- the turbo boost status
+- wether each worker process has its own CPU
+
+Checks which can't be performed on the current platform are skipped.
+The benchmark process can then be pinned on a CPU set and its priority raised (if permitted).
+
+After the run, the :func:`noise` of each method tells if the changes of the requested threshold can be detected.
+'''
+from __future__ import unicode_literals, division
+
+import math
+import os
+
+from collections import namedtuple
+
+from .compare import BUSY_LOAD, Z_SCORES
+from .environment import load_average, read, turbo
+from .executor import available_cpus, pin
+
+OK = 'ok'
+WARNING = 'warning'
+
+#: The niceness increment applied to raise the benchmark process priority
+PRIORITY_INCREMENT = -10
+
+GOVERNOR = '/sys/devices/system/cpu/cpu{0}/cpufreq/scaling_governor'
+ISOLATED = '/sys/devices/system/cpu/isolated'
+MEMINFO = '/proc/meminfo'
+
+#: A single preflight check result
+Finding = namedtuple('Finding', ('check', 'status', 'message'))
+
+
+def parse_cpus(value):
+    '''
+    Parse a CPU list as found in ``/sys`` or given on the command line (ie. ``0,2-3``).
+
+    :rtype: list
+    :raises ValueError: if the list is invalid
+    '''
+    cpus = set()
+    for part in (value or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            cpus.update(range(int(start), int(end) + 1))
+        else:
+            cpus.add(int(part))
+    if any(cpu < 0 for cpu in cpus):
+        raise ValueError('CPU numbers should be positive')
+    return sorted(cpus)
+
+
+def isolated_cpus():
+    '''The CPUs isolated from the scheduler'''
+    return parse_cpus(read(ISOLATED))
+
+
+def default_cpus(count=1):
+    '''
+    The CPUs used to run benchmarks when none are given:
+    the isolated ones completed by the last available ones to get at least ``count`` CPUs (if available).
+
+    :param count: the minimum number of CPUs (ie. the number of worker processes)
+    :type count: int
+    :rtype: list
+    '''
+    available = available_cpus()
+    isolated = [cpu for cpu in isolated_cpus() if cpu in available]
+    missing = max(count - len(isolated), 0)
+    others = [cpu for cpu in available if cpu not in isolated]
+    return sorted(isolated + (others[-missing:] if missing else []))
+
+
+def check_governor(cpus):
+    governors = dict((cpu, read(GOVERNOR.format(cpu))) for cpu in cpus)
+    if not any(governors.values()):
+        return None
+    slow = sorted(cpu for cpu, governor in governors.items() if governor and governor != 'performance')
+    if slow:
+        msg = 'CPU {0} frequency governor is {1} (should be performance)'
+        return Finding('governor', WARNING, msg.format(','.join(map(str, slow)), governors[slow[0]]))
+    return Finding('governor', OK, 'CPU frequency governor is performance')
+
+
+def check_isolated(cpus):
+    if not os.path.exists(ISOLATED):
+        return None
+    isolated = isolated_cpus()
+    shared = [cpu for cpu in cpus if cpu not in isolated]
+    if shared:
+        msg = 'CPU {0} not isolated (see the isolcpus kernel parameter)'
+        return Finding('isolated', WARNING, msg.format(','.join(map(str, shared))))
+    return Finding('isolated', OK, 'Benchmark CPUs are isolated')
+
+
+def check_load():
+    load = load_average()
+    if load is None:
+        return None
+    ratio = load[0] / len(available_cpus())
+    if ratio > BUSY_LOAD:
+        return Finding('load', WARNING, 'The machine is busy (load average: {0:.2f})'.format(load[0]))
+    return Finding('load', OK, 'Load average is {0:.2f}'.format(load[0]))
+
+
+def check_swap():
+    meminfo = {}
+    for line in (read(MEMINFO) or '').splitlines():
+        name, _, value = line.partition(':')
+        meminfo[name.strip()] = value.strip()
+    if 'SwapTotal' not in meminfo:
+        return None
+    used = int(meminfo['SwapTotal'].split()[0]) - int(meminfo.get('SwapFree', '0 kB').split()[0])
+    if used > 0:
+        return Finding('swap', WARNING, '{0} kB of swap are used'.format(used))
+    return Finding('swap', OK, 'Swap is not used')
+
+
+def check_turbo():
+    enabled = turbo()
+    if enabled is None:
+        return None
+    if enabled:
+        return Finding('turbo', WARNING, 'Turbo boost is enabled')
+    return Finding('turbo', OK, 'Turbo boost is disabled')
+
+
+def check_shared(cpus, jobs):
+    if jobs <= 1:
+        return None
+    if jobs > len(cpus):
+        msg = '{0} worker processes share {1} CPU(s) and disturb each other'
+        return Finding('cpus', WARNING, msg.format(jobs, len(cpus)))
+    return Finding('cpus', OK, 'Each worker process has its own CPU')
+
+
+def preflight(cpus, jobs=1):
+    '''
+    Run all the preflight checks for a CPU set.
+
+    :param cpus: the benchmark CPUs
+    :type cpus: list
+    :param jobs: the number of worker processes running at once on these CPUs
+    :type jobs: int
+    :rtype: list of :class:`Finding`
+    '''
+    findings = (check_governor(cpus), check_isolated(cpus), check_shared(cpus, jobs),
+                check_load(), check_swap(), check_turbo())
+    return [finding for finding in findings if finding is not None]
+
+
+def raise_priority(increment=PRIORITY_INCREMENT):
+    '''
+    Raise the current process priority (inherited by its children).
+
+    :rtype: Finding
+    '''
+    try:
+        niceness = os.nice(increment)
+    except (AttributeError, OSError):
+        return Finding('priority', WARNING, 'Not permitted to raise the process priority')
+    return Finding('priority', OK, 'Process niceness is {0}'.format(niceness))
+
+
+def stabilize(cpus, jobs=1):
+    '''
+    Check the system, pin the current process on a CPU set and raise its priority.
+
+    :param cpus: the benchmark CPUs
+    :type cpus: list
+    :param jobs: the number of worker processes running at once on these CPUs
+    :type jobs: int
+    :returns: the preflight and tuning findings
+    :rtype: list of :class:`Finding`
+    '''
+    findings = preflight(cpus, jobs)
+    if hasattr(os, 'sched_setaffinity'):
+        pin(set(cpus))
+        findings.append(Finding('affinity', OK, 'Pinned on CPU {0}'.format(','.join(map(str, cpus)))))
+    else:
+        findings.append(Finding('affinity', WARNING, 'CPU affinity is not supported on this platform'))
+    findings.append(raise_priority())
+    return findings
+
+
+def noise(results):
+    '''
+    The relative half-width of a method results mean 95% confidence interval:
+    smaller changes can't be detected.
+
+    :param results: the method results
+    :type results: Result
+    :rtype: float
+    '''
+    if results.rounds < 2 or not results.mean:
+        return 0.
+    return Z_SCORES[0.95] * results.stdev / math.sqrt(results.rounds) / results.mean
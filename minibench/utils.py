@@ -1,10 +1,16 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import os
 import re
 
 RE_CAMEL = re.compile(r'([A-Z][^A-Z]*)')
 
+BYTES_UNITS = ('B', 'KiB', 'MiB', 'GiB', 'TiB')
+#: Work units considered as bytes
+BYTES = ('B', 'bytes')
+SI_PREFIXES = ('', 'k', 'M', 'G', 'T')
+
 
 def humanize(text):
     '''Transform code conventions to human readable strings'''
@@ -14,3 +20,34 @@ def humanize(text):
             words.append(word.lower())
     words[0] = words[0].title()
     return ' '.join(words)
+
+
+def humanize_bytes(size):
+    '''Transform a bytes size into a human readable string'''
+    value = float(size)
+    for unit in BYTES_UNITS:
+        if abs(value) < 1024 or unit == BYTES_UNITS[-1]:
+            break
+        value /= 1024
+    if unit == BYTES_UNITS[0]:
+        return '{0} {1}'.format(int(size), unit)
+    return '{0:.1f} {1}'.format(value, unit)
+
+
+def humanize_rate(rate, unit):
+    '''Transform a rate of work units by second into a human readable string'''
+    if unit in BYTES:
+        return '{0}/s'.format(humanize_bytes(rate)) if abs(rate) >= 1024 else '{0:.1f} B/s'.format(rate)
+    value = float(rate)
+    for prefix in SI_PREFIXES:
+        if abs(value) < 1000 or prefix == SI_PREFIXES[-1]:
+            break
+        value /= 1000
+    return '{0:.1f} {1}{2}/s'.format(value, prefix, unit)
+
+
+def module_name(filename):
+    '''Compute the module name a benchmark file is loaded into'''
+    basename = os.path.splitext(os.path.basename(filename))[0]
+    basename = basename.replace('.bench', '')
+    return 'benchmarks.{0}'.format(basename)
@@ -66,6 +66,7 @@ setup(
     entry_points={
         'console_scripts': [
             'bench = minibench.cli:cli',
+            'minibench = minibench.cli:main',
         ]
     },
     license='MIT',
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+'''Coroutine benchmarks relying on the ``async``/``await`` syntax (Python 3.5+)'''
+import asyncio
+
+from minibench import Benchmark, parametrize
+
+
+class AsyncBenchmark(Benchmark):
+    times = 3
+
+    def __init__(self, *args, **kwargs):
+        super(AsyncBenchmark, self).__init__(*args, **kwargs)
+        self.loops = set()
+        self.calls = 0
+
+    async def bench_sleep(self):
+        self.loops.add(asyncio.get_event_loop())
+        self.calls += 1
+        await asyncio.sleep(0.001)
+
+    @parametrize('delay', [0, 0.001])
+    async def bench_delay(self, delay):
+        await asyncio.sleep(delay)
+
+    def bench_sync(self):
+        pass
+
+
+class AsyncFailBenchmark(Benchmark):
+    times = 2
+
+    async def bench_fail(self):
+        raise ValueError('fail')
+
+
+class CustomLoopBenchmark(Benchmark):
+    times = 1
+    created = []
+
+    @staticmethod
+    def loop_factory():
+        loop = asyncio.new_event_loop()
+        CustomLoopBenchmark.created.append(loop)
+        return loop
+
+    async def bench_nothing(self):
+        pass
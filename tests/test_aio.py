@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import sys
+import unittest
+
+from minibench import BaseReporter, BenchmarkRunner
+from minibench.report import FixedWidth
+
+from . import ModuleFactory
+
+if sys.version_info >= (3, 5):
+    from .async_benchmarks import AsyncBenchmark, AsyncFailBenchmark, CustomLoopBenchmark
+
+
+@unittest.skipIf(sys.version_info < (3, 5), 'Coroutines requires Python 3.5+')
+class AsyncBenchmarkTests(unittest.TestCase):
+    def test_coroutines_are_awaited(self):
+        bench = AsyncBenchmark()
+        bench.run()
+        self.assertEqual(bench.calls, 3)
+        self.assertGreaterEqual(bench.results['bench_sleep'].mean, 0.001)
+        self.assertTrue(bench.results['bench_sleep'].has_success)
+        self.assertGreater(bench.results['bench_delay[delay=0.001]'].mean,
+                           bench.results['bench_delay[delay=0]'].mean)
+        self.assertTrue(bench.results['bench_sync'].has_success)
+
+    def test_single_loop_by_class(self):
+        bench = AsyncBenchmark()
+        bench.run()
+        self.assertEqual(len(bench.loops), 1)
+        self.assertTrue(next(iter(bench.loops)).is_closed())
+        self.assertIsNone(bench.loop)
+
+    def test_loop_factory(self):
+        CustomLoopBenchmark.created[:] = []
+        bench = CustomLoopBenchmark()
+        bench.run()
+        self.assertEqual(len(CustomLoopBenchmark.created), 1)
+        self.assertTrue(bench.results['bench_nothing'].has_success)
+
+    def test_errors(self):
+        bench = AsyncFailBenchmark(debug=True)
+        bench.run()
+        results = bench.results['bench_fail']
+        self.assertTrue(results.has_errors)
+        self.assertIsInstance(results.error, ValueError)
+
+    def test_concurrency(self):
+        bench = AsyncBenchmark(concurrency=10, methods=['bench_sleep'])
+        bench.run()
+        results = bench.results['bench_sleep']
+        self.assertEqual(bench.calls, 30)
+        self.assertEqual(results.concurrency, 10)
+        self.assertEqual(len(results.latencies), 30)
+        self.assertGreaterEqual(results.latency(50), 0.001)
+        # Operations are concurrent so each call lasts about a single operation
+        self.assertAlmostEqual(results.ops, 10 / results.mean)
+        self.assertGreater(results.ops, 1 / results.latency(50))
+
+    def test_concurrency_is_ignored_on_sync_methods(self):
+        bench = AsyncBenchmark(concurrency=10, methods=['bench_sync'])
+        bench.run()
+        self.assertIsNone(bench.results['bench_sync'].concurrency)
+
+    def test_dump_and_load(self):
+        bench = AsyncBenchmark(concurrency=2, methods=['bench_sleep'])
+        bench.run()
+        other = AsyncBenchmark()
+        other.load(bench.dump())
+        self.assertEqual(other.results['bench_sleep'].concurrency, 2)
+        self.assertEqual(len(other.results['bench_sleep'].latencies), 6)
+
+    def test_report(self):
+        class TestReporter(BaseReporter, FixedWidth):
+            pass
+
+        reporter = TestReporter()
+        runner = BenchmarkRunner(ModuleFactory(AsyncBenchmark), reporters=[reporter])
+        runner.run(concurrency=4)
+        for bench in reporter.with_sizes('', *reporter.headers).values():
+            run = bench['runs']['bench_sleep']
+            self.assertEqual(run['concurrency']['level'], 4)
+            self.assertIn('Ops/s', bench['headers'])
@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import json
 import time
 import unittest
 
-from minibench import Benchmark, DEFAULT_TIMES
+from minibench import Benchmark, DEFAULT_TIMES, memory, parametrize
+from minibench.benchmark import RemoteError
+from minibench.clock import DEFAULT_CLOCK
 from minibench.utils import humanize
 
 
@@ -244,6 +247,11 @@ class BenchmarkTest(unittest.TestCase):
 
         result = bench.results['bench_results']
         self.assertGreaterEqual(result.total, bench.times * 0.1)
+        self.assertEqual(len(result.samples), bench.times)
+        self.assertGreaterEqual(result.min, 0.1)
+        self.assertLessEqual(result.min, result.median)
+        self.assertLessEqual(result.median, result.max)
+        self.assertAlmostEqual(result.mean, result.total / bench.times)
         self.assertTrue(result.has_success)
         self.assertFalse(result.has_errors)
 
@@ -279,3 +287,339 @@ class BenchmarkTest(unittest.TestCase):
         self.assertFalse(result.has_success)
         self.assertTrue(result.has_errors)
         self.assertIsInstance(result.error, ValueError)
+
+    def test_default_clock(self):
+        bench = Benchmark()
+        self.assertEqual(bench.clock, DEFAULT_CLOCK)
+        self.assertEqual(bench.timer.name, DEFAULT_CLOCK)
+
+    def test_clock_attribute(self):
+        class Test(Benchmark):
+            clock = 'process_time'
+        bench = Test()
+        self.assertEqual(bench.timer.name, 'process_time')
+
+    def test_clock_constructor(self):
+        bench = Benchmark(clock='process_time')
+        self.assertEqual(bench.timer.name, 'process_time')
+
+    def test_unknown_clock(self):
+        with self.assertRaises(ValueError):
+            Benchmark(clock='unknown')
+
+    def test_number(self):
+        class Test(Benchmark):
+            number = 10
+
+            def bench_something(self):
+                pass
+
+        bench = Test(times=3)
+        bench.run()
+
+        result = bench.results['bench_something']
+        self.assertEqual(result.number, 10)
+        self.assertEqual(result.rounds, 3)
+        self.assertEqual(result.calls, 30)
+
+    def test_calibration(self):
+        class Test(Benchmark):
+            def bench_sleep(self):
+                time.sleep(0.001)
+
+        bench = Test(times=2, min_time=0.01)
+        bench.run()
+
+        result = bench.results['bench_sleep']
+        self.assertGreater(result.number, 1)
+        self.assertLessEqual(result.number, 10)
+        self.assertEqual(result.rounds, 2)
+        self.assertGreaterEqual(min(result.samples) * result.number, 0.01 / 2)
+
+    def test_max_time(self):
+        class Test(Benchmark):
+            def bench_sleep(self):
+                time.sleep(0.01)
+
+        bench = Test(times=1000, max_time=0.05)
+        bench.run()
+
+        result = bench.results['bench_sleep']
+        self.assertGreaterEqual(result.rounds, 1)
+        self.assertLess(result.rounds, 10)
+
+    def test_max_suite_time(self):
+        class Test(Benchmark):
+            def bench_first(self):
+                time.sleep(0.01)
+
+            def bench_second(self):
+                time.sleep(0.01)
+
+        bench = Test(times=1000, max_suite_time=0.05)
+        bench.run()
+
+        self.assertLess(bench.results['bench_first'].rounds, 10)
+        self.assertEqual(bench.results['bench_second'].rounds, 1)
+
+    def test_batch(self):
+        class Test(Benchmark):
+            batch = True
+            number = 100
+
+            def bench_something(self):
+                pass
+
+        bench = Test(times=3)
+        self.assertTrue(bench.batched)
+        bench.run()
+
+        result = bench.results['bench_something']
+        self.assertEqual(result.calls, 300)
+        self.assertEqual(result.rounds, 3)
+        self.assertGreater(result.overhead, 0)
+        self.assertTrue(result.has_success)
+
+    def test_batch_disabled_by_per_call_hooks(self):
+        class Test(CountHooks):
+            batch = True
+
+            def before_each(self):
+                self.runs['before_each'] += 1
+
+            def bench_something(self):
+                pass
+
+        bench = Test(times=3, number=2)
+        self.assertFalse(bench.batched)
+        bench.run()
+        self.assertEqual(bench.runs['before_each'], 6)
+
+    def test_batch_failure_is_replayed_by_call(self):
+        class FailBench(Benchmark):
+            def bench_failure(self):
+                raise Exception()
+
+        bench = FailBench(times=3, number=10, batch=True)
+        bench.run()
+
+        result = bench.results['bench_failure']
+        self.assertEqual(result.calls, 30)
+        self.assertFalse(result.has_success)
+        self.assertTrue(result.has_errors)
+
+    def test_overhead_is_cached(self):
+        bench = Benchmark()
+        self.assertEqual(bench.overhead(1000), bench.overhead(1000))
+
+    def test_dump_and_load(self):
+        class FailBench(Benchmark):
+            def bench_failure(self):
+                raise ValueError('Failed')
+
+            def bench_success(self):
+                pass
+
+        bench = FailBench(times=3, debug=True)
+        bench.run()
+        data = json.loads(json.dumps(bench.dump()))
+
+        loaded = FailBench()
+        loaded.load(data)
+
+        for method in 'bench_failure', 'bench_success':
+            expected, result = bench.results[method], loaded.results[method]
+            self.assertEqual(list(result.samples), list(expected.samples))
+            self.assertEqual(result.total, expected.total)
+            self.assertEqual(result.calls, expected.calls)
+            self.assertEqual(result.has_errors, expected.has_errors)
+        error = loaded.results['bench_failure'].error
+        self.assertIsInstance(error, RemoteError)
+        self.assertEqual(error.type, 'ValueError')
+        self.assertEqual(error.message, 'Failed')
+        self.assertEqual(loaded.timer.resolution, bench.timer.resolution)
+
+    def test_methods_selection(self):
+        class Test(Benchmark):
+            def bench_one(self):
+                pass
+
+            def bench_two(self):
+                pass
+
+        bench = Test(methods=['bench_two'])
+        self.assertEqual(bench._collect(), ['bench_two'])
+
+    @unittest.skipUnless(memory.is_available(), 'tracemalloc is required')
+    def test_memory(self):
+        class Test(Benchmark):
+            memory = True
+
+            def bench_allocate(self):
+                return bytearray(1024 * 1024)
+
+        bench = Test(times=2)
+        bench.run()
+
+        result = bench.results['bench_allocate']
+        self.assertGreaterEqual(result.memory['peak'], 1024 * 1024)
+
+    def test_no_memory_by_default(self):
+        class Test(Benchmark):
+            def bench_something(self):
+                pass
+
+        bench = Test(times=2)
+        bench.run()
+
+        self.assertIsNone(bench.results['bench_something'].memory)
+
+    def test_warmup(self):
+        class Test(Benchmark):
+            warmup = 3
+
+            def __init__(self, *args, **kwargs):
+                super(Test, self).__init__(*args, **kwargs)
+                self.calls = 0
+
+            def bench_something(self):
+                self.calls += 1
+
+        bench = Test(times=2)
+        bench.run()
+
+        result = bench.results['bench_something']
+        self.assertEqual(result.warmup, 3)
+        self.assertEqual(result.rounds, 2)
+        self.assertEqual(bench.calls, 5)
+
+    def test_auto_warmup_on_stable_method(self):
+        class Test(Benchmark):
+            warmup_auto = True
+            warmup_tolerance = 10
+
+            def bench_something(self):
+                pass
+
+        bench = Test(times=2)
+        bench.run()
+
+        result = bench.results['bench_something']
+        self.assertEqual(result.warmup, 2 * Test.warmup_window)
+        self.assertEqual(result.rounds, 2)
+
+    def test_auto_warmup_until_stable(self):
+        class Test(Benchmark):
+            warmup_auto = True
+            warmup_window = 2
+
+            def __init__(self, *args, **kwargs):
+                super(Test, self).__init__(*args, **kwargs)
+                self.calls = 0
+
+            def bench_slow_start(self):
+                self.calls += 1
+                time.sleep(0.0005 * 2 ** max(6 - self.calls, 0))
+
+        bench = Test(times=1, warmup_tolerance=0.5)
+        bench.run()
+
+        self.assertGreaterEqual(bench.results['bench_slow_start'].warmup, 6)
+
+    def test_auto_warmup_max(self):
+        class Test(Benchmark):
+            warmup_auto = True
+            warmup_max = 12
+            warmup_tolerance = 0
+
+            def __init__(self, *args, **kwargs):
+                super(Test, self).__init__(*args, **kwargs)
+                self.calls = 0
+
+            def bench_slower(self):
+                self.calls += 1
+                time.sleep(0.0001 * self.calls)
+
+        bench = Test(times=1)
+        bench.run()
+
+        self.assertEqual(bench.results['bench_slower'].warmup, 12)
+
+    def test_no_work_by_default(self):
+        class Test(Benchmark):
+            def bench_something(self):
+                pass
+
+        bench = Test(times=1)
+        bench.run()
+
+        self.assertIsNone(bench.results['bench_something'].work)
+        self.assertIsNone(bench.results['bench_something'].throughput)
+
+    def test_fixed_work(self):
+        class Test(Benchmark):
+            work = 100
+
+            def bench_something(self):
+                pass
+
+        bench = Test(times=2)
+        bench.run()
+
+        results = bench.results['bench_something']
+        self.assertEqual(results.work, 100)
+        self.assertAlmostEqual(results.throughput * results.total, 100 * 2)
+
+    def test_work_from_return_value(self):
+        class Test(Benchmark):
+            work = 'return'
+
+            def bench_sized(self):
+                return b'x' * 42
+
+            def bench_number(self):
+                return 12
+
+            def bench_fail(self):
+                raise ValueError()
+
+            def bench_iterator(self):
+                return iter(range(10))
+
+        bench = Test(times=1)
+        bench.run()
+
+        self.assertEqual(bench.results['bench_sized'].work, 42)
+        self.assertEqual(bench.results['bench_number'].work, 12)
+        self.assertIsNone(bench.results['bench_fail'].work)
+        self.assertIsNone(bench.results['bench_iterator'].work)
+        self.assertIsNone(bench.results['bench_iterator'].throughput)
+
+    def test_work_method(self):
+        class Test(Benchmark):
+            def work(self):
+                return self.variant['size'] * 2
+
+            @parametrize('size', [1, 2])
+            def bench_sized(self, size):
+                pass
+
+        bench = Test(times=1)
+        bench.run()
+
+        self.assertEqual(bench.results['bench_sized[size=1]'].work, 2)
+        self.assertEqual(bench.results['bench_sized[size=2]'].work, 4)
+
+    def test_work_is_serialized(self):
+        class Test(Benchmark):
+            work = 10
+
+            def bench_something(self):
+                pass
+
+        bench = Test(times=1)
+        bench.run()
+        other = Test()
+        other.load(json.loads(json.dumps(bench.dump())))
+
+        self.assertEqual(other.results['bench_something'].work, 10)
@@ -1,20 +1,33 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import gc
+import json
 import unittest
 import os
+import sys
+import threading
 
 from click.testing import CliRunner
 
-from minibench.cli import resolve_pattern, cli
+from minibench.cli import EXIT_INCOMPATIBLE, EXIT_REGRESSION, resolve_pattern, cli, main
+from minibench.dependencies import DEFAULT_DEPENDENCIES
+from minibench.distributed import Worker
+from minibench.executor import available_cpus
+from minibench.history import History
 
 from . import EXAMPLES
+from .test_tuning import SystemState
 
 
 class ClientTest(unittest.TestCase):
 
     def setUp(self):
         self.runner = CliRunner()
+        # Keep the default cache and dependencies files out of the working directory
+        filesystem = self.runner.isolated_filesystem()
+        filesystem.__enter__()
+        self.addCleanup(filesystem.__exit__, None, None, None)
 
     def assertMatch(self, resolved, expected):
         self.assertEqual(len(resolved), len(expected))
@@ -173,9 +186,366 @@ class ClientTest(unittest.TestCase):
             result = self.runner.invoke(cli, [filename, '--ref', 'ref.json'])
             self.assertEqual(result.exit_code, 0, result.exception)
 
+    def test_cli_with_packages(self):
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        result = self.runner.invoke(cli, [filename, '-t', '1', '--package', 'json', '--json', 'out.json'])
+        self.assertEqual(result.exit_code, 0, result.exception)
+        with open('out.json') as f:
+            data = json.load(f)
+        for bench in data.values():
+            self.assertIn('json', bench['environment']['packages'])
+
     def test_cli_with_ref_unit_seconds(self):
         filename = os.path.join(EXAMPLES, 'empty.bench.py')
         with self.runner.isolated_filesystem():
             self.runner.invoke(cli, [filename, '--json', 'ref.json'])
             result = self.runner.invoke(cli, [filename, '--ref', 'ref.json', '-u', 'seconds'])
             self.assertEqual(result.exit_code, 0, result.exception)
+
+    def test_cli_with_clock(self):
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        with self.runner.isolated_filesystem():
+            result = self.runner.invoke(cli, [filename, '--clock', 'process_time', '--json', 'out.json'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            with open('out.json') as f:
+                data = json.load(f)
+            for bench in data.values():
+                self.assertEqual(bench['clock']['name'], 'process_time')
+
+    def test_cli_with_time_budget(self):
+        filename = os.path.join(EXAMPLES, 'pause.bench.py')
+        result = self.runner.invoke(cli, [filename, '--min-time', '0.01', '--max-time', '0.05',
+                                          '--max-suite-time', '0.1'])
+        self.assertEqual(result.exit_code, 0, result.exception)
+
+    def test_cli_with_batch(self):
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        with self.runner.isolated_filesystem():
+            result = self.runner.invoke(cli, [filename, '--batch', '--json', 'out.json'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            with open('out.json') as f:
+                data = json.load(f)
+            for bench in data.values():
+                self.assertTrue(bench['batch'])
+
+    def test_cli_with_jobs(self):
+        filenames = [os.path.join(EXAMPLES, name) for name in ('sort.bench.py', 'empty.bench.py')]
+
+        def methods(filename):
+            with open(filename) as f:
+                data = json.load(f)
+            return [(bench, list(summary['runs'])) for bench, summary in data.items()]
+
+        args = filenames + ['-t', '2', '--no-cache']
+        result = self.runner.invoke(cli, args + ['--json', 'serial.json'])
+        self.assertEqual(result.exit_code, 0, result.exception)
+        result = self.runner.invoke(cli, args + ['--jobs', '2', '--json', 'parallel.json'])
+        self.assertEqual(result.exit_code, 0, result.exception)
+        self.assertEqual(len(methods('parallel.json')), 3)
+        self.assertEqual(methods('parallel.json'), methods('serial.json'))
+
+    def test_cli_with_isolation(self):
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        result = self.runner.invoke(cli, [filename, '--isolate'])
+        self.assertEqual(result.exit_code, 0, result.exception)
+
+    def test_cli_with_memory_and_ref(self):
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        with self.runner.isolated_filesystem():
+            self.runner.invoke(cli, [filename, '--memory', '--json', 'ref.json'])
+            result = self.runner.invoke(cli, [filename, '--memory', '--ref', 'ref.json'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            self.assertIn('memory:', result.output)
+
+    def test_cli_with_warmup(self):
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        with self.runner.isolated_filesystem():
+            result = self.runner.invoke(cli, [filename, '--warmup', '3', '--auto-warmup', '--json', 'out.json'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            self.assertIn('warmup', result.output)
+            with open('out.json') as f:
+                data = json.load(f)
+            for bench in data.values():
+                for run in bench['runs'].values():
+                    self.assertGreaterEqual(run['warmup'], 3)
+
+    def test_cli_fail_on_regression(self):
+        filename = os.path.join(EXAMPLES, 'pause.bench.py')
+        with self.runner.isolated_filesystem():
+            self.runner.invoke(cli, [filename, '-t', '6', '--json', 'ref.json'])
+            with open('ref.json') as f:
+                data = json.load(f)
+            for bench in data.values():
+                for run in bench['runs'].values():
+                    run['samples'] = [s / 2 for s in run['samples']]
+                    run['mean'] /= 2
+                    run['stdev'] /= 2
+                    run['total'] /= 2
+            with open('ref.json', 'w') as f:
+                json.dump(data, f)
+
+            result = self.runner.invoke(cli, [filename, '-t', '6', '--ref', 'ref.json'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+
+            result = self.runner.invoke(cli, [filename, '-t', '6', '--ref', 'ref.json', '--fail-on-regression', '5%'])
+            self.assertEqual(result.exit_code, EXIT_REGRESSION)
+            self.assertIn('regression', result.output)
+
+            args = ['--ref', 'ref.json', '--threshold', '500%', '--fail-on-regression', '5%']
+            result = self.runner.invoke(cli, [filename, '-t', '6'] + args)
+            self.assertEqual(result.exit_code, EXIT_REGRESSION)
+
+    def test_cli_invalid_threshold(self):
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        result = self.runner.invoke(cli, [filename, '--fail-on-regression', 'five'])
+        self.assertEqual(result.exit_code, 2)
+
+    def test_cli_with_history(self):
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        with self.runner.isolated_filesystem():
+            for _ in range(2):
+                result = self.runner.invoke(main, ['run', filename, '--history', 'history.db'])
+                self.assertEqual(result.exit_code, 0, result.exception)
+
+            result = self.runner.invoke(cli, [filename, '--history', 'history.db', '--baseline'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+
+            result = self.runner.invoke(main, ['history', '--db', 'history.db', 'trend'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            self.assertIn('EmptyBenchmark-5 / bench_nothing', result.output)
+            self.assertEqual(len(result.output.splitlines()), 4)
+
+            result = self.runner.invoke(main, ['history', '--db', 'history.db', 'extremes'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            self.assertIn('fastest', result.output)
+
+            result = self.runner.invoke(main, ['history', '--db', 'history.db', 'baseline', '-o', 'ref.json'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            with open('ref.json') as f:
+                self.assertIn('EmptyBenchmark-5', json.load(f))
+
+    def test_cli_with_baseline_from_another_machine(self):
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        with self.runner.isolated_filesystem():
+            self.runner.invoke(cli, [filename, '-t', '2', '--json', 'run.json'])
+            with open('run.json') as f:
+                data = json.load(f)
+            for bench in data.values():
+                bench['environment']['cpu_model'] = 'Another CPU'
+            with History('history.db') as db:
+                db.record(data, commit='other', machine='another-machine')
+
+            result = self.runner.invoke(cli, [filename, '-t', '2', '--history', 'history.db', '--baseline',
+                                              '--any-machine'])
+            self.assertEqual(result.exit_code, EXIT_INCOMPATIBLE)
+            self.assertIn('baseline comes from another machine (another-machine)', result.output)
+            self.assertIn('cpu_model differs from the reference', result.output)
+
+            result = self.runner.invoke(cli, [filename, '-t', '2', '--history', 'history.db', '--baseline'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            self.assertNotIn('another machine', result.output)
+            self.assertNotIn('differs from the reference', result.output)
+
+    def test_cli_with_parameters(self):
+        filename = os.path.join(EXAMPLES, 'complexity.bench.py')
+        result = self.runner.invoke(cli, [filename, '-t', '2'])
+        self.assertEqual(result.exit_code, 0, result.exception)
+        self.assertIn('Sorted [size=1000]', result.output)
+        self.assertIn('Sorted: O(', result.output)
+
+    @unittest.skipIf(sys.version_info < (3, 5), 'Coroutines requires Python 3.5+')
+    def test_cli_with_concurrency(self):
+        filename = os.path.join(os.path.dirname(__file__), 'async_benchmarks.py')
+        result = self.runner.invoke(cli, [filename, '--concurrency', '5', '-t', '2'])
+        self.assertEqual(result.exit_code, 0, result.exception)
+        self.assertIn('concurrency 5', result.output)
+
+    def test_cli_with_throughput(self):
+        filename = os.path.join(EXAMPLES, 'throughput.bench.py')
+        with self.runner.isolated_filesystem():
+            result = self.runner.invoke(cli, [filename, '-t', '2', '--json', 'out.json'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            self.assertIn('B/s', result.output)
+            self.assertIn('items/s', result.output)
+
+            result = self.runner.invoke(cli, [filename, '-t', '2', '--ref', 'out.json', '-u', 's'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+
+    def test_cli_with_threads(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        result = self.runner.invoke(cli, [filename, '--threads', '1,2', '-t', '2'])
+        self.assertEqual(result.exit_code, 0, result.exception)
+        self.assertIn('[threads=2]', result.output)
+        self.assertIn('scaling: ×1', result.output)
+
+    def test_cli_with_threads_and_thread_clock(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        result = self.runner.invoke(cli, [filename, '--threads', '1,2', '--clock', 'thread_time'])
+        self.assertEqual(result.exit_code, 2)
+
+    def test_cli_with_invalid_threads(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        result = self.runner.invoke(cli, [filename, '--threads', '1,a'])
+        self.assertEqual(result.exit_code, 2)
+
+    def test_cli_with_profile(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        with self.runner.isolated_filesystem():
+            result = self.runner.invoke(cli, [filename, '-t', '5', '--profile', 'cprofile', '--json', 'out/out.json'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            self.assertIn('profile (cprofile, 5 calls)', result.output)
+            self.assertTrue(any(f.endswith('.pstats') for f in os.listdir('out')))
+
+            result = self.runner.invoke(cli, [filename, '-t', '5', '--profile', 'sampling', '--profile-dir', 'prof'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            self.assertTrue(all(f.endswith('.folded') for f in os.listdir('prof')))
+
+    @unittest.skipUnless(hasattr(gc, 'callbacks'), 'gc.callbacks requires Python 3.3+')
+    def test_cli_with_gc_record(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        result = self.runner.invoke(cli, [filename, '-t', '5', '--gc', 'record'])
+        self.assertEqual(result.exit_code, 0, result.exception)
+        self.assertIn('gc: ', result.output)
+
+    def test_cli_with_gc_disabled(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        result = self.runner.invoke(cli, [filename, '-t', '5', '--gc', 'disabled'])
+        self.assertEqual(result.exit_code, 0, result.exception)
+        self.assertNotIn('gc: ', result.output)
+
+    def test_cli_with_fixtures(self):
+        filename = os.path.join(EXAMPLES, 'sort.bench.py')
+        result = self.runner.invoke(cli, [filename, '-t', '5', '-k', 'pep265'])
+        self.assertEqual(result.exit_code, 0, result.exception)
+        self.assertIn('fixtures: d (iteration) 5× ', result.output)
+        self.assertIn('values (class) 1× ', result.output)
+
+    def test_cli_with_jsonl_reference(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        with self.runner.isolated_filesystem():
+            result = self.runner.invoke(cli, [filename, '-t', '5', '--jsonl', 'out.jsonl', '--jsonl-samples', '2'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            with open('out.jsonl') as f:
+                self.assertTrue(all(json.loads(line) for line in f))
+
+            result = self.runner.invoke(cli, [filename, '-t', '5', '--ref', 'out.jsonl'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            self.assertIn('%', result.output)
+
+    def test_cli_list(self):
+        filename = os.path.join(EXAMPLES, 'throughput.bench.py')
+        result = self.runner.invoke(cli, [filename, '--list', '--no-cache', '-k', 'not dumps'])
+        self.assertEqual(result.exit_code, 0, result.exception)
+        self.assertIn('::ListThroughput::bench_list [memory]', result.output)
+        self.assertNotIn('bench_dumps', result.output)
+        self.assertIn('2 method(s) collected', result.output)
+
+    def test_cli_with_markers(self):
+        filename = os.path.join(EXAMPLES, 'throughput.bench.py')
+        result = self.runner.invoke(cli, [filename, '-t', '2', '--no-cache', '-M', 'slow'])
+        self.assertEqual(result.exit_code, 0, result.exception)
+        self.assertIn('Dumps indent', result.output)
+        self.assertNotIn('List throughput', result.output)
+
+    def test_cli_with_invalid_keyword(self):
+        filename = os.path.join(EXAMPLES, 'throughput.bench.py')
+        result = self.runner.invoke(cli, [filename, '-k', 'a and'])
+        self.assertEqual(result.exit_code, 2)
+
+    def test_cli_only_changed(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        with self.runner.isolated_filesystem():
+            result = self.runner.invoke(cli, [filename, '-t', '2', '--deps', 'deps.json', '--json', 'first.json'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            self.assertNotIn('reused', result.output)
+
+            result = self.runner.invoke(cli, [filename, '-t', '2', '--deps', 'deps.json', '--changed', 'other.py',
+                                              '--json', 'second.json'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            self.assertIn('(reused, not affected by changes)', result.output)
+            with open('first.json') as first, open('second.json') as second:
+                self.assertEqual(json.load(first), json.load(second))
+
+            result = self.runner.invoke(cli, [filename, '-t', '2', '--deps', 'deps.json', '--changed', filename])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            self.assertNotIn('reused', result.output)
+
+    def test_cli_dependencies_are_opt_in(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        result = self.runner.invoke(cli, [filename, '-t', '2'])
+        self.assertEqual(result.exit_code, 0, result.exception)
+        self.assertFalse(os.path.exists(DEFAULT_DEPENDENCIES))
+
+        result = self.runner.invoke(cli, [filename, '-t', '2', '--changed', filename])
+        self.assertEqual(result.exit_code, 0, result.exception)
+        self.assertTrue(os.path.exists(DEFAULT_DEPENDENCIES))
+
+    def test_cli_with_workers(self):
+        server = Worker('127.0.0.1', 0)
+        thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01})
+        thread.daemon = True
+        thread.start()
+        try:
+            filename = os.path.join(EXAMPLES, 'sum.bench.py')
+            result = self.runner.invoke(cli, [filename, '-t', '2', '--workers', server.address])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            self.assertIn('worker: ', result.output)
+            self.assertIn(server.address, result.output)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_cli_with_invalid_workers(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        result = self.runner.invoke(cli, [filename, '--workers', 'lab1:port'])
+        self.assertEqual(result.exit_code, 2)
+
+    def test_cli_with_incompatible_reference(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        with self.runner.isolated_filesystem():
+            self.runner.invoke(cli, [filename, '-t', '2', '--json', 'ref.json'])
+            result = self.runner.invoke(cli, [filename, '-t', '2', '--ref', 'ref.json'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            self.assertNotIn('cpu_model differs from the reference', result.output)
+
+            with open('ref.json') as f:
+                data = json.load(f)
+            for bench in data.values():
+                bench['environment']['cpu_model'] = 'Another CPU'
+                bench['environment']['release'] = 'another-release'
+            with open('ref.json', 'w') as f:
+                json.dump(data, f)
+
+            result = self.runner.invoke(cli, [filename, '-t', '2', '--ref', 'ref.json'])
+            self.assertEqual(result.exit_code, EXIT_INCOMPATIBLE)
+            self.assertIn('cpu_model differs from the reference', result.output)
+
+            result = self.runner.invoke(cli, [filename, '-t', '2', '--ref', 'ref.json', '--allow-incompatible'])
+            self.assertEqual(result.exit_code, 0, result.exception)
+            self.assertIn('release differs from the reference', result.output)
+
+    def test_cli_stable(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        with SystemState():
+            result = self.runner.invoke(cli, [filename, '-t', '3', '--stable', '--cpus', '0', '--threshold', '0'])
+        self.assertEqual(result.exit_code, 0, result.exception)
+        self.assertIn('Pinned on CPU 0', result.output)
+        self.assertIn('too noisy to detect a 0.00% change', result.output)
+
+    def test_cli_with_more_jobs_than_cpus(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        result = self.runner.invoke(cli, [filename, '--cpus', '0', '-j', '2'])
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn('2 jobs would share 1 CPU(s)', result.output)
+
+    def test_cli_with_more_jobs_than_available_cpus(self):
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        jobs = len(available_cpus()) + 1
+        result = self.runner.invoke(cli, [filename, '-t', '1', '-j', str(jobs)])
+        self.assertEqual(result.exit_code, 0, result.exception)
+        self.assertIn('worker processes are not pinned', result.output)
+
+    def test_cli_with_invalid_cpus(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        result = self.runner.invoke(cli, [filename, '--cpus', '100000'])
+        self.assertEqual(result.exit_code, 2)
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import time
+import unittest
+
+from minibench.clock import Clock, DEFAULT_CLOCK, available_clocks, get_clock
+
+
+class ClockTests(unittest.TestCase):
+    def test_default_clock_is_available(self):
+        self.assertIn(DEFAULT_CLOCK, available_clocks())
+
+    def test_get_clock_is_calibrated(self):
+        clock = get_clock()
+        self.assertEqual(clock.name, DEFAULT_CLOCK)
+        self.assertGreater(clock.resolution, 0)
+        self.assertGreater(clock.overhead, 0)
+
+    def test_get_clock_is_cached(self):
+        self.assertIs(get_clock(), get_clock())
+
+    def test_unknown_clock(self):
+        with self.assertRaises(ValueError):
+            get_clock('unknown')
+
+    def test_read_in_seconds(self):
+        clock = Clock('test', lambda: 2000000000, 1e-9)
+        self.assertEqual(clock(), 2)
+
+    def test_measure(self):
+        clock = get_clock()
+        tick = clock.read()
+        time.sleep(0.01)
+        duration = (clock.read() - tick) * clock.scale
+        self.assertGreaterEqual(duration, 0.01)
+
+    def test_to_dict(self):
+        data = get_clock().to_dict()
+        self.assertEqual(set(data), set(['name', 'resolution', 'overhead']))
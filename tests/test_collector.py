@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import gc
+import unittest
+
+from minibench import Benchmark, BaseReporter, BenchmarkRunner
+from minibench.collector import GC_COLLECT, GC_DISABLED, GC_ENABLED, GC_RECORD, Policy, check
+
+from . import ModuleFactory
+
+HAS_CALLBACKS = hasattr(gc, 'callbacks')
+
+
+class Cycle(object):
+    def __init__(self):
+        self.me = self
+
+
+class GcBenchmark(Benchmark):
+    times = 5
+
+    def __init__(self, *args, **kwargs):
+        super(GcBenchmark, self).__init__(*args, **kwargs)
+        self.enabled = []
+
+    def bench_cycles(self):
+        self.enabled.append(gc.isenabled())
+        for _ in range(2000):
+            Cycle()
+
+
+class PolicyTests(unittest.TestCase):
+    def test_check(self):
+        self.assertEqual(check(GC_DISABLED), GC_DISABLED)
+        with self.assertRaises(ValueError):
+            check('unknown')
+
+    def test_enabled(self):
+        with Policy(GC_ENABLED) as policy:
+            self.assertTrue(gc.isenabled())
+        self.assertIsNone(policy.recorded)
+
+    def test_disabled(self):
+        with Policy(GC_DISABLED):
+            self.assertFalse(gc.isenabled())
+        self.assertTrue(gc.isenabled())
+
+    def test_disabled_keeps_disabled_state(self):
+        gc.disable()
+        try:
+            with Policy(GC_DISABLED):
+                pass
+            self.assertFalse(gc.isenabled())
+        finally:
+            gc.enable()
+
+    def test_collect(self):
+        Cycle()
+        with Policy(GC_COLLECT) as policy:
+            policy.before_round()
+            self.assertEqual(gc.collect(), 0)
+
+    @unittest.skipUnless(HAS_CALLBACKS, 'gc.callbacks requires Python 3.3+')
+    def test_record(self):
+        with Policy(GC_RECORD) as policy:
+            gc.collect()
+            gc.collect(0)
+        self.assertNotIn(policy.callback, gc.callbacks)
+        recorded = policy.recorded
+        self.assertEqual(recorded['collections'], 2)
+        self.assertEqual(recorded['generations'][0], 1)
+        self.assertEqual(recorded['generations'][-1], 1)
+        self.assertGreater(recorded['pause'], 0)
+
+
+class GcBenchmarkTests(unittest.TestCase):
+    def test_default_mode(self):
+        bench = GcBenchmark()
+        bench.run()
+        self.assertTrue(all(bench.enabled))
+        self.assertIsNone(bench.results['bench_cycles'].gc)
+
+    def test_disabled_mode(self):
+        bench = GcBenchmark(gc_mode=GC_DISABLED)
+        bench.run()
+        self.assertEqual(bench.enabled, [False] * 5)
+        self.assertTrue(gc.isenabled())
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            GcBenchmark(gc_mode='unknown')
+
+    @unittest.skipUnless(HAS_CALLBACKS, 'gc.callbacks requires Python 3.3+')
+    def test_record_mode(self):
+        reporter = BaseReporter()
+        runner = BenchmarkRunner(ModuleFactory(GcBenchmark), reporters=[reporter])
+        runner.run(gc_mode=GC_RECORD)
+        for bench in reporter.summary().values():
+            self.assertEqual(bench['gc_mode'], GC_RECORD)
+            recorded = bench['runs']['bench_cycles']['gc']
+            self.assertGreater(recorded['collections'], 0)
+            self.assertLess(recorded['pause'], bench['runs']['bench_cycles']['total'])
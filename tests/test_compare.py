@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import random
+import unittest
+
+from minibench.benchmark import Result
+from minibench.compare import (
+    FASTER, SLOWER, UNCHANGED, compare, compare_environments, environment_of, mann_whitney, parse_threshold,
+    welch, describe
+)
+
+
+def result(samples):
+    result = Result()
+    for sample in samples:
+        result.add(sample)
+    return result
+
+
+def summary(samples, with_samples=True):
+    data = {
+        'mean': sum(samples) / len(samples),
+        'stdev': result(samples).stdev,
+        'rounds': len(samples),
+    }
+    if with_samples:
+        data['samples'] = samples
+    return data
+
+
+class MannWhitneyTests(unittest.TestCase):
+    def test_identical(self):
+        self.assertEqual(mann_whitney([1, 1, 1], [1, 1, 1]), 1)
+
+    def test_different(self):
+        self.assertLess(mann_whitney(range(20), range(100, 120)), 0.001)
+
+    def test_same_distribution(self):
+        rand = random.Random(42)
+        first = [rand.gauss(10, 1) for _ in range(200)]
+        second = [rand.gauss(10, 1) for _ in range(200)]
+        self.assertGreater(mann_whitney(first, second), 0.05)
+
+    def test_empty(self):
+        self.assertEqual(mann_whitney([], [1, 2]), 1)
+
+
+class WelchTests(unittest.TestCase):
+    def test_not_enough_data(self):
+        self.assertIsNone(welch(describe({'mean': 1}), describe({'mean': 2})))
+
+    def test_different(self):
+        first = describe(summary([1.0, 1.1, 0.9, 1.0], False))
+        second = describe(summary([2.0, 2.1, 1.9, 2.0], False))
+        self.assertLess(welch(first, second), 0.001)
+
+
+class CompareTests(unittest.TestCase):
+    def setUp(self):
+        rand = random.Random(42)
+        self.base = [rand.gauss(1, 0.01) for _ in range(100)]
+
+    def test_slower(self):
+        comparison = compare(result([s * 1.1 for s in self.base]), summary(self.base))
+        self.assertEqual(comparison.status, SLOWER)
+        self.assertAlmostEqual(comparison.change, 0.1, places=2)
+        self.assertLess(comparison.low, comparison.change)
+        self.assertGreater(comparison.high, comparison.change)
+        self.assertLess(comparison.pvalue, 0.05)
+
+    def test_faster(self):
+        comparison = compare(result([s * 0.9 for s in self.base]), summary(self.base))
+        self.assertEqual(comparison.status, FASTER)
+
+    def test_unchanged_below_threshold(self):
+        comparison = compare(result([s * 1.01 for s in self.base]), summary(self.base), threshold=0.05)
+        self.assertEqual(comparison.status, UNCHANGED)
+
+    def test_unchanged_if_not_significant(self):
+        noisy = [1, 10, 1, 10, 1, 10]
+        comparison = compare(result([2, 9, 1, 10, 2, 11]), summary(noisy))
+        self.assertEqual(comparison.status, UNCHANGED)
+        self.assertGreater(comparison.pvalue, 0.05)
+
+    def test_summary_stats_only(self):
+        comparison = compare(result([s * 1.1 for s in self.base]), summary(self.base, False))
+        self.assertEqual(comparison.status, SLOWER)
+
+    def test_legacy_reference(self):
+        comparison = compare(result([2, 2]), {'total': 2, 'mean': 1})
+        self.assertEqual(comparison.status, SLOWER)
+        self.assertIsNone(comparison.pvalue)
+
+
+class ParseThresholdTests(unittest.TestCase):
+    def test_ratio(self):
+        self.assertEqual(parse_threshold('0.05'), 0.05)
+
+    def test_percentage(self):
+        self.assertEqual(parse_threshold('5%'), 0.05)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            parse_threshold('five')
+
+
+ENVIRONMENT = {
+    'system': 'Linux',
+    'machine': 'x86_64',
+    'cpu_model': 'Some CPU',
+    'cpu_count': 4,
+    'python_implementation': 'CPython',
+    'python_version': '3.6.1',
+    'governor': 'performance',
+    'turbo': False,
+    'load_average': [0.1, 0.1, 0.1],
+    'packages': {'six': '1.10.0'},
+}
+
+
+class CompareEnvironmentsTests(unittest.TestCase):
+    def differences(self, **changes):
+        return dict((d.field, d.compatible) for d in compare_environments(ENVIRONMENT, dict(ENVIRONMENT, **changes)))
+
+    def test_same_environment(self):
+        self.assertEqual(self.differences(), {})
+
+    def test_unknown_values_are_ignored(self):
+        self.assertEqual(self.differences(governor=None, turbo=None), {})
+
+    def test_incompatible(self):
+        self.assertEqual(self.differences(cpu_model='Other CPU', cpu_count=8),
+                         {'cpu_model': False, 'cpu_count': False})
+        self.assertEqual(self.differences(python_version='3.7.0'), {'python_version': False})
+
+    def test_warnings(self):
+        self.assertEqual(self.differences(python_version='3.6.2', governor='powersave', turbo=True,
+                                          packages={'six': '1.11.0'}),
+                         {'python_version': True, 'governor': True, 'turbo': True, 'packages.six': True})
+
+    def test_busy_machine(self):
+        self.assertEqual(self.differences(load_average=[3., 1., 1.]), {'load_average': True})
+
+    def test_environment_of(self):
+        self.assertIsNone(environment_of({'bench': {'runs': {}}}))
+        self.assertEqual(environment_of({'bench': {'environment': ENVIRONMENT}}), ENVIRONMENT)
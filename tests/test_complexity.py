@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import math
+import unittest
+
+from minibench import Benchmark, parametrize
+from minibench.complexity import analyze, fit
+
+SIZES = [10, 100, 1000, 10000]
+
+
+class FitTests(unittest.TestCase):
+    def assertOrder(self, model, order, overhead=0):
+        best = fit(SIZES, [overhead + 2e-6 * model(n) for n in SIZES])
+        self.assertEqual(best[0], order)
+        self.assertAlmostEqual(best[1], 2e-6)
+        self.assertAlmostEqual(best[3], 0)
+
+    def test_constant(self):
+        self.assertOrder(lambda n: 1, 'O(1)')
+
+    def test_logarithmic(self):
+        self.assertOrder(math.log, 'O(log n)')
+
+    def test_linear(self):
+        self.assertOrder(lambda n: n, 'O(n)')
+
+    def test_linearithmic(self):
+        self.assertOrder(lambda n: n * math.log(n), 'O(n log n)')
+
+    def test_quadratic(self):
+        self.assertOrder(lambda n: n ** 2, 'O(n²)')
+
+    def test_cubic(self):
+        self.assertOrder(lambda n: n ** 3, 'O(n³)')
+
+    def test_overhead(self):
+        self.assertOrder(lambda n: n, 'O(n)', overhead=1e-3)
+        self.assertOrder(lambda n: n ** 2, 'O(n²)', overhead=1e-3)
+        best = fit(SIZES, [1e-3 + 2e-6 * n for n in SIZES])
+        self.assertAlmostEqual(best[2], 1e-3)
+
+    def test_noise_prefers_simpler_models(self):
+        noise = [1.01, 0.99, 1.02, 0.98]
+        self.assertEqual(fit(SIZES, [1e-6 * k for k in noise])[0], 'O(1)')
+        self.assertEqual(fit(SIZES, [2e-6 * n * k for n, k in zip(SIZES, noise)])[0], 'O(n)')
+
+    def test_not_enough_sizes(self):
+        self.assertIsNone(fit([10, 10], [1, 2]))
+
+    def test_invalid_sizes(self):
+        self.assertIsNone(fit([0, 10], [1, 2]))
+
+
+class AnalyzeTests(unittest.TestCase):
+    def test_analyze(self):
+        class Test(Benchmark):
+            times = 1
+
+            @parametrize('size', [1, 2, 3])
+            @parametrize('kind', ['a', 'b'])
+            def bench_sized(self, size, kind):
+                pass
+
+            @parametrize('kind', ['a', 'b'])
+            def bench_unsized(self, kind):
+                pass
+
+            def bench_plain(self):
+                pass
+
+        bench = Test()
+        bench.run()
+        fits = analyze(bench)
+        self.assertEqual(list(fits), ['bench_sized[kind=a]', 'bench_sized[kind=b]'])
+        self.assertEqual(fits['bench_sized[kind=a]'].param, 'size')
+
+    def test_many_sizes_are_ignored(self):
+        class Test(Benchmark):
+            times = 1
+
+            @parametrize('width', [1, 2])
+            @parametrize('height', [1, 2])
+            def bench_sized(self, width, height):
+                pass
+
+        bench = Test()
+        bench.run()
+        self.assertEqual(analyze(bench), {})
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from minibench import BaseReporter, BenchmarkRunner
+from minibench.dependencies import Dependencies, Project, changed_files, options_hash
+
+HELPER = '''
+def compute():
+    return sum(range(10))
+'''
+
+UTILS = '''
+from helper import compute
+
+
+def twice():
+    return compute() * 2
+'''
+
+COMPUTE = '''
+from minibench import Benchmark
+from utils import twice
+
+
+class ComputeBenchmark(Benchmark):
+    times = 2
+
+    def bench_twice(self):
+        twice()
+'''
+
+STANDALONE = '''
+import json
+
+from minibench import Benchmark
+
+
+class StandaloneBenchmark(Benchmark):
+    times = 2
+
+    def bench_dumps(self):
+        json.dumps({})
+'''
+
+
+class DependenciesTests(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmpdir = os.path.realpath(tempfile.mkdtemp())
+        os.chdir(self.tmpdir)
+        sys.path.insert(0, self.tmpdir)
+        for name, source in (('helper.py', HELPER), ('utils.py', UTILS),
+                             ('compute.bench.py', COMPUTE), ('standalone.bench.py', STANDALONE)):
+            with open(name, 'w') as f:
+                f.write(source)
+        self.path = os.path.join(self.tmpdir, 'deps.json')
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        sys.path.remove(self.tmpdir)
+        for name in ('helper', 'utils'):
+            sys.modules.pop(name, None)
+        shutil.rmtree(self.tmpdir)
+
+    def file(self, name):
+        return os.path.join(self.tmpdir, name)
+
+    def run_benchmarks(self, changed=None, **kwargs):
+        reporter = BaseReporter()
+        runner = BenchmarkRunner('compute.bench.py', 'standalone.bench.py', dependencies=self.path,
+                                 changed=changed, reporters=[reporter])
+        runner.run(**kwargs)
+        return runner, reporter
+
+    def test_project(self):
+        project = Project(self.tmpdir)
+        self.assertIn(self.file('helper.py'), project)
+        self.assertNotIn(self.file('.venv/lib/python3/site-packages/six.py'), project)
+        self.assertNotIn(os.__file__, project)
+        self.assertNotIn(None, project)
+
+    def test_record_dependencies(self):
+        self.run_benchmarks()
+        deps = Dependencies(self.path, root=self.tmpdir)
+        self.assertEqual(deps.files[self.file('compute.bench.py')], [self.file('helper.py'), self.file('utils.py')])
+        self.assertEqual(deps.files[self.file('standalone.bench.py')], [])
+        self.assertIsNotNone(deps.stored('compute.bench.py', 'ComputeBenchmark', {'debug': False}))
+
+    def test_dependencies_already_imported(self):
+        import utils  # noqa
+        self.run_benchmarks()
+        deps = Dependencies(self.path, root=self.tmpdir)
+        self.assertEqual(deps.files[self.file('compute.bench.py')], [self.file('helper.py'), self.file('utils.py')])
+
+    def test_affected(self):
+        deps = Dependencies(None, root=self.tmpdir)
+        deps.files[self.file('compute.bench.py')] = [self.file('helper.py')]
+        self.assertTrue(deps.affected('compute.bench.py', ['helper.py']))
+        self.assertTrue(deps.affected('compute.bench.py', ['compute.bench.py']))
+        self.assertFalse(deps.affected('compute.bench.py', ['other.py']))
+        self.assertTrue(deps.affected('unknown.bench.py', []))
+
+    def test_only_run_affected(self):
+        self.run_benchmarks()
+        runner, reporter = self.run_benchmarks(changed=[self.file('helper.py')])
+
+        self.assertEqual([bench.__class__.__name__ for bench in runner.reused], ['StandaloneBenchmark'])
+        self.assertEqual(len(runner.runned), 2)
+        self.assertEqual(sorted(reporter.summary()), ['ComputeBenchmark-2', 'StandaloneBenchmark-2'])
+
+    def test_stored_results_options(self):
+        deps = Dependencies(None, root=self.tmpdir)
+        deps.store('compute.bench.py', 'ComputeBenchmark', {'results': {}}, {'times': 3, 'clock': 'process'})
+        self.assertEqual(deps.stored('compute.bench.py', 'ComputeBenchmark', {'clock': 'process', 'times': 3}),
+                         {'results': {}})
+        self.assertIsNone(deps.stored('compute.bench.py', 'ComputeBenchmark', {'times': 50, 'clock': 'process'}))
+        self.assertIsNone(deps.stored('compute.bench.py', 'ComputeBenchmark'))
+
+    def test_options_hash(self):
+        self.assertEqual(options_hash({'a': 1, 'b': 'x'}), options_hash({'b': 'x', 'a': 1}))
+        self.assertNotEqual(options_hash({'a': 1}), options_hash({'a': 2}))
+        self.assertEqual(options_hash(None), options_hash({}))
+
+    def test_results_with_other_options_are_not_reused(self):
+        self.run_benchmarks(times=3)
+        runner, reporter = self.run_benchmarks(changed=[self.file('other.py')], times=5)
+
+        self.assertEqual(runner.reused, [])
+        self.assertEqual(sorted(reporter.summary()), ['ComputeBenchmark-5', 'StandaloneBenchmark-5'])
+        self.assertTrue(all(run['rounds'] == 5 for summary in reporter.summary().values()
+                            for run in summary['runs'].values()))
+
+        runner, _ = self.run_benchmarks(changed=[self.file('other.py')], times=5)
+        self.assertEqual(len(runner.reused), 2)
+
+    def test_run_without_stored_results(self):
+        runner, _ = self.run_benchmarks(changed=[])
+        self.assertEqual(runner.reused, [])
+        self.assertEqual(len(runner.runned), 2)
+
+    def test_changed_files(self):
+        def git(*args):
+            with open(os.devnull, 'w') as devnull:
+                subprocess.check_call(('git',) + args, stdout=devnull, stderr=devnull)
+        try:
+            git('init', '-q')
+            git('add', '.')
+            git('-c', 'user.name=test', '-c', 'user.email=test@test.com', 'commit', '-q', '-m', 'initial')
+        except (OSError, subprocess.CalledProcessError):
+            self.skipTest('git is not available')
+        with open('helper.py', 'a') as f:
+            f.write('\n')
+        with open('new.py', 'w') as f:
+            f.write('\n')
+        self.assertEqual(changed_files('HEAD'), [self.file('helper.py'), self.file('new.py')])
+        with self.assertRaises(ValueError):
+            changed_files('unknown-revision')
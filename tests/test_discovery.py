@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from minibench import BaseReporter, BenchmarkRunner, discovery
+from minibench.discovery import Index, LazyBenchmark, scan_source
+
+from . import EXAMPLES
+
+SOURCE = b'''
+import minibench
+from minibench import Benchmark
+
+
+class Helper(object):
+    def bench_ignored(self):
+        pass
+
+
+class First(Benchmark):
+    """First benchmark"""
+    def bench_one(self):
+        pass
+
+    def helper(self):
+        pass
+
+
+class Second(First):
+    def bench_two(self):
+        pass
+
+
+class Third(minibench.Benchmark):
+    pass
+'''
+
+
+class ScanTests(unittest.TestCase):
+    def test_scan_source(self):
+        found = scan_source(SOURCE)
+        self.assertEqual([b['name'] for b in found], ['First', 'Second', 'Third'])
+        self.assertEqual(found[0]['doc'], 'First benchmark')
+        self.assertEqual(found[0]['methods'], ['bench_one'])
+        self.assertEqual(found[1]['methods'], ['bench_one', 'bench_two'])
+        self.assertEqual(found[2]['methods'], [])
+
+    def test_scan_custom_prefix(self):
+        found = scan_source(SOURCE, prefix='help')
+        self.assertEqual(found[0]['methods'], ['helper'])
+
+    @unittest.skipIf(sys.version_info < (3, 5), 'Coroutines requires Python 3.5+')
+    def test_scan_coroutines(self):
+        found = scan_source(b'class Async(Benchmark):\n    async def bench_async(self):\n        pass\n')
+        self.assertEqual(found[0]['methods'], ['bench_async'])
+
+    def test_scan_tags(self):
+        found = scan_source(b'''
+class Tagged(Benchmark):
+    tags = ['all']
+
+    @minibench.tag('slow', 'io')
+    @tag(SOMETHING, 'net')
+    def bench_one(self):
+        pass
+
+    def bench_two(self):
+        pass
+
+
+class Child(Tagged):
+    def bench_one(self):
+        pass
+
+    @tag('slow')
+    def bench_three(self):
+        pass
+
+
+class Untagged(Child):
+    tags = []
+''')
+        self.assertEqual(found[1]['tags'], {'bench_one': ['all', 'slow', 'io', 'net'], 'bench_two': ['all']})
+        self.assertEqual(found[0]['tags'], {'bench_one': ['all'], 'bench_two': ['all'], 'bench_three': ['all', 'slow']})
+        self.assertEqual(found[2]['tags'], {'bench_three': ['slow']})
+
+    def test_scan_base_alias(self):
+        found = scan_source(b'''
+from minibench import Benchmark as B
+
+
+class Aliased(B):
+    def bench_one(self):
+        pass
+''')
+        self.assertEqual([b['name'] for b in found], ['Aliased'])
+        self.assertEqual(found[0]['methods'], ['bench_one'])
+        self.assertEqual(found[0]['unresolved'], [])
+
+    def test_scan_unresolved_bases(self):
+        found = scan_source(b'''
+from common import Base, Mixin
+
+
+class Child(Base):
+    def bench_one(self):
+        pass
+
+
+class Mixed(Benchmark, Mixin):
+    pass
+
+
+class GrandChild(Child):
+    pass
+''')
+        self.assertEqual([b['name'] for b in found], ['Child', 'GrandChild', 'Mixed'])
+        self.assertEqual(found[0]['unresolved'], ['Base'])
+        self.assertEqual(found[1]['unresolved'], ['Child'])
+        self.assertEqual(found[2]['unresolved'], ['Mixin'])
+
+    def test_scan_local_mixin(self):
+        found = scan_source(b'''
+class Mixin(object):
+    @tag('slow')
+    def bench_mixed(self):
+        pass
+
+
+class Mixed(Mixin, Benchmark):
+    def bench_own(self):
+        pass
+''')
+        self.assertEqual([b['name'] for b in found], ['Mixed'])
+        self.assertEqual(found[0]['methods'], ['bench_mixed', 'bench_own'])
+        self.assertEqual(found[0]['tags'], {'bench_mixed': ['slow']})
+        self.assertEqual(found[0]['unresolved'], [])
+
+    def test_syntax_error(self):
+        with self.assertRaises(SyntaxError):
+            scan_source(b'class Broken(')
+
+
+class IndexTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'test.bench.py')
+        self.cache = os.path.join(self.tmpdir, 'cache.json')
+        with open(self.filename, 'wb') as f:
+            f.write(SOURCE)
+        self.scans = 0
+        self._scan_source = discovery.scan_source
+
+        def counting(*args, **kwargs):
+            self.scans += 1
+            return self._scan_source(*args, **kwargs)
+        discovery.scan_source = counting
+
+    def tearDown(self):
+        discovery.scan_source = self._scan_source
+        shutil.rmtree(self.tmpdir)
+
+    def test_cache_is_reused(self):
+        index = Index(self.cache)
+        self.assertEqual(len(index.scan(self.filename)), 3)
+        index.save()
+
+        index = Index(self.cache)
+        self.assertEqual(len(index.scan(self.filename)), 3)
+        self.assertFalse(index.dirty)
+        self.assertEqual(self.scans, 1)
+
+    def test_touched_file_is_not_parsed(self):
+        index = Index(self.cache)
+        index.scan(self.filename)
+        stat = os.stat(self.filename)
+        os.utime(self.filename, (stat.st_atime, stat.st_mtime + 10))
+
+        self.assertEqual(len(index.scan(self.filename)), 3)
+        self.assertEqual(self.scans, 1)
+        self.assertTrue(index.dirty)
+
+    def test_modified_file_is_parsed(self):
+        index = Index(self.cache)
+        index.scan(self.filename)
+        with open(self.filename, 'ab') as f:
+            f.write(b'\n\nclass Fourth(Benchmark):\n    pass\n')
+
+        self.assertEqual(len(index.scan(self.filename)), 4)
+        self.assertEqual(self.scans, 2)
+
+    def test_invalid_cache_is_ignored(self):
+        with open(self.cache, 'w') as f:
+            f.write('not json')
+        index = Index(self.cache)
+        self.assertEqual(len(index.scan(self.filename)), 3)
+
+    def test_memory_only(self):
+        index = Index(None)
+        index.scan(self.filename)
+        index.save()
+        self.assertFalse(os.path.exists(self.cache))
+
+
+class LazyBenchmarkTests(unittest.TestCase):
+    def test_load_on_call(self):
+        loaded = []
+
+        class Module(object):
+            class First(object):
+                def __init__(self, **kwargs):
+                    self.kwargs = kwargs
+
+        def loader(filename):
+            loaded.append(filename)
+            return Module
+
+        lazy = LazyBenchmark('file.py', scan_source(SOURCE)[0], loader)
+        self.assertEqual(lazy.__name__, 'First')
+        self.assertEqual(lazy.methods, ['bench_one'])
+        self.assertFalse(lazy.loaded)
+
+        bench = lazy(times=2)
+        self.assertEqual(bench.kwargs, {'times': 2})
+        self.assertTrue(lazy.loaded)
+        lazy()
+        self.assertEqual(loaded, ['file.py'])
+
+
+class LazyRunnerTests(unittest.TestCase):
+    def test_discovery_does_not_import(self):
+        filename = os.path.join(EXAMPLES, 'sort.bench.py')
+        runner = BenchmarkRunner(filename, lazy=True)
+        self.assertEqual([b.__name__ for b in runner.benchmarks], ['SortDictByValue', 'SortLargerDictByValue'])
+        self.assertEqual(runner.modules, {})
+
+    def test_run(self):
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        reporter = BaseReporter()
+        runner = BenchmarkRunner(filename, lazy=True, reporters=[reporter])
+        runner.run(times=2)
+        self.assertEqual(list(runner.modules), [filename])
+        self.assertEqual(list(reporter.summary()), ['EmptyBenchmark-2'])
+
+    def test_selection_does_not_import(self):
+        filename = os.path.join(EXAMPLES, 'throughput.bench.py')
+        runner = BenchmarkRunner(filename, lazy=True, markers='slow')
+        self.assertEqual([b.__name__ for b in runner.benchmarks], ['JsonThroughput'])
+        self.assertEqual(runner.collect(runner.benchmarks[0]), [('bench_dumps_indent', ('slow',))])
+        self.assertEqual(runner.modules, {})
+
+        runner = BenchmarkRunner(filename, lazy=True, keyword='list and comprehension')
+        self.assertEqual([b.__name__ for b in runner.benchmarks], ['ListThroughput'])
+        self.assertEqual(runner.modules, {})
+
+    def test_module_is_imported_once(self):
+        filename = os.path.join(EXAMPLES, 'sort.bench.py')
+        runner = BenchmarkRunner(filename, lazy=True)
+        first, second = runner.benchmarks
+        self.assertIs(first.load().__module__, second.load().__module__)
+        self.assertEqual(len(runner.modules), 1)
+
+    def test_imported_base_class_is_imported(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        with open(os.path.join(tmpdir, 'common_base.py'), 'wb') as f:
+            f.write(b'from minibench import Benchmark\n\n\nclass Mixin(object):\n'
+                    b'    def bench_mixed(self):\n        pass\n\n\nclass Base(Benchmark):\n    pass\n')
+        filename = os.path.join(tmpdir, 'imported.bench.py')
+        with open(filename, 'wb') as f:
+            f.write(b'from common_base import Base, Mixin\n\n\nclass Child(Base, Mixin):\n'
+                    b'    def bench_one(self):\n        pass\n')
+        sys.path.insert(0, tmpdir)
+        self.addCleanup(sys.path.remove, tmpdir)
+        self.addCleanup(sys.modules.pop, 'common_base', None)
+
+        eager = BenchmarkRunner(filename)
+        runner = BenchmarkRunner(filename, lazy=True, keyword='mixed')
+        self.assertEqual([b.__name__ for b in eager.benchmarks], ['Child'])
+        self.assertEqual([b.__name__ for b in runner.benchmarks], ['Child'])
+        self.assertEqual(runner.collect(runner.benchmarks[0]), [('bench_mixed', ())])
+
+    def test_local_mixin_methods_are_run(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        filename = os.path.join(tmpdir, 'mixin.bench.py')
+        with open(filename, 'wb') as f:
+            f.write(b'from minibench import Benchmark\n\n\nclass Mixin(object):\n'
+                    b'    def bench_mixed(self):\n        pass\n\n\nclass Mixed(Mixin, Benchmark):\n    pass\n')
+        reporter = BaseReporter()
+        runner = BenchmarkRunner(filename, lazy=True, reporters=[reporter])
+        self.assertEqual([b.__name__ for b in runner.benchmarks], ['Mixed'])
+        self.assertEqual(runner.modules, {})
+        runner.run(times=1)
+        self.assertEqual(list(reporter.summary()['Mixed-1']['runs']), ['bench_mixed'])
+
+    def test_file_without_static_benchmark_is_not_discovered(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        filename = os.path.join(tmpdir, 'dynamic.bench.py')
+        with open(filename, 'wb') as f:
+            f.write(b'import minibench\n\nglobals()["Dynamic"] = type(str("Dynamic"), (minibench.Benchmark,), {})\n')
+        runner = BenchmarkRunner(lazy=True)
+        self.assertIsNone(runner.discover(Index(None), filename))
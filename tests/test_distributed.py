@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+import threading
+import unittest
+
+from minibench import BaseReporter, BenchmarkRunner
+from minibench.distributed import DistributedExecutor, Worker, parse_address
+from minibench.environment import fingerprint
+
+from . import EXAMPLES
+
+
+class WorkerTestCase(unittest.TestCase):
+    workers = 2
+
+    def setUp(self):
+        self.servers = [Worker('127.0.0.1', 0) for _ in range(self.workers)]
+        for server in self.servers:
+            thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01})
+            thread.daemon = True
+            thread.start()
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    @property
+    def addresses(self):
+        return [server.server_address[:2] for server in self.servers]
+
+
+class ParseAddressTests(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(parse_address('lab1:1234'), ('lab1', 1234))
+        self.assertEqual(parse_address(' lab1 '), ('lab1', 7737))
+        with self.assertRaises(ValueError):
+            parse_address('lab1:port')
+
+
+class DistributedExecutorTests(WorkerTestCase):
+    def test_execute(self):
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        with DistributedExecutor(self.addresses) as executor:
+            waits = [executor.submit(filename, 'EmptyBenchmark', {'times': i}) for i in (1, 2, 3, 4)]
+            results = [wait() for wait in waits]
+
+        rounds = [len(r['results']['bench_nothing']['samples']) for r in results]
+        self.assertEqual(rounds, [1, 2, 3, 4])
+        workers = [r['results']['bench_nothing']['worker'] for r in results]
+        self.assertTrue(all(w['fingerprint'] == fingerprint() for w in workers))
+        self.assertTrue(set(w['address'] for w in workers) <= set('{0}:{1}'.format(*a) for a in self.addresses))
+
+    def test_relative_path(self):
+        executor = DistributedExecutor([], root=EXAMPLES)
+        self.assertEqual(executor.relative(os.path.join(EXAMPLES, 'empty.bench.py')), 'empty.bench.py')
+        self.assertEqual(executor.relative('/elsewhere/empty.bench.py'), os.path.abspath('/elsewhere/empty.bench.py'))
+
+    def test_failure(self):
+        with DistributedExecutor(self.addresses) as executor:
+            wait = executor.submit(os.path.join(EXAMPLES, 'empty.bench.py'), 'Unknown', {})
+            with self.assertRaises(RuntimeError):
+                wait()
+
+    def test_unreachable_worker(self):
+        closed = Worker('127.0.0.1', 0)
+        address = closed.server_address[:2]
+        closed.server_close()
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        with DistributedExecutor([address] + self.addresses) as executor:
+            data = executor.submit(filename, 'EmptyBenchmark', {'times': 2})()
+        self.assertEqual(len(data['results']['bench_nothing']['samples']), 2)
+
+        with DistributedExecutor([address]) as executor:
+            with self.assertRaises(RuntimeError):
+                executor.submit(filename, 'EmptyBenchmark', {'times': 2})()
+
+
+class DistributedRunnerTests(WorkerTestCase):
+    def test_run(self):
+        filenames = [os.path.join(EXAMPLES, name) for name in ('sort.bench.py', 'sum.bench.py')]
+        reporter = BaseReporter()
+        runner = BenchmarkRunner(*filenames, workers=self.addresses, by_method=True, reporters=[reporter])
+        runner.run(times=2)
+
+        self.assertEqual([b.__class__.__name__ for b in runner.runned],
+                         ['SortDictByValue', 'SortLargerDictByValue', 'SumBenchmark'])
+        summary = reporter.summary()
+        for bench in summary.values():
+            for run in bench['runs'].values():
+                self.assertEqual(run['rounds'], 2)
+                self.assertEqual(run['worker']['fingerprint'], fingerprint())
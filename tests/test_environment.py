@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import tempfile
+import unittest
+
+from minibench import environment
+
+
+class EnvironmentTests(unittest.TestCase):
+    def test_fingerprint_is_stable(self):
+        self.assertEqual(environment.fingerprint(), environment.fingerprint())
+        self.assertEqual(len(environment.fingerprint()), 16)
+
+    def test_fingerprint_depends_on_machine(self):
+        machine = environment.machine()
+        other = dict(machine, node='another')
+        self.assertNotEqual(environment.fingerprint(machine), environment.fingerprint(other))
+
+    def test_probe(self):
+        probe = environment.probe(packages=['six', 'not-a-package'])
+        for field in ('cpu_model', 'cpu_count', 'governor', 'turbo', 'aslr', 'load_average',
+                      'python_implementation', 'python_version', 'python_build', 'python_compiler'):
+            self.assertIn(field, probe)
+        self.assertEqual(probe['fingerprint'], environment.fingerprint())
+        self.assertIsNotNone(probe['packages']['six'])
+        self.assertIsNone(probe['packages']['not-a-package'])
+
+    def test_read_missing_file(self):
+        self.assertIsNone(environment.read('/not/a/file'))
+
+    def test_git_commit_outside_repository(self):
+        self.assertIsNone(environment.git_commit(tempfile.gettempdir()))
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+import unittest
+
+from minibench.executor import IsolatedExecutor, ParallelExecutor, available_cpus, execute
+
+from . import EXAMPLES
+
+
+class ExecutorTests(unittest.TestCase):
+    def test_execute(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        data = execute(filename, 'SumBenchmark', {'times': 3})
+
+        self.assertEqual(set(data['results']), set(['bench_sum', 'bench_consecutive_add']))
+        for result in data['results'].values():
+            self.assertEqual(len(result['samples']), 3)
+
+    def test_execute_some_methods(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        data = execute(filename, 'SumBenchmark', {'times': 3, 'methods': ['bench_sum']})
+
+        self.assertEqual(list(data['results']), ['bench_sum'])
+
+    def test_available_cpus(self):
+        self.assertGreaterEqual(len(available_cpus()), 1)
+
+    def test_parallel_executor(self):
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        with ParallelExecutor(2) as executor:
+            waits = [executor.submit(filename, 'EmptyBenchmark', {'times': i}) for i in (1, 2, 3)]
+            results = [wait() for wait in waits]
+
+        rounds = [len(r['results']['bench_nothing']['samples']) for r in results]
+        self.assertEqual(rounds, [1, 2, 3])
+
+    def test_parallel_executor_with_less_cpus_than_jobs(self):
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        with ParallelExecutor(2, cpus=available_cpus()[:1]) as executor:
+            self.assertFalse(executor.pinned)
+            data = executor.submit(filename, 'EmptyBenchmark', {'times': 1})()
+
+        self.assertEqual(list(data['results']), ['bench_nothing'])
+
+    def test_isolated_executor(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        with IsolatedExecutor() as executor:
+            data = executor.submit(filename, 'SumBenchmark', {'times': 2, 'methods': ['bench_sum']})()
+
+        self.assertEqual(list(data['results']), ['bench_sum'])
+        self.assertEqual(len(data['results']['bench_sum']['samples']), 2)
+
+    def test_isolated_executor_environment(self):
+        executor = IsolatedExecutor(hash_seed='42')
+        self.assertEqual(executor.env['PYTHONHASHSEED'], '42')
+        self.assertEqual(len(executor.cpus), 1)
+
+    def test_isolated_executor_failure(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        with IsolatedExecutor() as executor:
+            with self.assertRaises(RuntimeError):
+                executor.submit(filename, 'Unknown', {})()
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import time
+import unittest
+
+from minibench import Benchmark, fixture, parametrize, pool
+from minibench.benchmark import Result
+from minibench.fixtures import Fixtures, Pool, arguments, pool_of, scope_of
+
+
+class FixtureTests(unittest.TestCase):
+    def test_fixture(self):
+        @fixture(scope='class')
+        def data():
+            pass
+
+        self.assertEqual(scope_of(data), 'class')
+
+    def test_default_scope(self):
+        @fixture
+        def data():
+            pass
+
+        self.assertEqual(scope_of(data), 'method')
+
+    def test_unknown_scope(self):
+        with self.assertRaises(ValueError):
+            fixture(scope='session')
+
+    def test_scope_of_undecorated(self):
+        self.assertIsNone(scope_of(lambda: None))
+
+    def test_arguments(self):
+        class Test(object):
+            def method(self, a, b=None):
+                pass
+
+        self.assertEqual(arguments(lambda a, b: None), ['a', 'b'])
+        self.assertEqual(arguments(Test().method), ['a', 'b'])
+
+
+class PoolTests(unittest.TestCase):
+    def test_pool(self):
+        @pool(size=10, cycle=True)
+        def inputs():
+            pass
+
+        self.assertEqual(scope_of(inputs), 'iteration')
+        self.assertEqual(pool_of(inputs), {'size': 10, 'cycle': True, 'max_memory': None})
+
+    def test_invalid_pool(self):
+        with self.assertRaises(ValueError):
+            pool(size=0)
+        with self.assertRaises(ValueError):
+            pool(max_memory=0)
+
+    def test_consume(self):
+        inputs = Pool(lambda: iter(range(5)), size=2)
+        self.assertEqual([inputs.take() for _ in range(7)], [0, 1, 2, 3, 4, 0, 1])
+        self.assertEqual(inputs.refills, 4)
+        self.assertEqual(inputs.inputs, [None, None])
+
+    def test_cycle(self):
+        inputs = Pool(lambda: iter(range(100)), size=3, cycle=True)
+        self.assertEqual([inputs.take() for _ in range(7)], [0, 1, 2, 0, 1, 2, 0])
+        self.assertEqual(inputs.refills, 1)
+
+    def test_max_memory(self):
+        inputs = Pool(lambda: ('x' * 1000 for _ in range(100)), size=100, max_memory=3000)
+        inputs.fill()
+        self.assertLess(len(inputs.inputs), 5)
+
+    def test_empty_generator(self):
+        with self.assertRaises(ValueError):
+            Pool(lambda: iter([])).take()
+
+
+class FixturesTests(unittest.TestCase):
+    def test_requested(self):
+        class Test(Benchmark):
+            @fixture(scope='class')
+            def data(self):
+                pass
+
+            @fixture(scope='iteration')
+            def shuffled(self, data):
+                pass
+
+            def bench_sorted(self, shuffled, size):
+                pass
+
+        bench = Test()
+        fixtures = Fixtures(bench)
+        self.assertEqual(fixtures.requested(bench.bench_sorted), ['data', 'shuffled'])
+        self.assertEqual(fixtures.requested(bench.bench_sorted, ['shuffled']), [])
+
+    def test_wider_scope_requires_narrower(self):
+        class Test(Benchmark):
+            @fixture(scope='class')
+            def data(self, shuffled):
+                pass
+
+            @fixture(scope='iteration')
+            def shuffled(self):
+                pass
+
+            def bench_sorted(self, data):
+                pass
+
+        bench = Test()
+        with self.assertRaises(ValueError):
+            Fixtures(bench).requested(bench.bench_sorted)
+
+    def test_cycle(self):
+        class Test(Benchmark):
+            @fixture
+            def a(self, b):
+                pass
+
+            @fixture
+            def b(self, a):
+                pass
+
+            def bench_something(self, a):
+                pass
+
+        bench = Test()
+        with self.assertRaises(ValueError):
+            Fixtures(bench).requested(bench.bench_something)
+
+    def test_setup_and_teardown(self):
+        events = []
+
+        class Test(Benchmark):
+            @fixture(scope='class')
+            def data(self):
+                events.append('setup data')
+                yield [1, 2, 3]
+                events.append('teardown data')
+
+            @fixture(scope='iteration')
+            def copy(self, data):
+                events.append('setup copy')
+                return list(data)
+
+        fixtures = Fixtures(Test())
+        fixtures.start(['data', 'copy'])
+        fixtures.setup(['data', 'copy'])
+        self.assertEqual(fixtures.kwargs(['copy']), {'copy': [1, 2, 3]})
+        fixtures.teardown('iteration')
+        fixtures.setup(['data', 'copy'])
+        fixtures.teardown('iteration')
+        fixtures.teardown('class')
+
+        self.assertEqual(events, ['setup data', 'setup copy', 'setup copy', 'teardown data'])
+        self.assertEqual(fixtures.values, {})
+        self.assertEqual(fixtures.stats['data']['calls'], 1)
+        self.assertEqual(fixtures.stats['copy']['calls'], 2)
+
+
+class FixturesBenchmarkTests(unittest.TestCase):
+    def test_scopes(self):
+        calls = {'class': 0, 'method': 0, 'iteration': 0}
+
+        class Test(Benchmark):
+            @fixture(scope='class')
+            def shared(self):
+                calls['class'] += 1
+                return 'shared'
+
+            @fixture(scope='method')
+            def own(self):
+                calls['method'] += 1
+                return 'own'
+
+            @fixture(scope='iteration')
+            def fresh(self):
+                calls['iteration'] += 1
+                return []
+
+            def bench_one(self, shared, own, fresh):
+                assert (shared, own) == ('shared', 'own')
+                assert fresh == []
+                fresh.append(1)
+
+            def bench_two(self, shared):
+                assert shared == 'shared'
+
+        bench = Test(times=3, number=2, debug=True)
+        bench.run()
+
+        self.assertTrue(bench.results['bench_one'].has_success)
+        self.assertFalse(bench.results['bench_one'].has_errors)
+        self.assertTrue(bench.results['bench_two'].has_success)
+        self.assertEqual(calls, {'class': 1, 'method': 1, 'iteration': 6})
+
+    def test_overhead_is_excluded_and_tracked(self):
+        class Test(Benchmark):
+            @fixture(scope='iteration')
+            def slow(self):
+                time.sleep(0.01)
+
+            def bench_fast(self, slow):
+                pass
+
+        bench = Test(times=3)
+        bench.run()
+
+        result = bench.results['bench_fast']
+        self.assertLess(result.total, 0.01)
+        self.assertEqual(result.fixtures['slow']['scope'], 'iteration')
+        self.assertEqual(result.fixtures['slow']['calls'], 3)
+        self.assertGreaterEqual(result.fixtures['slow']['total'], 0.03)
+
+    def test_generator_teardown(self):
+        events = []
+
+        class Test(Benchmark):
+            @fixture(scope='method')
+            def resource(self):
+                events.append('open')
+                yield 'resource'
+                events.append('close')
+
+            def after(self):
+                events.append('after')
+
+            def bench_something(self, resource):
+                events.append(resource)
+
+        Test(times=2).run()
+
+        self.assertEqual(events, ['open', 'resource', 'resource', 'close', 'after'])
+
+    def test_iteration_fixtures_disable_batch(self):
+        class Test(Benchmark):
+            batch = True
+
+            @fixture(scope='iteration')
+            def value(self):
+                return 42
+
+            def bench_something(self, value):
+                assert value == 42
+
+        bench = Test(times=2, number=5, debug=True)
+        bench.run()
+
+        result = bench.results['bench_something']
+        self.assertEqual(result.overhead, 0)
+        self.assertEqual(result.calls, 10)
+        self.assertFalse(result.has_errors)
+        self.assertEqual(result.fixtures['value']['calls'], 10)
+
+    def test_iteration_fixtures_are_bound_before_the_timed_call(self):
+        timed = []
+
+        class Test(Benchmark):
+            @fixture(scope='iteration')
+            def value(self):
+                return len(timed)
+
+            def bench_something(self, value):
+                assert value == len(timed) - 1
+
+            def _setup_each(self, func):
+                timed.append(super(Test, self)._setup_each(func))
+                return timed[-1]
+
+        bench = Test(times=2, number=2, debug=True)
+        bench.run()
+
+        self.assertFalse(bench.results['bench_something'].has_errors)
+        self.assertEqual(len(timed), 4)
+        self.assertEqual([call.func for call in timed], [bench.bench_something] * 4)
+        self.assertEqual([call.keywords for call in timed], [{'value': i} for i in range(4)])
+
+    def test_with_parameters(self):
+        class Test(Benchmark):
+            @fixture(scope='method')
+            def data(self):
+                return list(range(10))
+
+            @parametrize('size', [2, 5])
+            def bench_slice(self, data, size):
+                return data[:size]
+
+        bench = Test(times=1, debug=True)
+        bench.run()
+
+        self.assertEqual(sorted(bench.results), ['bench_slice[size=2]', 'bench_slice[size=5]'])
+        self.assertTrue(all(result.has_success for result in bench.results.values()))
+        self.assertEqual(bench.results['bench_slice[size=2]'].fixtures['data']['calls'], 1)
+
+    def test_serialization(self):
+        class Test(Benchmark):
+            @fixture(scope='iteration')
+            def value(self):
+                return 42
+
+            def bench_something(self, value):
+                pass
+
+        bench = Test(times=2)
+        bench.run()
+
+        data = bench.results['bench_something'].to_dict()
+        self.assertEqual(Result.from_dict(data).fixtures, data['fixtures'])
+        self.assertEqual(data['fixtures']['value']['calls'], 2)
+
+    def test_pool(self):
+        generated = []
+
+        class Test(Benchmark):
+            @fixture(scope='class')
+            def size(self):
+                return 10
+
+            @pool(size=4)
+            def shuffled(self, size):
+                while True:
+                    generated.append(size)
+                    yield list(range(size, 0, -1))
+
+            def bench_sort(self, shuffled):
+                assert shuffled[0] == 10
+                shuffled.sort()
+
+        bench = Test(times=10, debug=True)
+        bench.run()
+
+        result = bench.results['bench_sort']
+        self.assertFalse(result.has_errors)
+        self.assertEqual(len(generated), 12)
+        self.assertEqual(result.fixtures['shuffled']['calls'], 10)
+        self.assertEqual(result.fixtures['shuffled']['refills'], 3)
+        self.assertEqual(bench._fixtures.pools, {})
+
+    def test_pool_requires_narrower_fixture(self):
+        class Test(Benchmark):
+            @fixture(scope='iteration')
+            def seed(self):
+                pass
+
+            @pool()
+            def inputs(self, seed):
+                yield seed
+
+            def bench_something(self, inputs):
+                pass
+
+        bench = Test()
+        with self.assertRaises(ValueError):
+            Fixtures(bench).requested(bench.bench_something)
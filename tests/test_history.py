@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from minibench import BenchmarkRunner
+from minibench.history import History, HistoryReporter, pack, unpack
+
+from . import EXAMPLES
+
+
+def summary(mean, key='Bench-5', method='bench_method'):
+    return {
+        key: {
+            'name': 'Bench',
+            'times': 5,
+            'runs': {
+                method: {
+                    'name': 'Method',
+                    'rounds': 2,
+                    'number': 1,
+                    'total': mean * 2,
+                    'mean': mean,
+                    'min': mean,
+                    'max': mean,
+                    'median': mean,
+                    'stdev': 0,
+                    'p90': mean,
+                    'p99': mean,
+                    'samples': [mean, mean],
+                }
+            }
+        }
+    }
+
+
+class HistoryTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.history = History(os.path.join(self.tmpdir, 'history.db'))
+
+    def tearDown(self):
+        self.history.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_pack_unpack(self):
+        self.assertEqual(unpack(pack([1.5, 2.5])).tolist(), [1.5, 2.5])
+        self.assertEqual(unpack(None).tolist(), [])
+
+    def test_record(self):
+        self.history.record(summary(1), commit='abc', machine='m1')
+        self.history.record(summary(2), commit='def', machine='m1')
+
+        self.assertEqual(self.history.count(), 2)
+        self.assertEqual(list(self.history.methods()), [('Bench-5', 'bench_method')])
+
+    def test_trend(self):
+        for idx, mean in enumerate((3, 1, 2)):
+            self.history.record(summary(mean), timestamp=1000 + idx)
+
+        entries = list(self.history.trend('Bench-5', 'bench_method'))
+        self.assertEqual([e.mean for e in entries], [3, 1, 2])
+        self.assertEqual(entries[0].samples.tolist(), [3, 3])
+
+        entries = list(self.history.trend('Bench-5', 'bench_method', limit=2))
+        self.assertEqual([e.mean for e in entries], [1, 2])
+
+    def test_extremes(self):
+        for mean in (3, 1, 2):
+            self.history.record(summary(mean))
+
+        self.assertEqual(self.history.fastest('Bench-5', 'bench_method').mean, 1)
+        self.assertEqual(self.history.slowest('Bench-5', 'bench_method').mean, 3)
+        self.assertIsNone(self.history.fastest('Unknown', 'bench_method'))
+
+    def test_baseline_same_machine(self):
+        self.history.record(summary(1), machine='m1', timestamp=1)
+        self.history.record(summary(2), machine='m2', timestamp=2)
+
+        baseline = self.history.baseline(machine='m1')
+        run = baseline['Bench-5']['runs']['bench_method']
+        self.assertEqual(run['mean'], 1)
+        self.assertEqual(run['samples'], [1, 1])
+
+    def test_baseline_fallback_on_any_machine(self):
+        self.history.record(summary(1), machine='m1', timestamp=1)
+        self.history.record(summary(2), machine='m2', timestamp=2)
+
+        self.assertEqual(self.history.baseline(machine='m3'), {})
+        baseline = self.history.baseline(machine='m3', any_machine=True)
+        self.assertEqual(baseline['Bench-5']['runs']['bench_method']['mean'], 2)
+        self.assertEqual(baseline['Bench-5']['machine'], 'm2')
+
+    def test_baseline_environment(self):
+        recorded = summary(1)
+        recorded['Bench-5']['environment'] = {'fingerprint': 'm1', 'cpu_model': 'CPU'}
+        self.history.record(recorded, machine='m1', timestamp=1)
+
+        baseline = self.history.baseline(machine='m1')
+        self.assertEqual(baseline['Bench-5']['machine'], 'm1')
+        self.assertEqual(baseline['Bench-5']['environment'], {'fingerprint': 'm1', 'cpu_model': 'CPU'})
+        entry = next(iter(self.history.trend('Bench-5', 'bench_method')))
+        self.assertEqual(entry.environment['cpu_model'], 'CPU')
+
+    def test_history_without_environment_column(self):
+        path = os.path.join(self.tmpdir, 'old.db')
+        db = sqlite3.connect(path)
+        db.execute('CREATE TABLE runs (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp REAL NOT NULL, '
+                   'git_commit TEXT, machine TEXT)')
+        db.commit()
+        db.close()
+        with History(path) as history:
+            history.record(summary(1), machine='m1')
+            self.assertIsNone(history.baseline(machine='m1')['Bench-5'].get('environment'))
+
+    def test_baseline_exclude_commit(self):
+        self.history.record(summary(1), commit='old', timestamp=1)
+        self.history.record(summary(2), commit='current', timestamp=2)
+
+        baseline = self.history.baseline(exclude_commit='current')
+        self.assertEqual(baseline['Bench-5']['runs']['bench_method']['mean'], 1)
+
+    def test_reporter(self):
+        path = os.path.join(self.tmpdir, 'reporter.db')
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        for _ in range(2):
+            BenchmarkRunner(filename, reporters=[HistoryReporter(path)]).run()
+
+        with History(path) as history:
+            self.assertEqual(history.count(), 2)
+            entries = list(history.trend('EmptyBenchmark-5', 'bench_nothing'))
+            self.assertEqual(len(entries), 2)
+            self.assertIsNotNone(entries[0].machine)
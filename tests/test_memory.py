@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import sys
+import unittest
+
+from minibench import memory
+
+
+@unittest.skipUnless(memory.is_available(), 'tracemalloc is required')
+class MemoryTests(unittest.TestCase):
+    def test_measure(self):
+        keep = []
+
+        def allocate():
+            keep.append(bytearray(1024 * 1024))
+
+        result = memory.measure(allocate)
+
+        self.assertEqual(set(result), set(memory.FIELDS))
+        self.assertGreaterEqual(result['retained'], 1024 * 1024)
+        self.assertGreaterEqual(result['retained_blocks'], 1)
+        self.assertGreaterEqual(result['peak'], 1024 * 1024)
+
+    def test_measure_temporary_allocations(self):
+        def allocate():
+            bytearray(1024 * 1024)
+
+        result = memory.measure(allocate)
+
+        self.assertLess(result['retained'], 1024 * 1024)
+        self.assertGreaterEqual(result['peak'], 1024 * 1024)
+
+    def test_measure_ignore_errors(self):
+        def fail():
+            raise ValueError()
+
+        self.assertIn('peak', memory.measure(fail))
+
+    def test_peak_rss(self):
+        rss = memory.peak_rss()
+        if rss is not None:
+            self.assertGreater(rss, 0)
+
+
+class SizeofTests(unittest.TestCase):
+    def test_sizeof_scalar(self):
+        self.assertEqual(memory.sizeof(42), sys.getsizeof(42))
+
+    def test_sizeof_follows_containers(self):
+        value = ['a' * 100, {'key': 'b' * 100}]
+        self.assertGreater(memory.sizeof(value), sys.getsizeof(value) + 200)
+
+    def test_sizeof_counts_shared_objects_once(self):
+        item = 'x' * 1000
+        self.assertLess(memory.sizeof([item, item]), sys.getsizeof([item, item]) + 2 * sys.getsizeof(item))
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import unittest
+
+from collections import OrderedDict
+
+from minibench import Benchmark, parametrize
+from minibench.params import expand, params_of, split_key, variant_key
+
+
+class ParamsTests(unittest.TestCase):
+    def test_parametrize(self):
+        @parametrize('a', [1, 2])
+        @parametrize('b', 'xy')
+        def func(a, b):
+            pass
+
+        self.assertEqual(params_of(func), [('a', [1, 2]), ('b', ['x', 'y'])])
+
+    def test_params_of_undecorated(self):
+        self.assertEqual(params_of(lambda: None), [])
+
+    def test_expand(self):
+        combinations = expand([('a', [1, 2]), ('b', ['x', 'y'])])
+        self.assertEqual([list(c.items()) for c in combinations], [
+            [('a', 1), ('b', 'x')],
+            [('a', 1), ('b', 'y')],
+            [('a', 2), ('b', 'x')],
+            [('a', 2), ('b', 'y')],
+        ])
+
+    def test_expand_without_params(self):
+        self.assertEqual(expand([]), [OrderedDict()])
+
+    def test_variant_key(self):
+        self.assertEqual(variant_key('bench_x', {}), 'bench_x')
+        self.assertEqual(variant_key('bench_x', OrderedDict([('a', 1), ('b', 'x')])), 'bench_x[a=1,b=x]')
+
+    def test_split_key(self):
+        self.assertEqual(split_key('bench_x'), ('bench_x', ''))
+        self.assertEqual(split_key('bench_x[a=1,b=x]'), ('bench_x', '[a=1,b=x]'))
+
+
+class ParametrizedBenchmarkTests(unittest.TestCase):
+    def test_method_parameters(self):
+        class Test(Benchmark):
+            times = 2
+
+            def __init__(self, *args, **kwargs):
+                super(Test, self).__init__(*args, **kwargs)
+                self.calls = []
+
+            @parametrize('size', [10, 100])
+            def bench_sized(self, size):
+                self.calls.append((size, dict(self.variant)))
+
+            def bench_plain(self):
+                pass
+
+        bench = Test()
+        self.assertEqual(bench._collect(), ['bench_plain', 'bench_sized[size=10]', 'bench_sized[size=100]'])
+        bench.run()
+        self.assertEqual(bench.calls, [(10, {'size': 10})] * 2 + [(100, {'size': 100})] * 2)
+        self.assertEqual(set(bench.results), set(['bench_plain', 'bench_sized[size=10]', 'bench_sized[size=100]']))
+        self.assertEqual(bench.variant, {})
+
+    def test_class_grid(self):
+        class Test(Benchmark):
+            times = 1
+            params = {'size': [1, 2], 'kind': ['a']}
+
+            def __init__(self, *args, **kwargs):
+                super(Test, self).__init__(*args, **kwargs)
+                self.prepared = []
+
+            def before(self):
+                self.prepared.append(dict(self.variant))
+
+            def bench_something(self):
+                pass
+
+        bench = Test()
+        bench.run()
+        self.assertEqual(list(bench.results), ['bench_something[kind=a,size=1]', 'bench_something[kind=a,size=2]'])
+        self.assertEqual(bench.prepared, [{'kind': 'a', 'size': 1}, {'kind': 'a', 'size': 2}])
+
+    def test_grid_and_method_parameters(self):
+        class Test(Benchmark):
+            params = {'a': [1, 2]}
+
+            @parametrize('b', [3, 4])
+            def bench_something(self, b):
+                pass
+
+        self.assertEqual(len(Test()._collect()), 4)
+
+    def test_label_for_variant(self):
+        class Test(Benchmark):
+            @parametrize('size', [10])
+            def bench_something(self, size):
+                '''Something'''
+
+        bench = Test()
+        self.assertEqual(bench.label_for('bench_something[size=10]'), 'Something [size=10]')
+
+    def test_methods_filter(self):
+        class Test(Benchmark):
+            @parametrize('size', [10, 100])
+            def bench_something(self, size):
+                pass
+
+        self.assertEqual(len(Test(methods=['bench_something'])._collect()), 2)
+        self.assertEqual(Test(methods=['bench_something[size=100]'])._collect(), ['bench_something[size=100]'])
+
+    def test_variant_of(self):
+        class Test(Benchmark):
+            @parametrize('size', [10])
+            def bench_something(self, size):
+                pass
+
+        bench = Test()
+        bench._collect()
+        self.assertEqual(bench.variant_of('bench_something[size=10]'), ('bench_something', {'size': 10}))
+        self.assertEqual(bench.variant_of('unknown'), ('unknown', {}))
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+import pstats
+import shutil
+import tempfile
+import time
+import unittest
+
+from minibench import Benchmark, BenchmarkRunner, BaseReporter
+from minibench.profiler import (
+    CPROFILE, SAMPLING, ProfileReporter, budget_calls, profile, profile_cprofile, profile_sampling, write_pstats
+)
+
+from . import ModuleFactory
+
+
+def leaf():
+    time.sleep(0.002)
+
+
+def work():
+    return sum(x * x for x in range(100))
+
+
+class ProfiledBenchmark(Benchmark):
+    times = 5
+
+    def __init__(self, *args, **kwargs):
+        super(ProfiledBenchmark, self).__init__(*args, **kwargs)
+        self.calls = 0
+
+    def bench_work(self):
+        self.calls += 1
+        work()
+
+
+class ProfilerTests(unittest.TestCase):
+    def test_cprofile(self):
+        data = profile_cprofile(work, 10, top=3)
+        self.assertEqual(data['profiler'], CPROFILE)
+        self.assertEqual(data['calls'], 10)
+        self.assertEqual(len(data['top']), 3)
+        functions = [row['function'] for row in data['top']]
+        self.assertTrue(any('<genexpr>' in f for f in functions))
+        for row in data['top']:
+            self.assertLessEqual(row['own'], row['cumulative'] + 1e-9)
+
+    def test_write_pstats(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, 'out.pstats')
+            write_pstats(profile_cprofile(work, 2), filename)
+            stats = pstats.Stats(filename)
+            self.assertTrue(any(key[2] == 'work' for key in stats.stats))
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_sampling(self):
+        data = profile_sampling(leaf, 20, interval=0.0005)
+        self.assertEqual(data['profiler'], SAMPLING)
+        self.assertTrue(data['stacks'])
+        for stack in data['stacks']:
+            self.assertTrue(stack.split(';')[-1].startswith('leaf '))
+        self.assertTrue(data['top'][0]['function'].startswith('leaf '))
+        self.assertAlmostEqual(sum(row['own'] for row in data['top']), 1)
+
+    def test_budget_calls(self):
+        self.assertEqual(budget_calls(10, 0.001), 10)
+        self.assertEqual(budget_calls(1000000, 0.001), 1000)
+        self.assertEqual(budget_calls(10, 5.), 1)
+        self.assertEqual(budget_calls(10, 0), 10)
+        self.assertEqual(budget_calls(0, 0), 1)
+
+    def test_unknown_profiler(self):
+        with self.assertRaises(ValueError):
+            profile('unknown', work, 1)
+
+    def test_errors_are_ignored(self):
+        def fail():
+            raise ValueError()
+        self.assertEqual(profile_cprofile(fail, 2)['calls'], 2)
+
+
+class ProfiledBenchmarkTests(unittest.TestCase):
+    def test_no_profile_by_default(self):
+        bench = ProfiledBenchmark()
+        bench.run()
+        self.assertIsNone(bench.results['bench_work'].profile)
+        self.assertEqual(bench.calls, 5)
+
+    def test_profiling_runs_separate_iterations(self):
+        bench = ProfiledBenchmark(profile=CPROFILE, profile_top=2)
+        bench.run()
+        results = bench.results['bench_work']
+        self.assertEqual(bench.calls, 10)
+        self.assertEqual(results.rounds, 5)
+        self.assertEqual(results.profile['calls'], 5)
+        self.assertEqual(len(results.profile['top']), 2)
+
+    def test_reporters(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            summary = BaseReporter()
+            reporter = ProfileReporter(os.path.join(tmpdir, 'profiles'))
+            runner = BenchmarkRunner(ModuleFactory(ProfiledBenchmark), reporters=[summary, reporter])
+            runner.run(profile=SAMPLING)
+            expected = os.path.join(tmpdir, 'profiles', 'ProfiledBenchmark-5.bench_work.folded')
+            self.assertEqual(reporter.files, [expected])
+            for bench in summary.summary().values():
+                self.assertEqual(bench['runs']['bench_work']['profile']['profiler'], SAMPLING)
+                self.assertNotIn('stacks', bench['runs']['bench_work']['profile'])
+        finally:
+            shutil.rmtree(tmpdir)
@@ -13,6 +13,7 @@ from xml.etree import ElementTree as ET
 from docutils.core import publish_string
 from markdown import markdown
 
+from minibench import memory
 from minibench import (
     BaseReporter,
     Benchmark,
@@ -20,9 +21,13 @@ from minibench import (
     CsvReporter,
     FixedWidth,
     JsonReporter,
+    JsonLinesReporter,
     MarkdownReporter,
     RstReporter,
+    parametrize,
 )
+from minibench.complexity import MODELS
+from minibench.report import load_summary
 
 from . import EXAMPLES, ModuleFactory
 
@@ -45,11 +50,13 @@ class BaseReporterTests(unittest.TestCase):
         self.assertEqual(bench_summary['name'], 'Empty benchmark')
         self.assertEqual(bench_summary['times'], 5)
         self.assertEqual(len(bench_summary['runs']), 1)
+        self.assertEqual(bench_summary['environment'], runner.environment)
+        self.assertIn('cpu_model', bench_summary['environment'])
 
         row = bench_summary['runs']['bench_nothing']
         self.assertEqual(row['name'], 'Nothing')
-        self.assertIn('total', row)
-        self.assertIn('mean', row)
+        for field in 'total', 'mean', 'min', 'max', 'median', 'stdev', 'p50', 'p90', 'p99', 'outliers':
+            self.assertIn(field, row)
 
 
 class JsonReporterTest(unittest.TestCase):
@@ -75,7 +82,9 @@ class CsvReporterTest(unittest.TestCase):
             out.flush()
             with open(out.name) as csvfile:
                 reader = csv.reader(csvfile, delimiter=str(';'), quotechar=str('"'))
-                self.assertEqual(six.next(reader), ['Benchmark', 'Method', 'Times', 'Total (s)', 'Average (s)'])
+                self.assertEqual(six.next(reader), ['Benchmark'] + list(FixedWidth.headers))
+                row = six.next(reader)
+                self.assertEqual(len(row), len(FixedWidth.headers) + 1)
 
 
 class FixedWidthMixinText(unittest.TestCase):
@@ -99,7 +108,7 @@ class FixedWidthMixinText(unittest.TestCase):
         bench = runner.runned[0]
         key = reporter.key(bench)
 
-        summary = reporter.with_sizes('', 'Method', 'Times', 'Total (s)', 'Average (s)')
+        summary = reporter.with_sizes('', *reporter.headers)
         self.assertEqual(len(summary), 1)
         self.assertEqual(summary[key]['sizes'][1], len('A method with long label'))
         self.assertEqual(summary[key]['sizes'][2], len('Times'))
@@ -121,7 +130,7 @@ class FixedWidthMixinText(unittest.TestCase):
         runner = BenchmarkRunner(module, reporters=[reporter])
         runner.run()
 
-        summary = reporter.with_sizes('', 'Method', 'Times', 'Total (s)', 'Average (s)')
+        summary = reporter.with_sizes('', *reporter.headers)
         self.assertEqual(len(summary), 2)
 
     def test_number_of_headers(self):
@@ -133,7 +142,7 @@ class FixedWidthMixinText(unittest.TestCase):
         runner.run()
 
         with self.assertRaises(ValueError):
-            reporter.with_sizes('One', 'Header', 'Is', 'Missing')
+            reporter.with_sizes('', *reporter.headers[1:])
 
 
 class RstReporterTest(unittest.TestCase):
@@ -161,7 +170,7 @@ class RstReporterTest(unittest.TestCase):
             tables = self.findall(tree, './/h:table')
             self.assertEqual(len(tables), 1)
             columns = self.findall(tables[0], './/h:th')
-            self.assertEqual(len(columns), 4)
+            self.assertEqual(len(columns), len(FixedWidth.headers))
 
 
 class MarkdownReporterTest(unittest.TestCase):
@@ -184,4 +193,185 @@ class MarkdownReporterTest(unittest.TestCase):
             tables = tree.findall('.//table')
             self.assertEqual(len(tables), 1)
             columns = tables[0].findall('.//th')
-            self.assertEqual(len(columns), 4)
+            self.assertEqual(len(columns), len(FixedWidth.headers))
+
+
+@unittest.skipUnless(memory.is_available(), 'tracemalloc is required')
+class MemoryColumnsTest(unittest.TestCase):
+    def run_bench(self, reporter):
+        class TestBench(Benchmark):
+            def bench_allocate(self):
+                return bytearray(1024)
+
+        runner = BenchmarkRunner(ModuleFactory(TestBench), reporters=[reporter])
+        runner.run(memory=True)
+
+    def test_summary(self):
+        reporter = BaseReporter()
+        self.run_bench(reporter)
+        for bench in reporter.summary().values():
+            self.assertIn('memory', bench['runs']['bench_allocate'])
+
+    def test_optional_columns(self):
+        class TestReporter(BaseReporter, FixedWidth):
+            pass
+
+        reporter = TestReporter()
+        self.run_bench(reporter)
+
+        for bench in reporter.with_sizes('', *reporter.headers).values():
+            self.assertEqual(len(bench['columns']), 4)
+            self.assertEqual(len(bench['headers']), len(reporter.headers) + 4)
+            self.assertEqual(len(bench['sizes']), len(reporter.headers) + 5)
+
+    def test_csv(self):
+        with NamedTemporaryFile() as out:
+            self.run_bench(CsvReporter(out.name))
+            with open(out.name) as csvfile:
+                reader = csv.reader(csvfile, delimiter=str(';'), quotechar=str('"'))
+                self.assertIn('Peak (B)', six.next(reader))
+
+
+class ParametrizedReportTest(unittest.TestCase):
+    def run_bench(self, reporter):
+        class TestBench(Benchmark):
+            times = 3
+
+            @parametrize('size', [10, 100, 1000])
+            def bench_sum(self, size):
+                return sum(range(size))
+
+        runner = BenchmarkRunner(ModuleFactory(TestBench), reporters=[reporter])
+        runner.run()
+
+    def test_summary(self):
+        reporter = BaseReporter()
+        self.run_bench(reporter)
+        for bench in reporter.summary().values():
+            self.assertEqual(bench['runs']['bench_sum[size=100]']['params'], {'size': 100})
+            self.assertEqual(bench['runs']['bench_sum[size=100]']['name'], 'Sum [size=100]')
+            self.assertEqual(bench['complexity']['bench_sum']['param'], 'size')
+            self.assertIn(bench['complexity']['bench_sum']['order'], [o for o, _ in MODELS])
+
+    def test_markdown(self):
+        with NamedTemporaryFile() as out:
+            self.run_bench(MarkdownReporter(out.name))
+            with open(out.name) as f:
+                self.assertIn('- Sum: O(', f.read())
+
+
+class ThroughputReportTest(unittest.TestCase):
+    def run_bench(self, reporter):
+        class TestBench(Benchmark):
+            work = 'return'
+            work_unit = 'B'
+
+            def bench_bytes(self):
+                return b'x' * 1024
+
+        runner = BenchmarkRunner(ModuleFactory(TestBench), reporters=[reporter])
+        runner.run()
+
+    def test_summary(self):
+        reporter = BaseReporter()
+        self.run_bench(reporter)
+        for bench in reporter.summary().values():
+            throughput = bench['runs']['bench_bytes']['throughput']
+            self.assertEqual(throughput['work'], 1024)
+            self.assertEqual(throughput['unit'], 'B')
+            self.assertGreater(throughput['rate'], 0)
+
+    def test_columns(self):
+        class TestReporter(BaseReporter, FixedWidth):
+            pass
+
+        reporter = TestReporter()
+        self.run_bench(reporter)
+        for bench in reporter.with_sizes('', *reporter.headers).values():
+            self.assertIn('Throughput (/s)', bench['headers'])
+            self.assertIn('Work unit', bench['headers'])
+
+
+class JsonLinesReporterTest(unittest.TestCase):
+    def run_bench(self, reporter, **kwargs):
+        class TestBench(Benchmark):
+            times = 5
+
+            def bench_one(self):
+                pass
+
+            def bench_two(self):
+                pass
+
+        runner = BenchmarkRunner(ModuleFactory(TestBench), reporters=[reporter])
+        runner.run(**kwargs)
+
+    def read(self, filename):
+        with open(filename) as f:
+            return [json.loads(line) for line in f]
+
+    def test_lines(self):
+        with NamedTemporaryFile() as out:
+            self.run_bench(JsonLinesReporter(out.name))
+            lines = self.read(out.name)
+        self.assertEqual([line['type'] for line in lines], ['method', 'method', 'class'])
+        self.assertEqual([line['method'] for line in lines[:2]], ['bench_one', 'bench_two'])
+        self.assertEqual(lines[0]['key'], 'TestBench-5')
+        self.assertEqual(lines[0]['run']['rounds'], 5)
+        self.assertNotIn('runs', lines[2]['bench'])
+        self.assertEqual(lines[2]['bench']['name'], 'Test bench')
+
+    def test_lines_are_written_while_running(self):
+        with NamedTemporaryFile() as out:
+            reporter = JsonLinesReporter(out.name)
+            lines = []
+
+            class Spy(BaseReporter):
+                def after_method(self, bench, method):
+                    with open(out.name) as f:
+                        lines.append(len(f.readlines()))
+
+            class TestBench(Benchmark):
+                def bench_one(self):
+                    pass
+
+                def bench_two(self):
+                    pass
+
+            runner = BenchmarkRunner(ModuleFactory(TestBench), reporters=[reporter, Spy()])
+            runner.run()
+        self.assertEqual(lines, [1, 2])
+
+    def test_samples(self):
+        with NamedTemporaryFile() as out:
+            self.run_bench(JsonLinesReporter(out.name, samples=2))
+            lines = self.read(out.name)
+        samples = [line for line in lines if line['type'] == 'samples' and line['method'] == 'bench_one']
+        self.assertEqual([line['offset'] for line in samples], [0, 2, 4])
+        self.assertEqual(sum(len(line['samples']) for line in samples), 5)
+
+    def test_load_summary(self):
+        with NamedTemporaryFile() as out:
+            self.run_bench(JsonLinesReporter(out.name, samples=2))
+            with open(out.name) as f:
+                summary = load_summary(f)
+        bench = summary['TestBench-5']
+        self.assertEqual(bench['name'], 'Test bench')
+        self.assertEqual(set(bench['runs']), set(['bench_one', 'bench_two']))
+        self.assertEqual(len(bench['runs']['bench_one']['samples']), 5)
+
+    def test_load_partial_summary(self):
+        with NamedTemporaryFile() as out:
+            self.run_bench(JsonLinesReporter(out.name))
+            with open(out.name) as f:
+                first = f.readline()
+                second = f.readline()
+        summary = load_summary(first + second[:10])
+        self.assertEqual(list(summary['TestBench-5']['runs']), ['bench_one'])
+
+    def test_load_json_summary(self):
+        with NamedTemporaryFile() as out:
+            self.run_bench(JsonReporter(out.name))
+            with open(out.name) as f:
+                summary = load_summary(f)
+        self.assertEqual(len(summary['TestBench-5']['runs']), 2)
@@ -7,7 +7,7 @@ import unittest
 
 from minibench import Benchmark, BaseReporter, BenchmarkRunner
 
-from . import EXAMPLES
+from . import EXAMPLES, ModuleFactory
 
 
 class CountReporter(BaseReporter):
@@ -83,6 +83,15 @@ class RunnerTests(unittest.TestCase):
         self.assertEqual(len(runner.runned), 1)
         self.assertIsInstance(runner.runned[0], Benchmark)
 
+    def test_probed_packages(self):
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+
+        runner = BenchmarkRunner(filename, packages=['unittest', 'six'])
+        runner.run()
+
+        self.assertEqual(runner.packages, ['minibench', 'six', 'click', 'unittest'])
+        self.assertIn('unittest', runner.environment['packages'])
+
     def test_benchmark_in_debug(self):
         filename = os.path.join(EXAMPLES, 'fail.bench.py')
 
@@ -121,3 +130,70 @@ class RunnerTests(unittest.TestCase):
         runner = BenchmarkRunner(reporters=[BadReporter])
 
         self.assertEqual(len(runner.reporters), 0)
+
+    def test_parallel_run(self):
+        filenames = [os.path.join(EXAMPLES, name) for name in ('sort.bench.py', 'empty.bench.py')]
+        serial = BenchmarkRunner(*filenames)
+        reporter = CountReporter()
+        runner = BenchmarkRunner(*filenames, jobs=2, reporters=[reporter])
+        runner.run(times=2)
+
+        self.assertEqual([b.__class__.__name__ for b in runner.runned], [b.__name__ for b in serial.benchmarks])
+        self.assertEqual(reporter.counts['before_class'], 3)
+        self.assertEqual(reporter.counts['after_method'], 15)
+        for bench in runner.runned:
+            for result in bench.results.values():
+                self.assertEqual(result.rounds, 2)
+                self.assertTrue(result.has_success)
+
+    def test_parallel_run_by_method(self):
+        filename = os.path.join(EXAMPLES, 'sum.bench.py')
+        runner = BenchmarkRunner(filename, jobs=2, by_method=True)
+        runner.run(times=3)
+
+        bench = runner.runned[0]
+        self.assertEqual(list(bench.results), ['bench_consecutive_add', 'bench_sum'])
+        for result in bench.results.values():
+            self.assertEqual(result.rounds, 3)
+
+    def test_parallel_run_without_source_is_local(self):
+        class Test(Benchmark):
+            def bench_something(self):
+                pass
+
+        runner = BenchmarkRunner(ModuleFactory(Test), jobs=2)
+        runner.run()
+
+        self.assertEqual(len(runner.runned), 1)
+        self.assertEqual(runner.runned[0].results['bench_something'].rounds, 5)
+
+    def test_selection(self):
+        filename = os.path.join(EXAMPLES, 'sort.bench.py')
+        reporter = CountReporter()
+        runner = BenchmarkRunner(filename, keyword='larger and (lambda or stupid)', reporters=[reporter])
+        self.assertEqual([b.__name__ for b in runner.benchmarks], ['SortLargerDictByValue'])
+        self.assertEqual(runner.collect(runner.benchmarks[0]), [('bench_lambda', ()), ('bench_stupid', ())])
+        runner.run(times=2)
+
+        self.assertEqual(sorted(runner.runned[0].results), ['bench_lambda', 'bench_stupid'])
+        self.assertEqual(reporter.counts['after_method'], 2)
+
+    def test_parallel_run_with_selection(self):
+        filename = os.path.join(EXAMPLES, 'throughput.bench.py')
+        runner = BenchmarkRunner(filename, jobs=2, by_method=True, markers='not slow and not memory')
+        runner.run(times=2)
+
+        self.assertEqual(len(runner.runned), 1)
+        self.assertEqual(list(runner.runned[0].results), ['bench_dumps'])
+
+    def test_isolated_run(self):
+        filename = os.path.join(EXAMPLES, 'sort.bench.py')
+        reporter = CountReporter()
+        runner = BenchmarkRunner(filename, isolate=True, reporters=[reporter])
+        runner.run(times=2)
+
+        self.assertEqual(len(runner.runned), 2)
+        self.assertEqual(reporter.counts['after_method'], 14)
+        for bench in runner.runned:
+            for result in bench.results.values():
+                self.assertEqual(result.rounds, 2)
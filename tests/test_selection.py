@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import unittest
+
+from minibench import Benchmark, tag
+from minibench.selection import Expression, match_keyword, match_markers, tags_of
+
+
+class ExpressionTests(unittest.TestCase):
+    def evaluate(self, text, *idents):
+        return Expression(text).evaluate(lambda ident: ident in idents)
+
+    def test_identifier(self):
+        self.assertTrue(self.evaluate('slow', 'slow'))
+        self.assertFalse(self.evaluate('slow', 'io'))
+
+    def test_operators(self):
+        self.assertTrue(self.evaluate('slow and io', 'slow', 'io'))
+        self.assertFalse(self.evaluate('slow and io', 'slow'))
+        self.assertTrue(self.evaluate('slow or io', 'io'))
+        self.assertTrue(self.evaluate('not slow', 'io'))
+        self.assertFalse(self.evaluate('not not slow'))
+
+    def test_precedence(self):
+        self.assertTrue(self.evaluate('a or b and c', 'a'))
+        self.assertFalse(self.evaluate('(a or b) and c', 'a'))
+        self.assertTrue(self.evaluate('not a and b', 'b'))
+        self.assertTrue(self.evaluate('not (a and b)', 'a'))
+
+    def test_empty(self):
+        self.assertTrue(self.evaluate(''))
+
+    def test_invalid(self):
+        for text in ('and', 'a and', '(a or b', 'a b', 'a )', 'not'):
+            with self.assertRaises(ValueError):
+                Expression(text)
+
+
+class MatchTests(unittest.TestCase):
+    def test_keyword_is_a_case_insensitive_substring(self):
+        self.assertTrue(match_keyword('sort', 'SortDictByValue', 'bench_lambda'))
+        self.assertTrue(match_keyword('lambda and not stupid', 'SortDictByValue', 'bench_lambda'))
+        self.assertFalse(match_keyword('sort and stupid', 'SortDictByValue', 'bench_lambda'))
+        self.assertTrue(match_keyword(None, 'SortDictByValue', 'bench_lambda'))
+
+    def test_markers_are_exact(self):
+        self.assertTrue(match_markers('slow', ['slow', 'io']))
+        self.assertFalse(match_markers('slo', ['slow']))
+        self.assertTrue(match_markers('not slow', []))
+        self.assertTrue(match_markers(None, []))
+
+
+class TagTests(unittest.TestCase):
+    def test_tag(self):
+        @tag('io')
+        @tag('slow')
+        def bench():
+            pass
+
+        self.assertEqual(tags_of(bench), ('slow', 'io'))
+        self.assertEqual(tags_of(lambda: None), ())
+
+    def test_collect_with_markers(self):
+        class Test(Benchmark):
+            tags = ['all']
+
+            @tag('slow')
+            def bench_slow(self):
+                pass
+
+            def bench_fast(self):
+                pass
+
+        self.assertEqual(Test().tags_of('bench_slow'), ('all', 'slow'))
+        self.assertEqual(Test(markers='slow')._collect(), ['bench_slow'])
+        self.assertEqual(Test(markers='not slow')._collect(), ['bench_fast'])
+        self.assertEqual(Test(markers='all')._collect(), ['bench_fast', 'bench_slow'])
+
+    def test_collect_with_keyword(self):
+        class Sorting(Benchmark):
+            def bench_sorted(self):
+                pass
+
+            def bench_stupid(self):
+                pass
+
+        self.assertEqual(Sorting(keyword='stupid')._collect(), ['bench_stupid'])
+        self.assertEqual(Sorting(keyword='sorting and not stupid')._collect(), ['bench_sorted'])
+        self.assertEqual(Sorting(keyword='other')._collect(), [])
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import unittest
+
+from minibench import stats
+from minibench.benchmark import Result
+
+
+class StatsTests(unittest.TestCase):
+    def test_mean(self):
+        self.assertEqual(stats.mean([]), 0)
+        self.assertEqual(stats.mean([1, 2, 3, 4]), 2.5)
+
+    def test_stdev(self):
+        self.assertEqual(stats.stdev([1]), 0)
+        self.assertAlmostEqual(stats.stdev([2, 4, 4, 4, 5, 5, 7, 9]), 2.138089935)
+
+    def test_percentile(self):
+        values = [1, 2, 3, 4, 5]
+        self.assertEqual(stats.percentile([], 50), 0)
+        self.assertEqual(stats.percentile([42], 90), 42)
+        self.assertEqual(stats.percentile(values, 0), 1)
+        self.assertEqual(stats.percentile(values, 50), 3)
+        self.assertEqual(stats.percentile(values, 100), 5)
+        self.assertAlmostEqual(stats.percentile(values, 90), 4.6)
+
+    def test_median(self):
+        self.assertEqual(stats.median([1, 2, 3]), 2)
+        self.assertEqual(stats.median([1, 2, 3, 4]), 2.5)
+
+    def test_outliers(self):
+        values = sorted([10] * 20 + [11] * 20 + [1, 100, 200])
+        self.assertEqual(stats.outliers(values), (1, 2))
+
+    def test_no_outliers_on_small_samples(self):
+        self.assertEqual(stats.outliers([1, 100, 1000]), (0, 0))
+
+
+class ResultTests(unittest.TestCase):
+    def test_empty(self):
+        result = Result()
+        self.assertEqual(result.total, 0)
+        self.assertEqual(result.mean, 0)
+        self.assertEqual(result.min, 0)
+        self.assertEqual(result.max, 0)
+
+    def test_samples(self):
+        result = Result()
+        for duration in (3, 1, 2):
+            result.add(duration)
+        self.assertEqual(list(result.samples), [3, 1, 2])
+        self.assertEqual(result.total, 6)
+        self.assertEqual(result.mean, 2)
+        self.assertEqual(result.min, 1)
+        self.assertEqual(result.max, 3)
+        self.assertEqual(result.median, 2)
+        self.assertEqual(result.stdev, 1)
+        self.assertEqual(result.percentile(100), 3)
+
+    def test_sorted_cache_invalidation(self):
+        result = Result()
+        result.add(2)
+        self.assertEqual(result.max, 2)
+        result.add(5)
+        self.assertEqual(result.max, 5)
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import threading
+import time
+import unittest
+
+from minibench import BaseReporter, Benchmark, BenchmarkRunner, MarkdownReporter, parametrize
+from minibench.clock import get_clock
+from minibench.complexity import analyze
+from minibench.threads import ThreadPool, is_available, scaling
+
+from tempfile import NamedTemporaryFile
+
+from . import ModuleFactory
+
+
+class ThreadsBenchmark(Benchmark):
+    times = 3
+    threads = [1, 2, 4]
+
+    def __init__(self, *args, **kwargs):
+        super(ThreadsBenchmark, self).__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.idents = set()
+        self.calls = 0
+
+    def bench_record(self):
+        with self.lock:
+            self.calls += 1
+            self.idents.add(threading.current_thread().ident)
+
+    def bench_sleep(self):
+        time.sleep(0.001)
+
+
+@unittest.skipUnless(is_available(), 'Thread barriers requires Python 3.2+')
+class ThreadPoolTests(unittest.TestCase):
+    def test_call(self):
+        calls = []
+        with ThreadPool(3, lambda: calls.append(threading.current_thread().ident), get_clock()) as pool:
+            latencies = []
+            duration, errors = pool.call(latencies)
+            pool.call(latencies)
+
+        self.assertEqual(len(calls), 6)
+        self.assertEqual(len(set(calls)), 3)
+        self.assertEqual(len(latencies), 6)
+        self.assertEqual(errors, [])
+        self.assertGreater(duration, 0)
+        for thread in pool.threads:
+            self.assertFalse(thread.is_alive())
+
+    def test_errors(self):
+        def fail():
+            raise ValueError()
+
+        with ThreadPool(2, fail, get_clock()) as pool:
+            _, errors = pool.call([])
+        self.assertEqual(len(errors), 2)
+
+
+@unittest.skipUnless(is_available(), 'Thread barriers requires Python 3.2+')
+class ThreadedBenchmarkTests(unittest.TestCase):
+    def test_variants(self):
+        bench = ThreadsBenchmark()
+        self.assertEqual(bench._collect(), [
+            'bench_record[threads=1]', 'bench_record[threads=2]', 'bench_record[threads=4]',
+            'bench_sleep[threads=1]', 'bench_sleep[threads=2]', 'bench_sleep[threads=4]',
+        ])
+
+    def test_run(self):
+        bench = ThreadsBenchmark(methods=['bench_record'])
+        bench.run()
+        self.assertEqual(bench.calls, 3 * (1 + 2 + 4))
+        self.assertGreaterEqual(len(bench.idents), 4)
+        results = bench.results['bench_record[threads=4]']
+        self.assertEqual(results.concurrency, 4)
+        self.assertEqual(len(results.latencies), 12)
+        self.assertTrue(results.has_success)
+
+    def test_errors(self):
+        class Test(Benchmark):
+            threads = [2]
+
+            def bench_fail(self):
+                raise ValueError()
+
+        bench = Test(times=2, debug=True)
+        bench.run()
+        self.assertIsInstance(bench.results['bench_fail[threads=2]'].error, ValueError)
+
+    def test_thread_clock_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ThreadsBenchmark(clock='thread_time')
+
+    def test_scaling(self):
+        bench = ThreadsBenchmark(methods=['bench_sleep'])
+        bench.run()
+        rows = scaling(bench)['bench_sleep']
+        self.assertEqual([row[0] for row in rows], [1, 2, 4])
+        self.assertEqual(rows[0][2:], (1, 1))
+        # Sleeping releases the GIL so threads scale
+        self.assertGreater(rows[-1][2], 2)
+
+    def test_threads_are_not_input_sizes(self):
+        class Test(Benchmark):
+            times = 1
+            threads = [1, 2]
+
+            @parametrize('size', [1, 10, 100])
+            def bench_sized(self, size):
+                pass
+
+        bench = Test()
+        bench.run()
+        self.assertEqual(list(analyze(bench)), ['bench_sized[threads=1]', 'bench_sized[threads=2]'])
+        self.assertEqual(list(scaling(bench)), ['bench_sized[size=1]', 'bench_sized[size=10]', 'bench_sized[size=100]'])
+
+    def test_report(self):
+        reporter = BaseReporter()
+        runner = BenchmarkRunner(ModuleFactory(ThreadsBenchmark), reporters=[reporter])
+        runner.run(methods=['bench_sleep'])
+        for bench in reporter.summary().values():
+            rows = bench['scaling']['bench_sleep']['threads']
+            self.assertEqual([row['threads'] for row in rows], [1, 2, 4])
+            self.assertIn('gil', bench)
+
+    def test_markdown(self):
+        with NamedTemporaryFile() as out:
+            runner = BenchmarkRunner(ModuleFactory(ThreadsBenchmark), reporters=[MarkdownReporter(out.name)])
+            runner.run(times=1)
+            with open(out.name) as f:
+                self.assertIn('| Threads | Ops/s', f.read())
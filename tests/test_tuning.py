@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from minibench import BaseReporter, BenchmarkRunner, tuning
+from minibench.benchmark import Result
+from minibench.executor import available_cpus
+
+from . import EXAMPLES
+
+
+class SystemState(object):
+    '''Restore the process affinity and niceness changed by a test'''
+    def __enter__(self):
+        self.cpus = available_cpus()
+        self.niceness = os.nice(0)
+        return self
+
+    def __exit__(self, *args):
+        if hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, self.cpus)
+        try:
+            os.nice(self.niceness - os.nice(0))
+        except OSError:
+            pass
+
+
+class ParseCpusTests(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(tuning.parse_cpus('0,2-4'), [0, 2, 3, 4])
+        self.assertEqual(tuning.parse_cpus(' 3, 1 '), [1, 3])
+        self.assertEqual(tuning.parse_cpus(''), [])
+        self.assertEqual(tuning.parse_cpus(None), [])
+
+    def test_invalid(self):
+        for value in ('a', '1-b', '-1'):
+            with self.assertRaises(ValueError):
+                tuning.parse_cpus(value)
+
+
+class ChecksTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.paths = (tuning.GOVERNOR, tuning.ISOLATED, tuning.MEMINFO)
+
+    def tearDown(self):
+        tuning.GOVERNOR, tuning.ISOLATED, tuning.MEMINFO = self.paths
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_governor(self):
+        self.write('cpu0', 'performance\n')
+        self.write('cpu1', 'powersave\n')
+        tuning.GOVERNOR = os.path.join(self.tmpdir, 'cpu{0}')
+        self.assertEqual(tuning.check_governor([0]).status, tuning.OK)
+        finding = tuning.check_governor([0, 1])
+        self.assertEqual(finding.status, tuning.WARNING)
+        self.assertIn('CPU 1 frequency governor is powersave', finding.message)
+        self.assertIsNone(tuning.check_governor([2]))
+
+    def test_isolated(self):
+        tuning.ISOLATED = self.write('isolated', '2-3\n')
+        self.assertEqual(tuning.isolated_cpus(), [2, 3])
+        self.assertEqual(tuning.check_isolated([2, 3]).status, tuning.OK)
+        self.assertEqual(tuning.check_isolated([1, 2]).status, tuning.WARNING)
+        tuning.ISOLATED = os.path.join(self.tmpdir, 'missing')
+        self.assertIsNone(tuning.check_isolated([1]))
+
+    def test_swap(self):
+        tuning.MEMINFO = self.write('meminfo', 'MemTotal: 1000 kB\nSwapTotal: 2048 kB\nSwapFree: 2048 kB\n')
+        self.assertEqual(tuning.check_swap().status, tuning.OK)
+        tuning.MEMINFO = self.write('meminfo', 'SwapTotal: 2048 kB\nSwapFree: 1024 kB\n')
+        finding = tuning.check_swap()
+        self.assertEqual(finding.status, tuning.WARNING)
+        self.assertIn('1024 kB', finding.message)
+        tuning.MEMINFO = os.path.join(self.tmpdir, 'missing')
+        self.assertIsNone(tuning.check_swap())
+
+    def test_default_cpus(self):
+        tuning.ISOLATED = self.write('isolated', '2\n')
+        available = tuning.available_cpus
+        tuning.available_cpus = lambda: [0, 1, 2, 3]
+        try:
+            self.assertEqual(tuning.default_cpus(), [2])
+            self.assertEqual(tuning.default_cpus(3), [1, 2, 3])
+            self.assertEqual(tuning.default_cpus(8), [0, 1, 2, 3])
+            tuning.ISOLATED = os.path.join(self.tmpdir, 'missing')
+            self.assertEqual(tuning.default_cpus(), [3])
+            self.assertEqual(tuning.default_cpus(2), [2, 3])
+        finally:
+            tuning.available_cpus = available
+
+    def test_shared(self):
+        self.assertIsNone(tuning.check_shared([0], 1))
+        self.assertEqual(tuning.check_shared([0, 1], 2).status, tuning.OK)
+        finding = tuning.check_shared([3], 4)
+        self.assertEqual(finding.status, tuning.WARNING)
+        self.assertIn('4 worker processes share 1 CPU(s)', finding.message)
+        self.assertIn('cpus', [f.check for f in tuning.preflight([3], 4)])
+
+    def test_preflight(self):
+        findings = tuning.preflight(tuning.default_cpus())
+        self.assertTrue(all(isinstance(f, tuning.Finding) for f in findings))
+
+    def test_raise_priority(self):
+        self.assertIn(tuning.raise_priority(0).status, (tuning.OK, tuning.WARNING))
+
+
+class NoiseTests(unittest.TestCase):
+    def test_noise(self):
+        result = Result()
+        for sample in (1., 1.1, 0.9, 1.):
+            result.add(sample)
+        self.assertAlmostEqual(tuning.noise(result), 1.96 * result.stdev / 2 / result.mean, places=3)
+
+    def test_not_enough_rounds(self):
+        result = Result()
+        result.add(1.)
+        self.assertEqual(tuning.noise(result), 0.)
+
+
+class StableRunnerTests(unittest.TestCase):
+    def test_stable_run(self):
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        reporter = BaseReporter()
+        with SystemState():
+            runner = BenchmarkRunner(filename, stable=True, reporters=[reporter])
+            runner.run(times=2)
+            if hasattr(os, 'sched_getaffinity'):
+                self.assertEqual(available_cpus(), runner.cpus)
+
+        checks = [finding.check for finding in runner.preflight]
+        self.assertIn('affinity', checks)
+        self.assertIn('priority', checks)
+        summary = reporter.summary()
+        self.assertEqual([f['check'] for f in summary['EmptyBenchmark-2']['preflight']], checks)
+
+    def test_stable_parallel_run_defaults_to_a_cpu_by_job(self):
+        filename = os.path.join(EXAMPLES, 'empty.bench.py')
+        with SystemState():
+            runner = BenchmarkRunner(filename, stable=True, jobs=2)
+            runner.run(times=2)
+
+        self.assertEqual(len(runner.cpus), min(2, len(available_cpus())))
+        shared = [finding for finding in runner.preflight if finding.check == 'cpus']
+        self.assertEqual(len(shared), 1)
+        self.assertEqual(shared[0].status, tuning.OK if len(available_cpus()) >= 2 else tuning.WARNING)
@@ -3,7 +3,7 @@ from __future__ import unicode_literals
 
 import unittest
 
-from minibench.utils import humanize
+from minibench.utils import humanize, humanize_bytes, humanize_rate
 
 
 class HumanizeTests(unittest.TestCase):
@@ -14,3 +14,27 @@ class HumanizeTests(unittest.TestCase):
     def test_dash_to_human(self):
         self.assertEqual(humanize('test'), 'Test')
         self.assertEqual(humanize('another_test'), 'Another test')
+
+
+class HumanizeBytesTests(unittest.TestCase):
+    def test_bytes(self):
+        self.assertEqual(humanize_bytes(0), '0 B')
+        self.assertEqual(humanize_bytes(1023), '1023 B')
+
+    def test_multiples(self):
+        self.assertEqual(humanize_bytes(1024), '1.0 KiB')
+        self.assertEqual(humanize_bytes(1536 * 1024), '1.5 MiB')
+
+    def test_negative(self):
+        self.assertEqual(humanize_bytes(-2048), '-2.0 KiB')
+
+
+class HumanizeRateTests(unittest.TestCase):
+    def test_units(self):
+        self.assertEqual(humanize_rate(12, 'items'), '12.0 items/s')
+        self.assertEqual(humanize_rate(1500, 'items'), '1.5 kitems/s')
+        self.assertEqual(humanize_rate(2.5e6, 'ops'), '2.5 Mops/s')
+
+    def test_bytes(self):
+        self.assertEqual(humanize_rate(512, 'B'), '512.0 B/s')
+        self.assertEqual(humanize_rate(1536 * 1024, 'B'), '1.5 MiB/s')